@@ -0,0 +1,74 @@
+"""Per-request connection cost: a fresh untuned SQLite connection per request
+(what create_app used to do) against the shared, pooled and tuned engine.
+
+    python benchmarks/bench_connections.py [requests]
+"""
+
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from sqlalchemy import NullPool, create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from pets.adapters.engine import create_database_engine  # noqa: E402
+
+QUERIES_PER_REQUEST = 5
+
+
+def setup(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS t (id INTEGER PRIMARY KEY, v)"))
+        conn.execute(text("DELETE FROM t"))
+        conn.execute(
+            text("INSERT INTO t (id, v) VALUES (:id, :v)"),
+            [{"id": i, "v": f"value {i}"} for i in range(1000)],
+        )
+
+
+def run(engine, requests: int) -> float:
+    start = perf_counter()
+    for i in range(requests):
+        # One checkout per request, a handful of reads and a small write.
+        with engine.begin() as conn:
+            for q in range(QUERIES_PER_REQUEST):
+                conn.execute(
+                    text("SELECT v FROM t WHERE id = :id"), {"id": (i + q) % 1000}
+                ).scalar()
+            conn.execute(
+                text("UPDATE t SET v = :v WHERE id = :id"),
+                {"id": i % 1000, "v": str(i)},
+            )
+    return perf_counter() - start
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        database_uri = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+        config["SQLALCHEMY_DATABASE_URI"] = database_uri
+
+        engines = {
+            "NullPool, default pragmas": create_engine(
+                database_uri,
+                connect_args={"check_same_thread": False},
+                poolclass=NullPool,
+            ),
+            "shared pool, tuned pragmas": create_database_engine(config),
+        }
+        for label, engine in engines.items():
+            setup(engine)
+            seconds = run(engine, requests)
+            print(
+                f"{label}: {requests} requests in {seconds:.2f}s "
+                f"({seconds / requests * 1e6:,.0f} us/request)"
+            )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
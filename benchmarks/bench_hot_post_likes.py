@@ -0,0 +1,151 @@
+"""A like storm on one post: many users toggling their like at once, with
+like_count updated in place against spread over ShardedCounter rows, each
+with and without the WriteQueue.
+
+    python benchmarks/bench_hot_post_likes.py [threads] [likes_per_thread] [url]
+
+url defaults to a temporary SQLite file. SQLite takes one writer at a time
+whatever the rows, so shards mostly pay off on PostgreSQL, where concurrent
+likes otherwise queue on the post's row lock; point url at an empty database.
+"""
+
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC
+from time import perf_counter
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import clear_mappers, sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from pets.adapters.counters import ShardedCounter  # noqa: E402
+from pets.adapters.database_repository import SqlAlchemyRepository  # noqa: E402
+from pets.adapters.engine import create_database_engine  # noqa: E402
+from pets.adapters.orm import (  # noqa: E402
+    like_table,
+    map_model_to_tables,
+    metadata,
+    pet_users_table,
+    post_counter_shards_table,
+    posts_table,
+    users_table,
+)
+from pets.adapters.projections import rebuild_post_cards  # noqa: E402
+from pets.adapters.write_queue import WriteQueue  # noqa: E402
+
+POST_ID = 1
+
+
+def seed(engine, users: int):
+    now = datetime.now(UTC)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(users_table),
+            [
+                {
+                    "id": i,
+                    "username": f"bench{i}",
+                    "email": f"bench{i}@example.com",
+                    "password_hash": "x",
+                    "created_at": now,
+                    "type": "pet_user",
+                }
+                for i in range(1, users + 1)
+            ],
+        )
+        conn.execute(
+            insert(pet_users_table),
+            [{"id": i, "follower_ids": []} for i in range(1, users + 1)],
+        )
+        conn.execute(
+            insert(posts_table).values(
+                id=POST_ID,
+                user_id=1,
+                caption="hot post",
+                views=0,
+                created_at=now,
+                tags=[],
+                media_path="static/images/hot.jpg",
+                media_type="photo",
+            )
+        )
+        rebuild_post_cards(conn)
+
+
+def reset(engine):
+    with engine.begin() as conn:
+        conn.execute(delete(like_table))
+        conn.execute(delete(post_counter_shards_table))
+        conn.execute(update(posts_table).values(like_count=0))
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    likes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    total = threads * likes
+    with tempfile.TemporaryDirectory() as directory:
+        config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+        config["SQLALCHEMY_DATABASE_URI"] = (
+            sys.argv[3]
+            if len(sys.argv) > 3
+            else f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+        config["DB_POOL_SIZE"] = threads
+        engine = create_database_engine(config)
+        clear_mappers()
+        map_model_to_tables()
+        metadata.create_all(engine)
+        seed(engine, total)
+        session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+        for shards in (0, 16):
+            for queued in (False, True):
+                reset(engine)
+                like_counter = ShardedCounter(shards) if shards else None
+                write_queue = (
+                    WriteQueue(engine, Config.DB_WRITE_BATCH_SIZE) if queued else None
+                )
+                repo = SqlAlchemyRepository(
+                    session_factory,
+                    engine,
+                    None,
+                    write_queue,
+                    like_counter=like_counter,
+                )
+
+                def like(user_id):
+                    try:
+                        return repo.toggle_like(user_id, POST_ID)
+                    finally:
+                        repo.close_session()
+
+                start = perf_counter()
+                with ThreadPoolExecutor(max_workers=threads) as pool:
+                    list(pool.map(like, range(1, total + 1)))
+                seconds = perf_counter() - start
+                folded = repo.compact_counters()
+                if write_queue is not None:
+                    write_queue.close()
+                with engine.connect() as conn:
+                    count = conn.scalar(
+                        select(posts_table.c.like_count).where(
+                            posts_table.c.id == POST_ID
+                        )
+                    )
+                assert count == total, (count, total)
+                print(
+                    f"{shards or 'no'} shards, "
+                    f"{'group commit' if queued else 'commit per like'}: "
+                    f"{total / seconds:,.0f} likes/s"
+                    + (f" ({folded} post compacted)" if shards else "")
+                )
+        clear_mappers()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Per-row cost of the feed and comment reads: ORM objects (what the
+endpoints used to serialize) against the PostCard / CommentView rows.
+
+    python benchmarks/bench_read_models.py [rows] [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta, UTC
+from time import perf_counter
+
+from sqlalchemy import insert
+from sqlalchemy.orm import clear_mappers, sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from pets.adapters.database_repository import SqlAlchemyRepository  # noqa: E402
+from pets.adapters.engine import create_database_engine  # noqa: E402
+from pets.adapters.orm import (  # noqa: E402
+    comments_table,
+    map_model_to_tables,
+    metadata,
+    pet_users_table,
+    posts_table,
+    users_table,
+)
+
+
+def seed(engine, rows: int):
+    now = datetime.now(UTC)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(users_table),
+            [
+                {
+                    "id": 1,
+                    "username": "bench",
+                    "email": "bench@example.com",
+                    "password_hash": "x",
+                    "profile_picture_path": "static/bench.png",
+                    "created_at": now,
+                    "type": "pet_user",
+                }
+            ],
+        )
+        conn.execute(insert(pet_users_table), [{"id": 1, "follower_ids": []}])
+        conn.execute(
+            insert(posts_table),
+            [
+                {
+                    "id": i,
+                    "user_id": 1,
+                    "caption": f"post {i}",
+                    "views": 0,
+                    "created_at": now - timedelta(seconds=i),
+                    "tags": ["bench"],
+                    "media_path": f"static/images/{i}.jpg",
+                    "media_type": "photo",
+                }
+                for i in range(1, rows + 1)
+            ],
+        )
+        conn.execute(
+            insert(comments_table),
+            [
+                {
+                    "post_id": 1,
+                    "user_id": 1,
+                    "text": f"comment {i}",
+                    "created_at": now,
+                    "likes": 0,
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+def measure(label: str, read, rows: int, repeats: int):
+    read()  # warm up statement caches
+    start = perf_counter()
+    for _ in range(repeats):
+        read()
+    seconds = (perf_counter() - start) / repeats
+    tracemalloc.start()
+    result = read()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    print(
+        f"{label}: {seconds / rows * 1e6:.1f} us/row, {peak / rows:,.0f} bytes/row peak"
+    )
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as directory:
+        config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+        config["SQLALCHEMY_DATABASE_URI"] = (
+            f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+        engine = create_database_engine(config)
+        clear_mappers()
+        map_model_to_tables()
+        metadata.create_all(engine)
+        seed(engine, rows)
+        repo = SqlAlchemyRepository(
+            sessionmaker(bind=engine, expire_on_commit=False), engine
+        )
+
+        def orm_feed():
+            # A fresh session each time, as a new request would have.
+            repo.close_session()
+            return [
+                (p.id, p.caption, p.media_path, p.like_count)
+                for p in repo.get_feed_page(None, None, rows)
+            ]
+
+        def orm_comments():
+            repo.close_session()
+            return [
+                (c.id, c.comment_string, c.created_at)
+                for c in repo.get_comments_for_post(1)
+            ]
+
+        measure("feed, ORM Post objects", orm_feed, rows, repeats)
+        measure(
+            "feed, PostCard rows",
+            lambda: repo.get_feed_cards(None, None, rows),
+            rows,
+            repeats,
+        )
+        measure("comments, ORM Comment objects", orm_comments, rows, repeats)
+        measure(
+            "comments, CommentView rows",
+            lambda: repo.get_comment_views(1),
+            rows,
+            repeats,
+        )
+        repo.close_session()
+        clear_mappers()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
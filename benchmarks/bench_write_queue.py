@@ -0,0 +1,91 @@
+"""Burst write throughput on SQLite: every thread committing its own writes
+against all writes going through the WriteQueue's group commit.
+
+    python benchmarks/bench_write_queue.py [threads] [writes_per_thread]
+"""
+
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from sqlalchemy import event, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from pets.adapters.engine import create_database_engine  # noqa: E402
+from pets.adapters.write_queue import WriteQueue  # noqa: E402
+
+
+def write(conn, i):
+    # The shape of add_like: one insert and one counter update.
+    conn.execute(text("INSERT INTO likes (post_id) VALUES (:post_id)"), {"post_id": i})
+    conn.execute(text("UPDATE counters SET n = n + 1 WHERE id = 1"))
+
+
+def setup(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS likes"))
+        conn.execute(text("DROP TABLE IF EXISTS counters"))
+        conn.execute(text("CREATE TABLE likes (id INTEGER PRIMARY KEY, post_id)"))
+        conn.execute(text("CREATE TABLE counters (id INTEGER PRIMARY KEY, n)"))
+        conn.execute(text("INSERT INTO counters VALUES (1, 0)"))
+
+
+def burst(submit, threads: int, writes: int) -> float:
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(submit, range(threads * writes)))
+    return perf_counter() - start
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    total = threads * writes
+    with tempfile.TemporaryDirectory() as directory:
+        config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+        config["SQLALCHEMY_DATABASE_URI"] = (
+            f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+        config["DB_POOL_SIZE"] = threads
+        for synchronous in ("NORMAL", "FULL"):
+            engine = create_database_engine(config)
+
+            # Runs after the engine's own pragma hook, so it wins.
+            @event.listens_for(engine, "connect")
+            def set_synchronous(dbapi_connection, connection_record):
+                dbapi_connection.execute(f"PRAGMA synchronous={synchronous}")
+
+            setup(engine)
+
+            def commit_each(i):
+                with engine.begin() as conn:
+                    write(conn, i)
+
+            seconds = burst(commit_each, threads, writes)
+            print(
+                f"synchronous={synchronous}, commit per write: "
+                f"{total / seconds:,.0f} writes/s"
+            )
+
+            write_queue = WriteQueue(engine, Config.DB_WRITE_BATCH_SIZE)
+            seconds = burst(
+                lambda i: write_queue.execute(lambda conn: write(conn, i)),
+                threads,
+                writes,
+            )
+            write_queue.close()
+            batches = write_queue.batches
+            print(
+                f"synchronous={synchronous}, group commit: "
+                f"{total / seconds:,.0f} writes/s "
+                f"({batches} commits, mean batch {write_queue.writes / batches:.1f})"
+            )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
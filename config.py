@@ -20,7 +20,56 @@ class Config:
         raw_db_uri.strip().strip("'\"") if isinstance(raw_db_uri, str) else raw_db_uri
     )
 
+    # Connection pool shared by every database access
+    DB_POOL_SIZE = int(environ.get("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(environ.get("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = int(environ.get("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(environ.get("DB_POOL_RECYCLE", "1800"))
+
+    # SQLite tuning applied to every new connection
+    SQLITE_BUSY_TIMEOUT_MS = int(environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KIB = int(environ.get("SQLITE_CACHE_SIZE_KIB", "20000"))
+    SQLITE_MMAP_SIZE = int(environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
     echo_string = environ.get("SQLALCHEMY_ECHO", "false")
     SQLALCHEMY_ECHO = False
     if isinstance(echo_string, str) and echo_string.lower().strip() == "true":
         SQLALCHEMY_ECHO = True
+
+    # Guard the in-memory repository with a reader-writer lock so it can sit
+    # behind a threaded server
+    MEMORY_THREAD_SAFE = environ.get("MEMORY_THREAD_SAFE", "false").lower() == "true"
+
+    # Optional pickle of the seeded memory repository; loaded instead of the
+    # CSVs when it is newer than them, otherwise rewritten after populating
+    MEMORY_SNAPSHOT_PATH = environ.get("MEMORY_SNAPSHOT_PATH")
+
+    # Rows per bulk insert when seeding the database, and worker processes
+    # for parsing the seed CSVs (0 or 1 parses them in this process)
+    POPULATE_CHUNK_SIZE = int(environ.get("POPULATE_CHUNK_SIZE", "500"))
+    POPULATE_PROCESSES = int(environ.get("POPULATE_PROCESSES", "0"))
+
+    # Ids reserved per round trip by the hi/lo allocator in database mode
+    ID_BLOCK_SIZE = int(environ.get("ID_BLOCK_SIZE", "100"))
+
+    # Run each HTTP request as one unit of work: repository calls share a
+    # session and identity map and commit once when the request ends
+    DB_UNIT_OF_WORK = environ.get("DB_UNIT_OF_WORK", "false").lower() == "true"
+
+    # Send like/comment/follow writes through one writer thread that commits
+    # whatever is queued in a single transaction (group commit); mainly for
+    # SQLite, where concurrent writers otherwise queue on the database lock.
+    # Writes made inside a unit of work stay in its transaction instead
+    DB_WRITE_QUEUE = environ.get("DB_WRITE_QUEUE", "false").lower() == "true"
+    DB_WRITE_BATCH_SIZE = int(environ.get("DB_WRITE_BATCH_SIZE", "256"))
+
+    # Keep up to this many users in an LRU shared across requests, so the
+    # logged-in user usually costs no query; 0 turns the cache off
+    DB_USER_CACHE_SIZE = int(environ.get("DB_USER_CACHE_SIZE", "0"))
+
+    # Spread each post's like count over this many shard rows, so a like
+    # storm on one post doesn't queue every writer on its row; reads add the
+    # shards up and a background job folds them back into the post every
+    # DB_COUNTER_COMPACT_SECONDS. 0 updates the post's counter directly
+    DB_LIKE_COUNTER_SHARDS = int(environ.get("DB_LIKE_COUNTER_SHARDS", "0"))
+    DB_COUNTER_COMPACT_SECONDS = float(environ.get("DB_COUNTER_COMPACT_SECONDS", "5"))
@@ -1,14 +1,20 @@
 from dotenv import load_dotenv
+import click
 from flask import render_template
-from sqlalchemy import NullPool, create_engine, inspect, text
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import clear_mappers, sessionmaker
 
-from pets.adapters import repository
+from pets.adapters import migrations, repository
+from pets.adapters.counters import CounterCompactor, ShardedCounter
 from pets.adapters.database_repository import SqlAlchemyRepository
+from pets.adapters.engine import create_database_engine
+from pets.adapters.id_allocator import HiLoIdAllocator
+from pets.adapters.user_cache import UserCache
+from pets.adapters.write_queue import WriteQueue
 
 from pets.adapters.memory_repository import MemoryRepository
 from pets.adapters.orm import map_model_to_tables, mapper_registry
-from pets.adapters.populate_repository import populate
+from pets.adapters.populate_repository import populate, snapshot_is_current
 from pets.blueprints.feed.feed import feed, feed_bp
 from pets.blueprints.authentication.authentication import authentication_blueprint
 from pets.blueprints.upload.upload import upload_bp
@@ -32,37 +38,41 @@ def create_app():
 
     if app.config["REPOSITORY"] == "memory":
         # Create the MemoryRepository implementation for a memory-based repository.
-        repository.repo_instance = MemoryRepository()
+        repository.repo_instance = MemoryRepository(app.config["MEMORY_THREAD_SAFE"])
         database_mode = False  # (dont need this yet) but ill set is up to use later
-        populate(repository.repo_instance)
-
-    elif app.config["REPOSITORY"] == "database":
-        database_uri = app.config["SQLALCHEMY_DATABASE_URI"]
-
-        database_echo = app.config["SQLALCHEMY_ECHO"]
-        if database_uri.startswith("sqlite"):
-            database_engine = create_engine(
-                database_uri,
-                connect_args={"check_same_thread": False},
-                poolclass=NullPool,
-                echo=database_echo,
-            )
+        snapshot_path = app.config["MEMORY_SNAPSHOT_PATH"]
+        if snapshot_path and snapshot_is_current(snapshot_path):
+            repository.repo_instance.load_snapshot(snapshot_path)
         else:
-            database_engine = create_engine(
-                database_uri,
-                pool_size=5,
-                max_overflow=10,
-                pool_pre_ping=True,
-                echo=database_echo,
+            populate(
+                repository.repo_instance, processes=app.config["POPULATE_PROCESSES"]
             )
+            if snapshot_path:
+                repository.repo_instance.save_snapshot(snapshot_path)
 
+    elif app.config["REPOSITORY"] == "database":
+        database_engine = create_database_engine(app.config)
 
         session_factory = sessionmaker(
-            autocommit=False, autoflush=True, bind=database_engine
+            autocommit=False,
+            autoflush=True,
+            bind=database_engine,
+            expire_on_commit=False,
         )
 
         inspector = inspect(database_engine)
 
+        id_allocator = HiLoIdAllocator(database_engine, app.config["ID_BLOCK_SIZE"])
+        write_queue = None
+        if app.config["DB_WRITE_QUEUE"]:
+            write_queue = WriteQueue(database_engine, app.config["DB_WRITE_BATCH_SIZE"])
+        user_cache = None
+        if app.config["DB_USER_CACHE_SIZE"]:
+            user_cache = UserCache(app.config["DB_USER_CACHE_SIZE"])
+        like_counter = None
+        if app.config["DB_LIKE_COUNTER_SHARDS"]:
+            like_counter = ShardedCounter(app.config["DB_LIKE_COUNTER_SHARDS"])
+
         # Always clear and remap (idempotent for app restarts)
 
         clear_mappers()
@@ -73,20 +83,43 @@ def create_app():
             print("No tables found — creating tables and populating database...")
 
             mapper_registry.metadata.create_all(database_engine)
+            migrations.stamp(database_engine)
 
             repository.repo_instance = SqlAlchemyRepository(
-                session_factory, database_uri
+                session_factory,
+                database_engine,
+                id_allocator,
+                write_queue,
+                user_cache,
+                like_counter,
             )
 
             database_mode = True
 
-            populate(repository.repo_instance, database_mode)
+            populate(
+                repository.repo_instance,
+                database_mode,
+                app.config["POPULATE_CHUNK_SIZE"],
+                app.config["POPULATE_PROCESSES"],
+            )
 
         else:
             print("Tables found")
+            migrations.migrate(database_engine)
 
             repository.repo_instance = SqlAlchemyRepository(
-                session_factory, database_uri
+                session_factory,
+                database_engine,
+                id_allocator,
+                write_queue,
+                user_cache,
+                like_counter,
+            )
+
+        if like_counter is not None:
+            CounterCompactor(
+                repository.repo_instance.compact_counters,
+                app.config["DB_COUNTER_COMPACT_SECONDS"],
             )
 
     app.register_blueprint(feed_bp)
@@ -101,9 +134,47 @@ def create_app():
     def inject_user():
         return {"current_user": get_current_user()}
 
+    @app.cli.command("backfill-counters")
+    def backfill_counters():
+        """Recompute the denormalized like/comment counters on posts."""
+        if not isinstance(repository.repo_instance, SqlAlchemyRepository):
+            print("Counters are maintained in memory; nothing to backfill.")
+            return
+        updated = repository.repo_instance.backfill_post_counters()
+        print(f"Backfilled like/comment counters for {updated} posts")
+
+    @app.cli.command("compact-counters")
+    def compact_counters():
+        """Fold sharded like counts into their posts now."""
+        if not isinstance(repository.repo_instance, SqlAlchemyRepository):
+            print("Counters are maintained in memory; nothing to compact.")
+            return
+        updated = repository.repo_instance.compact_counters()
+        print(f"Compacted like counters for {updated} posts")
+
+    @app.cli.command("check-post-cards")
+    @click.option("--repair", is_flag=True, help="Rebuild the cards if any differ.")
+    def check_post_cards(repair):
+        """Diff the post_cards projection against a fresh rebuild."""
+        diff = repository.repo_instance.check_post_cards(repair=repair)
+        for kind, post_ids in diff.items():
+            print(f"{kind}: {post_ids}")
+        if any(diff.values()):
+            print("Post cards repaired" if repair else "Post cards are out of date")
+        else:
+            print("Post cards are up to date")
+
+    if app.config["DB_UNIT_OF_WORK"]:
+
+        @app.before_request
+        def begin_unit_of_work():
+            if isinstance(repository.repo_instance, SqlAlchemyRepository):
+                repository.repo_instance.begin_unit_of_work()
+
     @app.teardown_appcontext
     def shutdown_session(exception=None):
         if isinstance(repository.repo_instance, SqlAlchemyRepository):
+            repository.repo_instance.end_unit_of_work(exception)
             repository.repo_instance.close_session()
 
     return app
@@ -0,0 +1,175 @@
+from time import perf_counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import Table, func, insert, select, text
+
+from pets.adapters.orm import (
+    comments_table,
+    like_table,
+    pet_users_table,
+    posts_table,
+    user_following_table,
+    users_table,
+)
+from pets.domainmodel.Comment import Comment
+from pets.domainmodel.Like import Like
+from pets.domainmodel.PetUser import PetUser
+from pets.domainmodel.Post import Post
+
+
+def _user_row(user: PetUser) -> dict:
+    return {
+        "id": user.user_id,
+        "username": user.username,
+        "email": user.email,
+        "password_hash": user.password_hash,
+        "profile_picture_path": user.profile_picture_path,
+        "created_at": user.created_at,
+        "bio": user.bio,
+        "type": "pet_user",
+    }
+
+
+def _pet_user_row(user: PetUser) -> dict:
+    return {
+        "id": user.user_id,
+        "animal_type": user.animal_type,
+        "follower_ids": user.follower_ids,
+    }
+
+
+def _post_row(post: Post) -> dict:
+    return {
+        "id": post.id,
+        "user_id": post.user_id,
+        "caption": post.caption,
+        "views": post.views,
+        "created_at": post.created_at,
+        "width": post.size.width,
+        "height": post.size.height,
+        "tags": post.tags,
+        "media_path": post.media_path,
+        "media_type": post.media_type,
+        "like_count": post.like_count,
+        "comment_count": post.comment_count,
+    }
+
+
+def _comment_row(comment: Comment) -> dict:
+    return {
+        "id": comment.id,
+        "post_id": comment.post_id,
+        "user_id": comment.user_id,
+        "text": comment.comment_string,
+        "created_at": comment.created_at,
+        "likes": comment.likes,
+        "parent_id": comment.parent_id,
+        "path": comment.path,
+    }
+
+
+def _like_row(like: Like) -> dict:
+    return {
+        "id": like.id,
+        "user_id": like.user_id,
+        "post_id": like.post_id,
+        "created_at": like.created_at,
+    }
+
+
+class BulkLoader:
+    """Seeds an empty database with Core executemany inserts.
+
+    Each load_* call runs in one transaction and inserts a whole chunk per
+    statement, skipping the per-object SELECT that Session.merge issues.
+    Rows keep the ids they were read with.
+    """
+
+    def __init__(self, engine):
+        self.__engine = engine
+        # label -> (rows inserted, seconds taken)
+        self.__timings: Dict[str, Tuple[int, float]] = {}
+        self.__user_ids = set()
+
+    @property
+    def timings(self) -> Dict[str, Tuple[int, float]]:
+        return dict(self.__timings)
+
+    def load_pet_users(self, chunks: Iterable[List[PetUser]]) -> int:
+        def batches():
+            for chunk in chunks:
+                self.__user_ids.update(u.user_id for u in chunk)
+                yield [
+                    (users_table, [_user_row(u) for u in chunk]),
+                    (pet_users_table, [_pet_user_row(u) for u in chunk]),
+                ]
+
+        return self.__load("users", batches())
+
+    def load_posts(self, chunks: Iterable[List[Post]]) -> int:
+        return self.__load(
+            "posts",
+            ([(posts_table, [_post_row(p) for p in chunk])] for chunk in chunks),
+        )
+
+    def load_comments(self, chunks: Iterable[List[Comment]]) -> int:
+        return self.__load(
+            "comments",
+            ([(comments_table, [_comment_row(c) for c in chunk])] for chunk in chunks),
+        )
+
+    def load_likes(self, chunks: Iterable[List[Like]]) -> int:
+        return self.__load(
+            "likes",
+            ([(like_table, [_like_row(like) for like in chunk])] for chunk in chunks),
+        )
+
+    def load_followers(self, follower_id_lists: Iterable[Tuple[int, List[int]]]) -> int:
+        """(int followee_id, List[int] follower_ids), as add_multiple_followers.
+        Pairs naming users that weren't loaded are skipped."""
+        pairs = dict.fromkeys(
+            (follower_id, followee_id)
+            for followee_id, follower_ids in follower_id_lists
+            for follower_id in follower_ids
+            if follower_id in self.__user_ids and followee_id in self.__user_ids
+        )
+        rows = [{"follower_id": f, "followee_id": e} for f, e in pairs]
+        return self.__load("user_following", [[(user_following_table, rows)]])
+
+    def report(self) -> str:
+        lines = []
+        for label, (rows, seconds) in self.__timings.items():
+            rate = rows / seconds if seconds else float("inf")
+            lines.append(f"{label}: {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+        return "\n".join(lines)
+
+    def __load(
+        self, label: str, batches: Iterable[Sequence[Tuple[Table, List[dict]]]]
+    ) -> int:
+        start = perf_counter()
+        count = 0
+        tables = {}
+        with self.__engine.begin() as conn:
+            for inserts in batches:
+                for table, rows in inserts:
+                    if rows:
+                        conn.execute(insert(table), rows)
+                        tables[table.name] = table
+                count += len(inserts[0][1])
+            for table in tables.values():
+                self.__sync_sequence(conn, table)
+        self.__timings[label] = (count, perf_counter() - start)
+        return count
+
+    def __sync_sequence(self, conn, table: Table):
+        # Explicit ids don't advance PostgreSQL serial sequences, so later
+        # autoincrement inserts would collide with the seeded rows.
+        if conn.dialect.name != "postgresql" or "id" not in table.c:
+            return
+        if not table.c.id.autoincrement or table.c.id.foreign_keys:
+            return
+        max_id = conn.scalar(select(func.max(table.c.id)))
+        conn.execute(
+            text("SELECT setval(pg_get_serial_sequence(:table, 'id'), :value)"),
+            {"table": table.name, "value": max_id},
+        )
@@ -0,0 +1,167 @@
+"""Sharded post counters for like storms.
+
+Every like normally updates its post's like_count (and the post's card) in
+place, so when one post goes viral every writer waits on the same row lock.
+With a ShardedCounter, like and unlike instead add their +1 or -1 to one of
+a few post_counter_shards rows for the post, picked by hashing the liker, so
+concurrent likes spread over that many rows. Readers add the pending deltas
+to the stored counter, and compact() folds them back into posts and
+post_cards; CounterCompactor runs it every few seconds.
+"""
+
+import threading
+import traceback
+from typing import Callable, Dict, List
+
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from pets.adapters.orm import post_counter_shards_table, posts_table
+from pets.adapters.projections import set_post_card_count
+
+_STATEMENTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+class ShardedCounter:
+    """One posts counter column, spread over shards rows per post."""
+
+    def __init__(self, shards: int, column: str = "like_count"):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.__shards = shards
+        self.__column = column
+
+    @property
+    def shards(self) -> int:
+        return self.__shards
+
+    def shard_for(self, key: int) -> int:
+        # Ints hash to themselves, so consecutive user ids take turns.
+        return hash(key) % self.__shards
+
+    def add(self, conn, post_id: int, key: int, delta: int):
+        """Add delta to the post's counter on the shard key hashes to."""
+        table = post_counter_shards_table
+        row = {
+            "post_id": post_id,
+            "counter": self.__column,
+            "shard": self.shard_for(key),
+            "delta": delta,
+        }
+        upsert = _STATEMENTS.get(conn.dialect.name)
+        if upsert is not None:
+            stmt = upsert(table).values(**row)
+            conn.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["post_id", "counter", "shard"],
+                    set_={"delta": table.c.delta + stmt.excluded.delta},
+                )
+            )
+            return
+        shard = and_(
+            table.c.post_id == post_id,
+            table.c.counter == self.__column,
+            table.c.shard == row["shard"],
+        )
+        if conn.execute(
+            update(table).where(shard).values(delta=table.c.delta + delta)
+        ).rowcount:
+            return
+        try:
+            with conn.begin_nested():
+                conn.execute(insert(table).values(**row))
+        except IntegrityError:
+            # Another writer created the shard first.
+            conn.execute(update(table).where(shard).values(delta=table.c.delta + delta))
+
+    def pending(self, conn, post_ids: List[int]) -> Dict[int, int]:
+        """Deltas not yet compacted, by post; posts with none are left out."""
+        if not post_ids:
+            return {}
+        table = post_counter_shards_table
+        rows = conn.execute(
+            select(table.c.post_id, func.sum(table.c.delta))
+            .where(table.c.counter == self.__column, table.c.post_id.in_(post_ids))
+            .group_by(table.c.post_id)
+        )
+        return {post_id: total for post_id, total in rows if total}
+
+    def value(self, conn, post_id: int) -> int | None:
+        """The stored counter plus its pending deltas; None for no post."""
+        table = post_counter_shards_table
+        pending = (
+            select(func.coalesce(func.sum(table.c.delta), 0))
+            .where(table.c.counter == self.__column, table.c.post_id == post_id)
+            .scalar_subquery()
+        )
+        return conn.scalar(
+            select(posts_table.c[self.__column] + pending).where(
+                posts_table.c.id == post_id
+            )
+        )
+
+    def compact(self, conn) -> int:
+        """Fold every shard into posts and post_cards. Returns the number of
+        posts whose counter changed."""
+        table = post_counter_shards_table
+        # Deleting first claims exactly the deltas being folded: a like that
+        # lands meanwhile starts a fresh shard row for the next compaction.
+        claimed = conn.execute(
+            delete(table)
+            .where(table.c.counter == self.__column)
+            .returning(table.c.post_id, table.c.delta)
+        ).all()
+        totals: Dict[int, int] = {}
+        for post_id, delta in claimed:
+            totals[post_id] = totals.get(post_id, 0) + delta
+        column = posts_table.c[self.__column]
+        changed = 0
+        for post_id, delta in totals.items():
+            if not delta:
+                continue
+            value = conn.execute(
+                update(posts_table)
+                .where(posts_table.c.id == post_id)
+                .values({self.__column: column + delta})
+                .returning(column)
+            ).scalar()
+            if value is not None:
+                set_post_card_count(conn, post_id, self.__column, value)
+                changed += 1
+        return changed
+
+
+class CounterCompactor:
+    """Calls compact every interval seconds on a daemon thread."""
+
+    def __init__(self, compact: Callable[[], int], interval: float):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.__compact = compact
+        self.__interval = interval
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(
+            target=self.__run, name="pets-counter-compactor", daemon=True
+        )
+        self.__thread.start()
+
+    def close(self):
+        """Stop the thread after one last compaction."""
+        if self.__stop.is_set():
+            return
+        self.__stop.set()
+        self.__thread.join()
+
+    def __run(self):
+        while not self.__stop.wait(self.__interval):
+            self.__compact_once()
+        self.__compact_once()
+
+    def __compact_once(self):
+        try:
+            self.__compact()
+        except Exception:
+            # The shards keep their deltas; the next run tries again.
+            traceback.print_exc()
@@ -1,51 +1,169 @@
+import threading
 from abc import ABC
-from typing import List, Tuple
+from datetime import datetime
+from typing import Dict, List, Tuple
 from pathlib import Path
 
-from sqlalchemy import func, select, text, inspect
-from sqlalchemy.exc import OperationalError
-from sqlalchemy.orm import scoped_session
+from sqlalchemy import (
+    String,
+    and_,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    inspect,
+    type_coerce,
+    update,
+    event,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import raiseload, scoped_session, with_polymorphic
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.exc import NoResultFound
-
-
+from sqlalchemy.orm.util import identity_key
+
+
+from pets.adapters.bulk_loader import BulkLoader
+from pets.adapters.counters import ShardedCounter
+from pets.adapters.id_allocator import HiLoIdAllocator, IdAllocator
+from pets.adapters.migrations import add_post_counter_columns, recount_post_counters
+from pets.adapters.projections import (
+    diff_post_cards,
+    rebuild_post_cards,
+    refresh_post_cards,
+    refresh_user_post_cards,
+    set_post_card_count,
+)
+from pets.adapters.read_models import CommentView, PostCard, UserSummary
 from pets.adapters.repository import AbstractRepository
+from pets.adapters.user_cache import UserCache
+from pets.adapters.write_queue import WriteOperation, WriteQueue
 from pets.domainmodel.User import User
 from pets.domainmodel.PetUser import PetUser
 from pets.domainmodel.HumanUser import HumanUser
 from pets.domainmodel.Post import Post
-from pets.domainmodel.Comment import Comment
+from pets.domainmodel.Comment import MAX_DEPTH, PATH_WIDTH, Comment, thread_path
 from pets.domainmodel.Like import Like
 
 from pets.adapters.orm import users_table
 from pets.adapters.orm import posts_table
 from pets.adapters.orm import comments_table
 from pets.adapters.orm import like_table
+from pets.adapters.orm import comment_likes_table
 from pets.adapters.orm import user_following_table
+from pets.adapters.orm import pet_users_table
+from pets.adapters.orm import post_cards_table
+from pets.adapters.orm import post_counter_shards_table
 
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+
+
+def _older_than(created_at, id, before_created_at: datetime, before_id: int):
+    # Keyset condition: rows after the (created_at, id) cursor, newest first.
+    return or_(
+        created_at < before_created_at,
+        and_(created_at == before_created_at, id < before_id),
+    )
+
+
+def _newer_than(created_at, id, after_created_at: datetime, after_id: int):
+    # Keyset condition: rows after the (created_at, id) cursor, oldest first.
+    return or_(
+        created_at > after_created_at,
+        and_(created_at == after_created_at, id > after_id),
+    )
+
+
+def _raise_on_lazy_load(orm_execute_state):
+    # Objects loaded by a top-level query get every relationship set to
+    # raise instead of lazy loading; loads the identity map can answer still
+    # work. A method that walks a relationship must load it in its query.
+    state = orm_execute_state
+    if state.is_select and not state.is_relationship_load:
+        state.statement = state.statement.options(raiseload("*", sql_only=True))
+
+
+def _in_subtree(path, root_path):
+    # root_path and everything beneath it: "/" is the only character that
+    # follows a path segment, and it sorts just before "0".
+    return and_(path >= root_path, path < root_path + "0")
 
 
 class SessionContextManager:
+    """Hands each repository method the thread's scoped session.
+
+    Outside a unit of work commit() commits, and a `with` block that leaves
+    unsaved ORM changes behind (or raises) rolls them back. A block that
+    only read ends its transaction with a commit instead: a rollback would
+    expire every loaded object, so the caller's first attribute access would
+    reload it. That needs a session factory with expire_on_commit=False.
+
+    Inside a unit of work (begin_unit_of_work .. end_unit_of_work, e.g. one
+    HTTP request) the blocks share a single transaction and identity map:
+    commit() only flushes, rollback() is left to end_unit_of_work, and the
+    transaction is committed or rolled back once at the end.
+    """
+
     def __init__(self, session_factory):
         self.__session_factory = session_factory
         self.__session = scoped_session(self.__session_factory)
+        self.__local = threading.local()
 
     def __enter__(self):
         return self
 
-    def __exit__(self, *args):
-        self.rollback()
+    def __exit__(self, exc_type, *args):
+        if self.in_unit_of_work:
+            return
+        session = self.__session()
+        if exc_type is not None or session.new or session.dirty or session.deleted:
+            session.rollback()
+        elif session.in_transaction():
+            session.commit()
 
     @property
     def session(self):
         return self.__session
 
+    @property
+    def in_unit_of_work(self) -> bool:
+        return getattr(self.__local, "unit_of_work", False)
+
+    def begin_unit_of_work(self):
+        self.__local.unit_of_work = True
+
+    def end_unit_of_work(self, exception: BaseException | None = None):
+        if not self.in_unit_of_work:
+            return
+        self.__local.unit_of_work = False
+        try:
+            if exception is None:
+                self.__session.commit()
+            else:
+                self.__session.rollback()
+        except Exception:
+            self.__session.rollback()
+            raise
+        finally:
+            self.close_current_session()
+
     def commit(self) -> object:
-        self.__session.commit()
+        if self.in_unit_of_work:
+            # Send the changes (and get generated ids) without ending the
+            # request's transaction.
+            self.__session.flush()
+        else:
+            self.__session.commit()
 
     def rollback(self):
-        self.__session.rollback()
+        if not self.in_unit_of_work:
+            self.__session.rollback()
 
     def reset_session(self):
         # this method can be used e.g. to allow Flask to start a new session for each http request,
@@ -61,16 +179,88 @@ class SessionContextManager:
 class SqlAlchemyRepository(AbstractRepository, ABC):
     _temp_users: List[User]
 
-    def __init__(self, session_factory, database_uri: str):
+    def __init__(
+        self,
+        session_factory,
+        engine: Engine,
+        id_allocator: IdAllocator | None = None,
+        write_queue: WriteQueue | None = None,
+        user_cache: UserCache | None = None,
+        like_counter: ShardedCounter | None = None,
+        strict_loading: bool = False,
+    ):
         self._session_cm = SessionContextManager(session_factory)
-        self._engine = create_engine(database_uri, future=True)
+        # The same engine session_factory is bound to, so every query shares
+        # one connection pool.
+        self._engine = engine
         self._session_factory = sessionmaker(bind=self._engine, expire_on_commit=False)
         self._temp_users = []
+        # Posts, comments and likes take their ids from the database on insert.
+        # Users need an id before they are stored (temp users), so every user
+        # id comes from this allocator instead.
+        self._id_allocator = id_allocator or HiLoIdAllocator(self._engine)
+        # Likes, comments and follows go through this single writer (group
+        # commit) when set, instead of committing one by one.
+        self._write_queue = write_queue
+        # Relationships that a read didn't load raise when touched instead of
+        # lazy loading one query at a time (catches N+1 queries in tests).
+        if strict_loading:
+            event.listen(session_factory, "do_orm_execute", _raise_on_lazy_load)
+        # Users by id across requests; get_user_by_id merges hits into the
+        # current session without a query.
+        self._user_cache = user_cache
+        # Users changed inside this thread's unit of work, forgotten again
+        # once it commits.
+        self._changed_users = threading.local()
+        # Likes land on shard rows instead of posts.like_count when set, and
+        # like counts read back include the shards (see pets.adapters.counters).
+        self._like_counter = like_counter
+
+    def bulk_loader(self) -> BulkLoader:
+        # Core executemany inserts for seeding an empty database.
+        return BulkLoader(self._engine)
+
+    def _assign_user_id(self, user: User):
+        if user.user_id is None:
+            user.user_id = self.next_user_id()
+
+    def next_user_id(self) -> int:
+        return self._id_allocator.next_id("users")
+
+    def _write(self, operation: WriteOperation):
+        # Runs operation(connection) and commits, either batched on the
+        # writer thread or in the current session's transaction. A unit of
+        # work keeps its writes in its own transaction, so it skips the queue.
+        if self._write_queue is not None and not self._session_cm.in_unit_of_work:
+            return self._write_queue.execute(operation)
+        with self._session_cm as scm:
+            result = operation(scm.session.connection())
+            scm.commit()
+            return result
+
+    def begin_unit_of_work(self):
+        """Share one session and transaction across the following repository
+        calls on this thread until end_unit_of_work."""
+        self._session_cm.begin_unit_of_work()
+
+    def end_unit_of_work(self, exception: BaseException | None = None):
+        """Commit the unit of work, or roll it back if it ended in an
+        exception, and close its session."""
+        self._session_cm.end_unit_of_work(exception)
+        changed = getattr(self._changed_users, "ids", None)
+        if changed:
+            self._user_cache.invalidate(*changed)
+            changed.clear()
+
+    def close_write_queue(self):
+        if self._write_queue is not None:
+            self._write_queue.close()
 
     def add_multiple_pet_users(self, users: List[PetUser]):
         with self._session_cm as scm:
             with scm.session.no_autoflush:
                 for user in users:
+                    self._assign_user_id(user)
                     scm.session.add(user)
             scm.commit()
 
@@ -79,6 +269,8 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
             with scm.session.no_autoflush:
                 for post in posts:
                     scm.session.merge(post)
+            scm.session.flush()
+            refresh_post_cards(scm.session, [post.id for post in posts])
             scm.commit()
 
     def add_multiple_likes(self, likes: List[Like]):
@@ -113,6 +305,7 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
         with self._session_cm as scm:
             with scm.session.no_autoflush:
                 for user in users:
+                    self._assign_user_id(user)
                     scm.session.add(user)
             scm.commit()
 
@@ -123,11 +316,8 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
 
     def get_pet_user_by_id(self, user_id: int) -> PetUser | None:
         with self._session_cm as scm:
-            try:
-                user = scm.session.query(PetUser).filter(PetUser.id == user_id).one()
-                return user
-            except NoResultFound:
-                return None
+            # Answered from the identity map when already loaded.
+            return scm.session.get(PetUser, user_id)
 
     def get_pet_user_by_name(self, username: str) -> PetUser | None:
         from pets.adapters.orm import users_table
@@ -154,12 +344,8 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
         from datetime import datetime, UTC
 
         with self._session_cm as scm:
-            # determine next post ID
-            max_id = scm.session.scalar(select(func.max(posts_table.c.id)))
-            next_id = 1 if max_id is None else int(max_id) + 1
-
             post = Post(
-                id=next_id,
+                id=None,
                 user_id=user.user_id,
                 caption=caption,
                 created_at=datetime.now(UTC),
@@ -172,6 +358,8 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
             )
             with scm.session.no_autoflush:
                 scm.session.add(post)
+            scm.session.flush()
+            refresh_post_cards(scm.session, [post.id])
             scm.commit()
             print(post)
             return post
@@ -180,6 +368,8 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
         with self._session_cm as scm:
             with scm.session.no_autoflush:
                 scm.session.add(post)
+            scm.session.flush()
+            refresh_post_cards(scm.session, [post.id])
             scm.commit()
 
     def get_photo_posts(self) -> List[Post]:
@@ -200,17 +390,36 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
 
     def delete_post(self, user: PetUser, post: Post):
         with self._session_cm as scm:
+            scm.session.execute(
+                delete(post_counter_shards_table).where(
+                    post_counter_shards_table.c.post_id == post.id
+                )
+            )
+            scm.session.execute(
+                delete(comment_likes_table).where(
+                    comment_likes_table.c.comment_id.in_(
+                        select(comments_table.c.id).where(
+                            comments_table.c.post_id == post.id
+                        )
+                    )
+                )
+            )
+            # Unlink replies first: the cascade deletes comments one by one,
+            # in no particular order.
+            scm.session.execute(
+                update(comments_table)
+                .where(comments_table.c.post_id == post.id)
+                .values(parent_id=None)
+            )
             with scm.session.no_autoflush:
                 scm.session.delete(post)
+            scm.session.flush()
+            refresh_post_cards(scm.session, [post.id])
             scm.commit()
 
     def get_post_by_id(self, id: int) -> Post | None:
         with self._session_cm as scm:
-            try:
-                post = scm.session.query(Post).filter(posts_table.c.id == id).one()
-                return post
-            except NoResultFound:
-                return None
+            return scm.session.get(Post, id)
 
     def get_total_user_size(self) -> int:
         with self._session_cm as scm:
@@ -262,6 +471,7 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
             return int((pet_user_count or 0) + (human_user_count or 0))
 
     def add_human_user(self, user: User):
+        self._assign_user_id(user)
         with self._session_cm as scm:
             with scm.session.no_autoflush:
                 scm.session.add(user)
@@ -271,6 +481,7 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
         with self._session_cm as scm:
             with scm.session.no_autoflush:
                 for user in users:
+                    self._assign_user_id(user)
                     scm.session.add(user)
             scm.commit()
 
@@ -288,11 +499,70 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
 
     def get_human_user_by_id(self, user_id: int) -> User | None:
         with self._session_cm as scm:
-            try:
-                user = scm.session.query(User).filter(users_table.c.id == user_id).one()
-                return user
-            except NoResultFound:
-                return None
+            return scm.session.get(User, user_id)
+
+    def _polymorphic_users(self):
+        # users LEFT OUTER JOIN pet_users, human_users: every subclass's
+        # columns come back in the one query.
+        user = with_polymorphic(User, [PetUser, HumanUser])
+        return select(user)
+
+    def get_user_by_name(self, username: str) -> User | None:
+        with self._session_cm as scm:
+            user = scm.session.scalars(
+                self._polymorphic_users().where(users_table.c.username == username)
+            ).one_or_none()
+        return user or self.get_temp_user_by_name(username)
+
+    def get_user_by_id(self, user_id: int) -> User | None:
+        with self._session_cm as scm:
+            user = scm.session.identity_map.get(identity_key(User, user_id))
+            if user is None and self._user_cache is not None:
+                cached = self._user_cache.get(user_id)
+                if cached is not None:
+                    # Attaches a copy of the cached state; no SQL.
+                    user = scm.session.merge(cached, load=False)
+            if user is None:
+                user = scm.session.scalars(
+                    self._polymorphic_users().where(users_table.c.id == user_id)
+                ).one_or_none()
+                if user is not None and self._user_cache is not None:
+                    self._cache_user(user)
+        return user or self.get_temp_user_by_id(user_id)
+
+    def _cache_user(self, user: User):
+        # Cache a detached copy rather than the instance handed to the
+        # caller, which may be changed or lazily loaded in its session.
+        with self._session_factory() as scratch:
+            self._user_cache.put(user.user_id, scratch.merge(user, load=False))
+
+    def _forget_users(self, *user_ids: int):
+        if self._user_cache is None:
+            return
+        self._user_cache.invalidate(*user_ids)
+        if self._session_cm.in_unit_of_work:
+            # Until it commits, another request can still cache the old rows.
+            if not hasattr(self._changed_users, "ids"):
+                self._changed_users.ids = set()
+            self._changed_users.ids.update(user_ids)
+
+    def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+        with self._session_cm as scm:
+            found = {
+                user.user_id: user
+                for user in scm.session.scalars(
+                    self._polymorphic_users().where(users_table.c.id.in_(user_ids))
+                )
+            }
+        found.update(
+            (user.user_id, user)
+            for user in self._temp_users
+            if user.user_id in user_ids and user.user_id not in found
+        )
+        return [found[user_id] for user_id in user_ids if user_id in found]
 
     def get_human_users(self) -> List[type[User]]:
         with self._session_cm as scm:
@@ -300,6 +570,7 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
             return users
 
     def add_pet_user(self, user: PetUser):
+        self._assign_user_id(user)
         with self._session_cm as scm:
             with scm.session.no_autoflush:
                 scm.session.add(user)
@@ -329,27 +600,182 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
             )
             return comments
 
-    def get_max_like_id(self) -> int:
-        with self._session_cm as scm:
-            max_id = scm.session.scalar(select(func.max(like_table.c.id)))
-            return 1 if max_id is None else int(max_id) + 1
-
     def create_like(self, user: User, post: Post) -> Like:
         from datetime import datetime
-        max_like_id = self.get_max_like_id()
+
+        # id is left to the database's autoincrement on insert
         return Like(
-            id=max_like_id + 1,
+            id=None,
             user_id=user.user_id,
             post_id=post.id,
             created_at=datetime.now(),
         )
 
+    def _adjust_post_counter(
+        self, conn, post_id: int, column: str, delta: int
+    ) -> int | None:
+        # Single UPDATE so concurrent writers never lose an increment; returns
+        # the new value, or None when the post does not exist. conn may be a
+        # Connection or a Session. The post's card gets the same value.
+        value = conn.execute(
+            update(posts_table)
+            .where(posts_table.c.id == post_id)
+            .values({column: posts_table.c[column] + delta})
+            .returning(posts_table.c[column])
+        ).scalar()
+        if value is not None:
+            set_post_card_count(conn, post_id, column, value)
+        return value
+
+    def _adjust_like_count(
+        self, conn, post_id: int, user_id: int, delta: int
+    ) -> int | None:
+        # _adjust_post_counter for like_count, on the liker's shard when
+        # counters are sharded.
+        if self._like_counter is None:
+            return self._adjust_post_counter(conn, post_id, "like_count", delta)
+        self._like_counter.add(conn, post_id, user_id, delta)
+        return self._like_counter.value(conn, post_id)
+
+    def _current_like_count(self, conn, post_id: int) -> int | None:
+        # The post's like_count plus any pending shards; None for no post.
+        if self._like_counter is not None:
+            return self._like_counter.value(conn, post_id)
+        return conn.scalar(
+            select(posts_table.c.like_count).where(posts_table.c.id == post_id)
+        )
+
+    def _with_pending_likes(self, conn, cards: List[PostCard]) -> List[PostCard]:
+        if self._like_counter is None:
+            return cards
+        pending = self._like_counter.pending(conn, [card.id for card in cards])
+        return [
+            card._replace(like_count=card.like_count + pending[card.id])
+            if card.id in pending
+            else card
+            for card in cards
+        ]
+
+    def compact_counters(self) -> int:
+        """Fold sharded like counts into posts and their cards. Returns the
+        number of posts updated."""
+        if self._like_counter is None:
+            return 0
+        return self._write(self._like_counter.compact)
+
+    def _insert_ignoring_conflicts(
+        self, conn, table, from_select=None, **values
+    ) -> bool:
+        """INSERT ... ON CONFLICT DO NOTHING; returns whether a row was added.
+        from_select, a (column names, select) pair, inserts the select's row
+        instead of values."""
+
+        def rows(stmt):
+            if from_select is not None:
+                return stmt.from_select(*from_select)
+            return stmt.values(**values)
+
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            stmt = rows(sqlite_insert(table)).on_conflict_do_nothing()
+        elif dialect == "postgresql":
+            stmt = rows(postgresql_insert(table)).on_conflict_do_nothing()
+        else:
+            try:
+                with conn.begin_nested():
+                    conn.execute(rows(insert(table)))
+                return True
+            except IntegrityError:
+                return False
+        return conn.execute(stmt).rowcount > 0
+
+    def toggle_like(self, user_id: int, post_id: int) -> Tuple[bool, int] | None:
+        from datetime import datetime, UTC
+
+        def toggle(conn):
+            deleted = conn.execute(
+                delete(like_table).where(
+                    like_table.c.user_id == user_id, like_table.c.post_id == post_id
+                )
+            ).rowcount
+            if deleted:
+                like_count = self._adjust_like_count(conn, post_id, user_id, -deleted)
+                return None if like_count is None else (False, like_count)
+            # Inserting from the post row itself records nothing for a post
+            # that doesn't exist.
+            created_at = literal(datetime.now(UTC), like_table.c.created_at.type)
+            post = select(literal(user_id), posts_table.c.id, created_at).where(
+                posts_table.c.id == post_id
+            )
+            inserted = self._insert_ignoring_conflicts(
+                conn,
+                like_table,
+                from_select=(["user_id", "post_id", "created_at"], post),
+            )
+            if inserted:
+                return True, self._adjust_like_count(conn, post_id, user_id, 1)
+            # A concurrent request already liked it, or there is no such post.
+            like_count = self._current_like_count(conn, post_id)
+            return None if like_count is None else (True, like_count)
+
+        return self._write(toggle)
+
+    def like_comment(
+        self, user_id: int, post_id: int, comment_id: int
+    ) -> Tuple[bool, int] | None:
+        from datetime import datetime, UTC
+
+        def like(conn):
+            # Inserting from the comment row itself records nothing for a
+            # comment that isn't under post_id.
+            created_at = literal(
+                datetime.now(UTC), comment_likes_table.c.created_at.type
+            )
+            comment = select(comments_table.c.id, literal(user_id), created_at).where(
+                comments_table.c.id == comment_id,
+                comments_table.c.post_id == post_id,
+            )
+            inserted = self._insert_ignoring_conflicts(
+                conn,
+                comment_likes_table,
+                from_select=(["comment_id", "user_id", "created_at"], comment),
+            )
+            if inserted:
+                likes = conn.execute(
+                    update(comments_table)
+                    .where(
+                        comments_table.c.id == comment_id,
+                        comments_table.c.post_id == post_id,
+                    )
+                    .values(likes=comments_table.c.likes + 1)
+                    .returning(comments_table.c.likes)
+                ).scalar()
+                return True, likes
+            # Already liked by this user, or no such comment under the post.
+            likes = conn.scalar(
+                select(comments_table.c.likes).where(
+                    comments_table.c.id == comment_id,
+                    comments_table.c.post_id == post_id,
+                )
+            )
+            return None if likes is None else (False, likes)
+
+        return self._write(like)
+
     def add_like(self, user: User, post: Post):
-        like = self.create_like(user, post)
-        with self._session_cm as scm:
-            with scm.session.no_autoflush:
-                scm.session.add(like)
-            scm.commit()
+        from datetime import datetime, UTC
+
+        user_id, post_id = user.user_id, post.id
+
+        def add(conn):
+            conn.execute(
+                insert(like_table).values(
+                    user_id=user_id, post_id=post_id, created_at=datetime.now(UTC)
+                )
+            )
+            self._adjust_like_count(conn, post_id, user_id, 1)
+
+        self._write(add)
 
     def delete_like(self, user: User, post: Post):
         print("deleting like for post", post.id, "by user", user.user_id)
@@ -365,6 +791,9 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
                 )
                 with scm.session.no_autoflush:
                     scm.session.delete(db_like)
+                self._adjust_like_count(
+                    scm.session.connection(), post.id, user.user_id, -1
+                )
                 scm.commit()
             except NoResultFound:
                 scm.rollback()
@@ -381,104 +810,221 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
                     )
                     .one()
                 )
+                post_id = db_comment.post_id
+                subtree = select(comments_table.c.id).where(
+                    comments_table.c.post_id == post_id,
+                    _in_subtree(comments_table.c.path, db_comment.path),
+                )
+                scm.session.execute(
+                    delete(comment_likes_table).where(
+                        comment_likes_table.c.comment_id.in_(subtree)
+                    )
+                )
+                # Replies go with the comment they answer.
+                replies = scm.session.execute(
+                    delete(comments_table).where(
+                        comments_table.c.post_id == post_id,
+                        comments_table.c.path > db_comment.path,
+                        _in_subtree(comments_table.c.path, db_comment.path),
+                    )
+                ).rowcount
                 with scm.session.no_autoflush:
                     scm.session.delete(db_comment)
+                self._adjust_post_counter(
+                    scm.session, post_id, "comment_count", -1 - replies
+                )
                 scm.commit()
             except NoResultFound:
                 scm.rollback()
 
     def get_posts_thumbnails(self, user_id: int) -> List[dict]:
-        user = self.get_pet_user_by_id(user_id)
-        with self._session_cm as scm:
-            posts = (
-                scm.session.query(Post)
-                .filter(
-                    posts_table.c.user_id == user_id,
+        return_posts = []
+        user = None
+        for card in self.get_user_cards(user_id):
+            if card.media_type == "photo":
+                return_posts.append(
+                    {
+                        "id": card.id,
+                        "media_path": card.media_path,
+                        "media_type": card.media_type,
+                    }
                 )
-                .all()
+                continue
+            # Only videos need the full post, to find or cut a thumbnail.
+            user = user or self.get_pet_user_by_id(user_id)
+            video_post_thumbnail = self.get_video_thumbnail(
+                self.get_post_by_id(card.id), user
             )
-            posts.sort(key=lambda p: p.created_at, reverse=True)
-            return_posts = []
-            for post in posts:
-                if post.media_type == "photo":
-                    return_posts.append(
-                        {
-                            "id": post.id,
-                            "media_path": str(post.media_path),
-                            "media_type": post.media_type,
-                        }
-                    )
-                else:
-                    video_post_thumbnail = self.get_video_thumbnail(post, user)
-                    return_posts.append(
-                        {
-                            "id": post.id,
-                            "media_path": str(video_post_thumbnail.media_path),
-                            "media_type": video_post_thumbnail.media_type,
-                        }
-                    )
-            return return_posts
-
-    def next_comment_id(self) -> int:
-        with self._session_cm as scm:
-            max_id = scm.session.scalar(select(func.max(comments_table.c.id)))
-            return 1 if max_id is None else int(max_id) + 1
+            return_posts.append(
+                {
+                    "id": card.id,
+                    "media_path": str(video_post_thumbnail.media_path),
+                    "media_type": video_post_thumbnail.media_type,
+                }
+            )
+        return return_posts
 
-    def create_comment(self, user: User, post: Post, text: str) -> Comment:
+    def create_comment(
+        self, user: User, post: Post, text: str, parent_id: int | None = None
+    ) -> Comment:
         from datetime import datetime, UTC
 
-        with self._session_cm as scm:
-            cid = self.next_comment_id()
-            comment = Comment(
-                id=cid,
-                post_id=post.id,
-                user_id=user.user_id,
-                created_at=datetime.now(UTC),
-                comment_string=text,
-                likes=0,
+        user_id, post_id = user.user_id, post.id
+        created_at = datetime.now(UTC)
+
+        def create(conn):
+            parent_path = None
+            if parent_id is not None:
+                parent_path = conn.scalar(
+                    select(comments_table.c.path).where(
+                        comments_table.c.id == parent_id,
+                        comments_table.c.post_id == post_id,
+                    )
+                )
+                if parent_path is None:
+                    raise ValueError("Parent comment not found")
+                if parent_path.count("/") >= MAX_DEPTH:
+                    raise ValueError("Replies nest too deeply")
+            comment_id = conn.execute(
+                insert(comments_table)
+                .values(
+                    post_id=post_id,
+                    user_id=user_id,
+                    text=text,
+                    created_at=created_at,
+                    likes=0,
+                    parent_id=parent_id,
+                )
+                .returning(comments_table.c.id)
+            ).scalar_one()
+            # The path ends in the comment's own id, known only now.
+            path = thread_path(comment_id, parent_path)
+            conn.execute(
+                update(comments_table)
+                .where(comments_table.c.id == comment_id)
+                .values(path=path)
             )
-            with scm.session.no_autoflush:
-                scm.session.add(comment)
+            self._adjust_post_counter(conn, post_id, "comment_count", 1)
+            return comment_id, path
+
+        comment_id, path = self._write(create)
+        return Comment(
+            id=comment_id,
+            post_id=post_id,
+            user_id=user_id,
+            created_at=created_at,
+            comment_string=text,
+            likes=0,
+            parent_id=parent_id,
+            path=path,
+        )
+
+    def backfill_post_counters(self) -> int:
+        """Recompute posts.like_count/comment_count from the likes and comments
+        tables, adding the columns first on databases created before they
+        existed. Returns the number of posts updated."""
+        with self._session_cm as scm:
+            conn = scm.session.connection()
+            add_post_counter_columns(conn)
+            # The recount already includes every sharded like.
+            if inspect(conn).has_table(post_counter_shards_table.name):
+                conn.execute(delete(post_counter_shards_table))
+            updated = recount_post_counters(conn)
+            # The cards copy the counters.
+            rebuild_post_cards(conn)
             scm.commit()
-            return comment
+            return updated
 
-    def add_like_to_comment(self, comment: Comment):
+    def check_post_cards(self, repair: bool = False) -> Dict[str, List[int]]:
+        """Compare post_cards with a fresh rebuild; see
+        pets.adapters.projections.diff_post_cards. With repair, rebuild it
+        when they differ."""
         with self._session_cm as scm:
-            try:
-                db_comment = (
-                    scm.session.query(Comment)
-                    .filter(comments_table.c.id == comment.id)
-                    .one()
-                )
-                db_comment.add_like()
-                with scm.session.no_autoflush:
-                    scm.session.merge(db_comment)
+            conn = scm.session.connection()
+            diff = diff_post_cards(conn)
+            if repair and any(diff.values()):
+                rebuild_post_cards(conn)
                 scm.commit()
-            except NoResultFound:
-                scm.rollback()
+            return diff
+
+    def get_engagement(
+        self, post_ids: List[int], viewer_id: int | None
+    ) -> Dict[int, dict]:
+        if not post_ids:
+            return {}
+        with self._session_cm as scm:
+            # One grouped query: the outer join only matches the viewer's like.
+            rows = scm.session.execute(
+                select(
+                    posts_table.c.id,
+                    posts_table.c.like_count,
+                    posts_table.c.comment_count,
+                    func.count(like_table.c.id).label("liked"),
+                )
+                .select_from(posts_table)
+                .outerjoin(
+                    like_table,
+                    and_(
+                        like_table.c.post_id == posts_table.c.id,
+                        like_table.c.user_id == viewer_id,
+                    ),
+                )
+                .where(posts_table.c.id.in_(post_ids))
+                .group_by(posts_table.c.id)
+            ).all()
+            engagement = {
+                row.id: {
+                    "likes_count": row.like_count,
+                    "comments_count": row.comment_count,
+                    "liked": row.liked > 0,
+                }
+                for row in rows
+            }
+            if self._like_counter is not None:
+                pending = self._like_counter.pending(scm.session.connection(), post_ids)
+                for post_id, delta in pending.items():
+                    if post_id in engagement:
+                        engagement[post_id]["likes_count"] += delta
+            return engagement
+
+    def add_like_to_comment(self, comment: Comment):
+        comment_id = comment.id
+
+        def like(conn):
+            return conn.execute(
+                update(comments_table)
+                .where(comments_table.c.id == comment_id)
+                .values(likes=comments_table.c.likes + 1)
+                .returning(comments_table.c.likes)
+            ).scalar()
+
+        likes = self._write(like)
+        if likes is not None:
+            # Show the new count without marking a session-loaded comment dirty.
+            set_committed_value(comment, "_Comment__likes", likes)
 
     def close_session(self):
         self._session_cm.close_current_session()
 
     def follow_user(self, follower: User, followee: PetUser):
-        with self._session_cm as scm:
-            from sqlalchemy import insert
-
-            # Check if already following
-            if self.is_following(follower.user_id, followee.user_id):
-                return
-
-            # Insert into association table
-            scm.session.execute(
-                insert(user_following_table).values(
-                    follower_id=follower.user_id, followee_id=followee.user_id
-                )
+        follower_id, followee_id = follower.user_id, followee.user_id
+
+        def follow(conn):
+            return self._insert_ignoring_conflicts(
+                conn,
+                user_following_table,
+                follower_id=follower_id,
+                followee_id=followee_id,
             )
-            scm.commit()
 
-            # Update domain models
-            follower.follow(followee)
-            followee.add_follower(follower.user_id)
+        if not self._write(follow):
+            # Already following
+            return
+        self._forget_users(follower_id, followee_id)
+
+        # Update domain models
+        follower.follow(followee)
+        followee.add_follower(follower.user_id)
 
     def unfollow_user(self, follower: User, followee: PetUser):
         with self._session_cm as scm:
@@ -496,6 +1042,7 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
                 )
             )
             scm.commit()
+            self._forget_users(follower.user_id, followee.user_id)
 
             # Update domain models
             follower.unfollow(followee)
@@ -518,13 +1065,17 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
         with self._session_cm as scm:
             with scm.session.no_autoflush:
                 scm.session.merge(user)
+            scm.session.flush()
+            # Their cards show the username and avatar.
+            refresh_user_post_cards(scm.session, user.user_id)
             scm.commit()
+        self._forget_users(user.user_id)
 
     def get_followers(self, user: User) -> List[User]:
         target_id = int(getattr(user, "user_id"))
-        with self._session_factory() as session:
+        with self._session_cm as scm:
             return (
-                session.query(users_table)
+                scm.session.query(users_table)
                 .join(
                     user_following_table,
                     users_table.c.id == user_following_table.c.follower_id,
@@ -535,16 +1086,44 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
 
     def add_multiple_followers(self, follower_id_lists: Tuple[int, List[int]]):
         """(int followee_id, List[int] follower_ids)"""
+        pairs = dict.fromkeys(
+            (follower_id, followee_id)
+            for followee_id, follower_ids in follower_id_lists
+            for follower_id in follower_ids
+        )
+        if not pairs:
+            return
+        follower_ids = {f for f, _ in pairs}
+        followee_ids = {e for _, e in pairs}
         with self._session_cm as scm:
-            for followee_id, follower_ids in follower_id_lists:
-                for follower_id in follower_ids:
-                    follower = self.get_pet_user_by_id(
-                        follower_id
-                    ) or self.get_human_user_by_id(follower_id)
-                    followee = self.get_pet_user_by_id(followee_id)
-                    if follower is None or followee is None:
-                        continue
-                    self.follow_user(follower, followee)
+            # Three set-based reads instead of lookups per pair.
+            users = set(
+                scm.session.scalars(
+                    select(users_table.c.id).where(users_table.c.id.in_(follower_ids))
+                )
+            )
+            pets = set(
+                scm.session.scalars(
+                    select(pet_users_table.c.id).where(
+                        pet_users_table.c.id.in_(followee_ids)
+                    )
+                )
+            )
+            existing = set(
+                scm.session.execute(
+                    select(
+                        user_following_table.c.follower_id,
+                        user_following_table.c.followee_id,
+                    ).where(user_following_table.c.followee_id.in_(followee_ids))
+                ).tuples()
+            )
+            rows = [
+                {"follower_id": f, "followee_id": e}
+                for f, e in pairs
+                if f in users and e in pets and (f, e) not in existing
+            ]
+            if rows:
+                scm.session.execute(insert(user_following_table), rows)
             scm.commit()
 
     def get_video_thumbnail(self, post: Post, user: User) -> Post:
@@ -644,6 +1223,183 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
             posts = scm.session.query(Post).all()
             return posts
 
+    def get_feed_page(
+        self, before_created_at: datetime | None, before_id: int | None, limit: int
+    ) -> List[Post]:
+        with self._session_cm as scm:
+            query = scm.session.query(Post)
+            if before_created_at is not None and before_id is not None:
+                query = query.filter(
+                    _older_than(
+                        posts_table.c.created_at,
+                        posts_table.c.id,
+                        before_created_at,
+                        before_id,
+                    )
+                )
+            posts = (
+                query.order_by(posts_table.c.created_at.desc(), posts_table.c.id.desc())
+                .limit(limit)
+                .all()
+            )
+            return posts
+
+    def get_feed_cards(
+        self, before_created_at: datetime | None, before_id: int | None, limit: int
+    ) -> List[PostCard]:
+        cards = post_cards_table.c
+        stmt = select(post_cards_table)
+        if before_created_at is not None and before_id is not None:
+            stmt = stmt.where(
+                _older_than(
+                    cards.created_at, cards.post_id, before_created_at, before_id
+                )
+            )
+        stmt = stmt.order_by(cards.created_at.desc(), cards.post_id.desc()).limit(limit)
+        with self._session_cm as scm:
+            return self._with_pending_likes(
+                scm.session,
+                [PostCard._make(row) for row in scm.session.execute(stmt)],
+            )
+
+    def get_user_cards(self, user_id: int) -> List[PostCard]:
+        cards = post_cards_table.c
+        stmt = (
+            select(post_cards_table)
+            .where(cards.user_id == user_id)
+            .order_by(cards.created_at.desc(), cards.post_id.desc())
+        )
+        with self._session_cm as scm:
+            return self._with_pending_likes(
+                scm.session,
+                [PostCard._make(row) for row in scm.session.execute(stmt)],
+            )
+
+    def _comment_views(self, post_id: int):
+        return (
+            select(
+                comments_table.c.id,
+                comments_table.c.post_id,
+                comments_table.c.user_id,
+                users_table.c.username,
+                type_coerce(users_table.c.profile_picture_path, String),
+                comments_table.c.text,
+                comments_table.c.created_at,
+                comments_table.c.likes,
+                comments_table.c.parent_id,
+                comments_table.c.path,
+            )
+            .outerjoin(users_table, users_table.c.id == comments_table.c.user_id)
+            .where(comments_table.c.post_id == post_id)
+        )
+
+    def get_comment_views(self, post_id: int) -> List[CommentView]:
+        stmt = self._comment_views(post_id).order_by(
+            comments_table.c.created_at, comments_table.c.id
+        )
+        with self._session_cm as scm:
+            return [CommentView._make(row) for row in scm.session.execute(stmt)]
+
+    def get_comment_views_page(
+        self,
+        post_id: int,
+        cursor_created_at: datetime | None,
+        cursor_id: int | None,
+        limit: int,
+        newest_first: bool = False,
+    ) -> List[CommentView]:
+        # Walks ix_comments_post_id_created_at_id in either direction.
+        created_at, id = comments_table.c.created_at, comments_table.c.id
+        stmt = self._comment_views(post_id).where(comments_table.c.parent_id.is_(None))
+        if newest_first:
+            if cursor_created_at is not None and cursor_id is not None:
+                stmt = stmt.where(
+                    _older_than(created_at, id, cursor_created_at, cursor_id)
+                )
+            stmt = stmt.order_by(created_at.desc(), id.desc())
+        else:
+            if cursor_created_at is not None and cursor_id is not None:
+                stmt = stmt.where(
+                    _newer_than(created_at, id, cursor_created_at, cursor_id)
+                )
+            stmt = stmt.order_by(created_at, id)
+        with self._session_cm as scm:
+            rows = scm.session.execute(stmt.limit(limit))
+            return [CommentView._make(row) for row in rows]
+
+    def get_comment_replies(
+        self, post_id: int, top_level_ids: List[int], limit: int
+    ) -> List[CommentView]:
+        if not top_level_ids or limit < 1:
+            return []
+        path = comments_table.c.path
+        top_level_paths = sorted(thread_path(id) for id in top_level_ids)
+        top_level = func.substr(path, 1, PATH_WIDTH)
+        # One range scan of ix_comments_post_id_path across the threads,
+        # numbering each thread's replies so only the first limit are kept.
+        replies = (
+            self._comment_views(post_id)
+            .add_columns(
+                func.row_number()
+                .over(partition_by=top_level, order_by=path)
+                .label("position")
+            )
+            .where(
+                path > top_level_paths[0],
+                path < top_level_paths[-1] + "0",
+                comments_table.c.parent_id.is_not(None),
+                top_level.in_(top_level_paths),
+            )
+            .subquery()
+        )
+        stmt = (
+            select(*[c for c in replies.c if c.name != "position"])
+            .where(replies.c.position <= limit)
+            .order_by(replies.c.path)
+        )
+        with self._session_cm as scm:
+            return [CommentView._make(row) for row in scm.session.execute(stmt)]
+
+    def get_comment_thread(self, post_id: int, comment_id: int) -> List[CommentView]:
+        path = comments_table.c.path
+        root_path = (
+            select(path)
+            .where(
+                comments_table.c.id == comment_id, comments_table.c.post_id == post_id
+            )
+            .scalar_subquery()
+        )
+        stmt = (
+            self._comment_views(post_id)
+            .where(_in_subtree(path, root_path))
+            .order_by(path)
+        )
+        with self._session_cm as scm:
+            return [CommentView._make(row) for row in scm.session.execute(stmt)]
+
+    def get_user_summary(self, user_id: int) -> UserSummary | None:
+        posts_count = (
+            select(func.count())
+            .where(posts_table.c.user_id == users_table.c.id)
+            .scalar_subquery()
+        )
+        followers_count = (
+            select(func.count())
+            .where(user_following_table.c.followee_id == users_table.c.id)
+            .scalar_subquery()
+        )
+        stmt = select(
+            users_table.c.id,
+            users_table.c.username,
+            users_table.c.bio,
+            type_coerce(users_table.c.profile_picture_path, String),
+            posts_count,
+            followers_count,
+        ).where(users_table.c.id == user_id)
+        with self._session_cm as scm:
+            row = scm.session.execute(stmt).first()
+            return UserSummary._make(row) if row is not None else None
+
     def add_temp_user(self, user: User):
         self._temp_users.append(user)
 
@@ -659,12 +1415,6 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
                 return user
         return None
 
-    def get_temp_user_max_id(self) -> int:
-        with self._session_cm as scm:
-            max_id = scm.session.scalar(select(func.max(users_table.c.id)))
-            next_id = 1 if max_id is None else int(max_id) + 1
-            return next_id
-
     def convert_temp_user_to_permanent(self, temp_user: User, type: str):
         with self._session_cm as scm:
             if type == "Human":
@@ -697,6 +1447,7 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
             self._temp_users = [
                 user for user in self._temp_users if user.user_id != temp_user.user_id
             ]
+            self._forget_users(temp_user.user_id)
             return new_user
 
     def convert_human_to_pet(self, human_user: User) -> PetUser:
@@ -716,6 +1467,7 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
                 scm.session.flush()
                 scm.session.add(new_user)
             scm.commit()
+            self._forget_users(new_user.user_id)
             return new_user
 
     def convert_pet_to_human(self, pet_user: User) -> HumanUser:
@@ -734,5 +1486,8 @@ class SqlAlchemyRepository(AbstractRepository, ABC):
                 scm.session.delete(pet_user)
                 scm.session.flush()
                 scm.session.add(new_user)
+            scm.session.flush()
+            refresh_user_post_cards(scm.session, new_user.user_id)
             scm.commit()
+            self._forget_users(new_user.user_id)
             return new_user
@@ -0,0 +1,15 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+# Rows parsed per chunk by the iter_* readers.
+DEFAULT_CHUNK_SIZE = 500
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    if size < 1:
+        raise ValueError("chunk size must be at least 1")
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -1,8 +1,9 @@
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 import csv
 
+from pets.adapters.datareaders import DEFAULT_CHUNK_SIZE, chunked
 from pets.domainmodel.Comment import Comment
 
 DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "comments_table.csv"
@@ -13,25 +14,33 @@ class CommentsReader:
         self.__comments: List[Comment] = []
 
     def read_comments(self):
+        for chunk in self.iter_comments():
+            self.__comments.extend(chunk)
+        return self.__comments
+
+    def iter_comments(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[List[Comment]]:
+        """Yield comments in lists of up to chunk_size without keeping them."""
         with DATA_PATH.open(newline="", encoding="utf-8") as csvfile:
             reader = csv.DictReader(csvfile)
-            for row in reader:
-                created_at_str = row["created_at"]
-                # Adjust parsing to your format:
-                try:
-                    created_at = datetime.fromisoformat(created_at_str)
-                except ValueError:
-                    created_at = datetime.strptime(created_at_str, "%Y-%m-%d %H:%M:%S")
-                comment = Comment(
-                    id=int(row["id"]),
-                    user_id=int(row["user_id"]),
-                    post_id=int(row["post_id"]),
-                    created_at=created_at,
-                    comment_string=row["comment_string"],
-                    likes=int(row["likes"]),
-                )
-                self.__comments.append(comment)
-        return self.__comments
+            yield from chunked(map(self.__parse_row, reader), chunk_size)
+
+    def __parse_row(self, row: dict) -> Comment:
+        created_at_str = row["created_at"]
+        # Adjust parsing to your format:
+        try:
+            created_at = datetime.fromisoformat(created_at_str)
+        except ValueError:
+            created_at = datetime.strptime(created_at_str, "%Y-%m-%d %H:%M:%S")
+        return Comment(
+            id=int(row["id"]),
+            user_id=int(row["user_id"]),
+            post_id=int(row["post_id"]),
+            created_at=created_at,
+            comment_string=row["comment_string"],
+            likes=int(row["likes"]),
+        )
 
     @property
     def comments(self) -> List[Comment]:
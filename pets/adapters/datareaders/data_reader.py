@@ -1,4 +1,6 @@
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
 from pets.adapters.datareaders.comments_reader import CommentsReader
 from pets.adapters.datareaders.likes_reader import LikesReader
 from pets.adapters.datareaders.pet_user_reader import PetUserReader
@@ -9,17 +11,44 @@ from pets.domainmodel.PetUser import PetUser
 from pets.domainmodel.Post import Post
 
 
+def _run_reader(reader, read_method: str):
+    # Runs in a worker process; the filled-in reader is pickled back.
+    getattr(reader, read_method)()
+    return reader
+
+
+def read_in_parallel(
+    processes: int,
+) -> Tuple[PetUserReader, PostsReader, LikesReader, CommentsReader]:
+    """Parse the four seed CSVs in separate processes and return the
+    filled-in readers, not yet linked to each other."""
+    jobs = [
+        (PetUserReader(), "read_pet_users"),
+        (PostsReader(), "read_posts"),
+        (LikesReader(), "read_likes"),
+        (CommentsReader(), "read_comments"),
+    ]
+    with ProcessPoolExecutor(max_workers=min(processes, len(jobs))) as pool:
+        futures = [pool.submit(_run_reader, reader, method) for reader, method in jobs]
+        return tuple(future.result() for future in futures)
+
+
 class DataReader:
-    def __init__(self):
-        pet_user_reader = PetUserReader()
-        posts_reader = PostsReader()
-        likes_reader = LikesReader()
-        comments_reader = CommentsReader()
-
-        pet_user_reader.read_pet_users()
-        posts_reader.read_posts()
-        likes_reader.read_likes()
-        comments_reader.read_comments()
+    def __init__(self, processes: int = 0):
+        if processes > 1:
+            pet_user_reader, posts_reader, likes_reader, comments_reader = (
+                read_in_parallel(processes)
+            )
+        else:
+            pet_user_reader = PetUserReader()
+            posts_reader = PostsReader()
+            likes_reader = LikesReader()
+            comments_reader = CommentsReader()
+
+            pet_user_reader.read_pet_users()
+            posts_reader.read_posts()
+            likes_reader.read_likes()
+            comments_reader.read_comments()
 
         posts_reader.assign_likes(likes_reader.likes)
         posts_reader.assign_comments(comments_reader.comments)
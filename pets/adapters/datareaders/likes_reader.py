@@ -1,8 +1,9 @@
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 import csv
 
+from pets.adapters.datareaders import DEFAULT_CHUNK_SIZE, chunked
 from pets.domainmodel.Like import Like
 
 DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "likes_table.csv"
@@ -14,26 +15,33 @@ class LikesReader:
         self.__max_id: int = 0
 
     def read_likes(self):
+        for chunk in self.iter_likes():
+            self.__likes.extend(chunk)
+        return self.__likes
+
+    def iter_likes(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Like]]:
+        """Yield likes in lists of up to chunk_size without keeping them.
+        max_like_id is updated as rows are read."""
         with DATA_PATH.open(newline="", encoding="utf-8") as csvfile:
             reader = csv.DictReader(csvfile)
-            for row in reader:
-                created_at_str = row["created_at"]
-                id = int(row["id"])
-                if id > self.__max_id:
-                    self.__max_id = id
-                # Adjust parsing to your format:
-                try:
-                    created_at = datetime.fromisoformat(created_at_str)
-                except ValueError:
-                    created_at = datetime.strptime(created_at_str, "%Y-%m-%d %H:%M:%S")
-                like = Like(
-                    id=id,
-                    user_id=int(row["user_id"]),
-                    post_id=int(row["post_id"]),
-                    created_at=created_at,
-                )
-                self.__likes.append(like)
-        return self.__likes
+            yield from chunked(map(self.__parse_row, reader), chunk_size)
+
+    def __parse_row(self, row: dict) -> Like:
+        created_at_str = row["created_at"]
+        id = int(row["id"])
+        if id > self.__max_id:
+            self.__max_id = id
+        # Adjust parsing to your format:
+        try:
+            created_at = datetime.fromisoformat(created_at_str)
+        except ValueError:
+            created_at = datetime.strptime(created_at_str, "%Y-%m-%d %H:%M:%S")
+        return Like(
+            id=id,
+            user_id=int(row["user_id"]),
+            post_id=int(row["post_id"]),
+            created_at=created_at,
+        )
 
     @property
     def likes(self) -> List[Like]:
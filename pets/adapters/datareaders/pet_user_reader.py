@@ -1,8 +1,9 @@
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 import csv
 
+from pets.adapters.datareaders import DEFAULT_CHUNK_SIZE, chunked
 from pets.domainmodel.PetUser import PetUser
 from pets.domainmodel.AnimalType import AnimalType
 from pets.domainmodel.Post import Post
@@ -15,38 +16,47 @@ class PetUserReader:
         self.__users: List[PetUser] = []
 
     def read_pet_users(self):
+        for chunk in self.iter_pet_users():
+            self.__users.extend(chunk)
+        return self.__users
+
+    def iter_pet_users(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[List[PetUser]]:
+        """Yield pet users in lists of up to chunk_size without keeping them."""
         with DATA_PATH.open(newline="", encoding="utf-8") as csvfile:
             reader = csv.DictReader(csvfile)
-            for row in reader:
-                created_at_str = row["created_at"].strip()
-                try:
-                    created_at = datetime.fromisoformat(created_at_str)
-                except ValueError:
-                    created_at = datetime.strptime(created_at_str, "%Y-%m-%d %H:%M:%S")
+            yield from chunked(map(self.__parse_row, reader), chunk_size)
 
-                # Parse follower_ids from CSV string
-                follower_ids_str = row.get("follower_ids", "").strip()
-                follower_ids = (
-                    [int(x) for x in follower_ids_str.split(",") if x.strip()]
-                    if follower_ids_str
-                    else []
-                )
+    def __parse_row(self, row: dict) -> PetUser:
+        created_at_str = row["created_at"].strip()
+        try:
+            created_at = datetime.fromisoformat(created_at_str)
+        except ValueError:
+            created_at = datetime.strptime(created_at_str, "%Y-%m-%d %H:%M:%S")
 
-                user = PetUser(
-                    user_id=int(row["id"]),
-                    username=row["username"],
-                    email=row["email"],
-                    password_hash=row["password_hash"],
-                    profile_picture_path=row.get(
-                        "profile_image_path"
-                    ),  # Match your CSV column name
-                    created_at=created_at,
-                    bio=row.get("bio", ""),
-                    animal_type=AnimalType.DOG,  # Default or read from CSV if available
-                    follower_ids=follower_ids,
-                )
-                self.__users.append(user)
-        return self.__users
+        # Parse follower_ids from CSV string
+        follower_ids_str = row.get("follower_ids", "").strip()
+        follower_ids = (
+            [int(x) for x in follower_ids_str.split(",") if x.strip()]
+            if follower_ids_str
+            else []
+        )
+
+        user = PetUser(
+            user_id=int(row["id"]),
+            username=row["username"],
+            email=row["email"],
+            password_hash=row["password_hash"],
+            profile_picture_path=row.get(
+                "profile_image_path"
+            ),  # Match your CSV column name
+            created_at=created_at,
+            bio=row.get("bio", ""),
+            animal_type=AnimalType.DOG,  # Default or read from CSV if available
+            follower_ids=follower_ids,
+        )
+        return user
 
     def assign_posts(self, posts: List[Post]):
         user_dict = {user.user_id: user for user in self.__users}
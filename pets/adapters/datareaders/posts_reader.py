@@ -1,8 +1,9 @@
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 import csv
 from datetime import datetime
 
+from pets.adapters.datareaders import DEFAULT_CHUNK_SIZE, chunked
 from pets.domainmodel.Comment import Comment
 from pets.domainmodel.Like import Like
 from pets.domainmodel.Post import Post
@@ -15,35 +16,43 @@ class PostsReader:
         self.__posts: List[Post] = []
 
     def read_posts(self):
+        for chunk in self.iter_posts():
+            self.__posts.extend(chunk)
+        return self.__posts
+
+    def iter_posts(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Post]]:
+        """Yield posts in lists of up to chunk_size without keeping them."""
         with DATA_PATH.open(newline="", encoding="utf-8") as csvfile:
             reader = csv.DictReader(csvfile)
+            # start=2 (header is row 1)
+            rows = (self.__parse_row(n, row) for n, row in enumerate(reader, start=2))
+            yield from chunked((post for post in rows if post is not None), chunk_size)
 
-            for row_num, row in enumerate(reader, start=2):  # start=2 (header is row 1)
-                try:
-                    if row["size"]:
-                        size_tuple = tuple(map(int, row["size"].split(", ")))
-                    else:
-                        size_tuple = (0, 0)
-
-                    post = Post(
-                        id=int(row["id"]),
-                        user_id=int(row["user_id"]),
-                        caption=row["caption"],
-                        views=int(row["views"]),
-                        created_at=datetime.fromisoformat(
-                            row["created_at"].replace("Z", "+00:00")
-                        ),
-                        size=size_tuple,
-                        tags=row["tags"].split(","),
-                        users_tagged=[],
-                        media_path=Path(row["media_path"]),
-                        media_type=row["media_type"],
-                    )
-                    self.__posts.append(post)
-                except (KeyError, ValueError, TypeError) as e:
-                    print(f"DEBUG: Error parsing post at row {row_num}: {e}")
-                    print(f"DEBUG: Row data: {row}")
-        return self.__posts
+    def __parse_row(self, row_num: int, row: dict) -> Post | None:
+        try:
+            if row["size"]:
+                size_tuple = tuple(map(int, row["size"].split(", ")))
+            else:
+                size_tuple = (0, 0)
+
+            return Post(
+                id=int(row["id"]),
+                user_id=int(row["user_id"]),
+                caption=row["caption"],
+                views=int(row["views"]),
+                created_at=datetime.fromisoformat(
+                    row["created_at"].replace("Z", "+00:00")
+                ),
+                size=size_tuple,
+                tags=row["tags"].split(","),
+                users_tagged=[],
+                media_path=Path(row["media_path"]),
+                media_type=row["media_type"],
+            )
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"DEBUG: Error parsing post at row {row_num}: {e}")
+            print(f"DEBUG: Row data: {row}")
+            return None
 
     def assign_likes(self, likes: List[Like]):
         post_dict = {post.id: post for post in self.__posts}
@@ -0,0 +1,58 @@
+from sqlalchemy import QueuePool, create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+
+def _apply_sqlite_pragmas(engine: Engine, config):
+    pragmas = [
+        # WAL lets readers run alongside the single writer.
+        "PRAGMA journal_mode=WAL",
+        # Safe with WAL: only a power loss can drop the last commits.
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        # Negative cache_size is in KiB rather than pages.
+        f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_SIZE_KIB'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+    ]
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def create_database_engine(config) -> Engine:
+    """The one engine the app and repository share, built from config.Config
+    values (any mapping with the same keys works)."""
+    database_uri = config["SQLALCHEMY_DATABASE_URI"]
+    echo = config.get("SQLALCHEMY_ECHO", False)
+    pool_options = dict(
+        pool_size=config["DB_POOL_SIZE"],
+        max_overflow=config["DB_MAX_OVERFLOW"],
+        pool_timeout=config["DB_POOL_TIMEOUT"],
+        pool_recycle=config["DB_POOL_RECYCLE"],
+    )
+
+    url = make_url(database_uri)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            database_uri, pool_pre_ping=True, echo=echo, **pool_options
+        )
+
+    if url.database in (None, "", ":memory:"):
+        # Each connection would get its own empty database; keep the default
+        # single-connection pool.
+        return create_engine(
+            database_uri, connect_args={"check_same_thread": False}, echo=echo
+        )
+
+    engine = create_engine(
+        database_uri,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        echo=echo,
+        **pool_options,
+    )
+    _apply_sqlite_pragmas(engine, config)
+    return engine
@@ -0,0 +1,98 @@
+import abc
+import threading
+from typing import Dict, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from pets.adapters.orm import id_blocks_table, metadata
+
+
+class IdAllocator(abc.ABC):
+    @abc.abstractmethod
+    def next_id(self, name: str) -> int:
+        # Returns a new id for the named table, unique across callers.
+        raise NotImplementedError
+
+
+class CounterIdAllocator(IdAllocator):
+    """O(1) in-process counters, one per table name."""
+
+    def __init__(self):
+        self.__counters: Dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    def seed(self, name: str, used_id: int | None):
+        # Records an id assigned elsewhere (e.g. loaded from CSV) so it is
+        # never handed out again.
+        if used_id is None:
+            return
+        with self.__lock:
+            if used_id > self.__counters.get(name, 0):
+                self.__counters[name] = used_id
+
+    def next_id(self, name: str) -> int:
+        with self.__lock:
+            value = self.__counters.get(name, 0) + 1
+            self.__counters[name] = value
+            return value
+
+
+class HiLoIdAllocator(IdAllocator):
+    """Hands out ids from blocks reserved in the id_blocks table.
+
+    Each reservation is a single UPDATE ... RETURNING, so separate processes
+    (or app workers) sharing a database always get disjoint ranges, and only
+    one round trip is paid per block_size ids.
+    """
+
+    def __init__(self, engine, block_size: int = 100):
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.__engine = engine
+        self.__block_size = block_size
+        # name -> (next id to hand out, end of reserved block, exclusive)
+        self.__blocks: Dict[str, Tuple[int, int]] = {}
+        self.__lock = threading.Lock()
+        self.__table_ready = False
+
+    def next_id(self, name: str) -> int:
+        with self.__lock:
+            next_id, end = self.__blocks.get(name, (0, 0))
+            if next_id >= end:
+                next_id, end = self.__reserve_block(name)
+            self.__blocks[name] = (next_id + 1, end)
+            return next_id
+
+    def __reserve_block(self, name: str) -> Tuple[int, int]:
+        table = id_blocks_table
+        if not self.__table_ready:
+            # Created lazily so a fresh database still looks empty at startup.
+            table.create(self.__engine, checkfirst=True)
+            self.__table_ready = True
+        while True:
+            try:
+                with self.__engine.begin() as conn:
+                    end = conn.execute(
+                        update(table)
+                        .where(table.c.name == name)
+                        .values(next_value=table.c.next_value + self.__block_size)
+                        .returning(table.c.next_value)
+                    ).scalar()
+                    if end is not None:
+                        return end - self.__block_size, end
+
+                    # First block for this table: start after its highest id.
+                    source = metadata.tables[name]
+                    max_id = conn.scalar(select(func.max(source.c.id)))
+                    start = (max_id or 0) + 1
+                    conn.execute(
+                        insert(table).values(
+                            name=name, next_value=start + self.__block_size
+                        )
+                    )
+                    return start, start + self.__block_size
+            except IntegrityError:
+                # Another process seeded this sequence first; take a block
+                # from it instead.
+                continue
@@ -0,0 +1,115 @@
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+
+class ReadWriteLock:
+    """Many concurrent readers or one exclusive writer.
+
+    Writers are preferred: once a writer is waiting, new readers queue
+    behind it so a steady stream of reads can't starve writes. A thread
+    may nest reads inside reads, and reads or writes inside a write, but
+    it can't upgrade a read to a write (that would deadlock with another
+    reader doing the same).
+    """
+
+    def __init__(self):
+        self.__cond = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = None
+        self.__write_depth = 0
+        self.__writers_waiting = 0
+        # Per-thread stack of held reads; True where the read was counted.
+        self.__local = threading.local()
+
+    def __held_reads(self) -> list:
+        if not hasattr(self.__local, "reads"):
+            self.__local.reads = []
+        return self.__local.reads
+
+    def acquire_read(self):
+        reads = self.__held_reads()
+        if reads or self.__writer == threading.get_ident():
+            reads.append(False)
+            return
+        with self.__cond:
+            while self.__writer is not None or self.__writers_waiting:
+                self.__cond.wait()
+            self.__readers += 1
+        reads.append(True)
+
+    def release_read(self):
+        if not self.__held_reads().pop():
+            return
+        with self.__cond:
+            self.__readers -= 1
+            if self.__readers == 0:
+                self.__cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        if self.__writer == me:
+            self.__write_depth += 1
+            return
+        if self.__held_reads():
+            raise RuntimeError("cannot upgrade a read lock to a write lock")
+        with self.__cond:
+            self.__writers_waiting += 1
+            while self.__writer is not None or self.__readers:
+                self.__cond.wait()
+            self.__writers_waiting -= 1
+            self.__writer = me
+            self.__write_depth = 1
+
+    def release_write(self):
+        with self.__cond:
+            self.__write_depth -= 1
+            if self.__write_depth == 0:
+                self.__writer = None
+                self.__cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class NoLock:
+    """Stands in for ReadWriteLock when only one thread touches the data."""
+
+    def read(self):
+        return nullcontext()
+
+    def write(self):
+        return nullcontext()
+
+
+def reads(method):
+    # Runs a method under its instance's shared lock (self._lock).
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def writes(method):
+    # Runs a method under its instance's exclusive lock (self._lock).
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write():
+            return method(self, *args, **kwargs)
+
+    return wrapper
@@ -1,143 +1,624 @@
-from typing import List
+import os
+import pickle
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+from pets.adapters.id_allocator import CounterIdAllocator
+from pets.adapters.locking import NoLock, ReadWriteLock, reads, writes
+from pets.adapters.read_models import CommentView, PostCard, UserSummary
 from pets.adapters.repository import AbstractRepository
 from pets.domainmodel.User import User
 from pets.domainmodel.PetUser import PetUser
 from pets.domainmodel.Post import Post
-from pets.domainmodel.Comment import Comment
+from pets.domainmodel.Comment import MAX_DEPTH, Comment, thread_path
 from pets.domainmodel.Like import Like
 from datetime import datetime, UTC
 
 
+# Bumped whenever the pickled domain objects change shape.
+SNAPSHOT_VERSION = 2
+
+
+def _timestamp(value: datetime | None) -> float:
+    # Naive and aware datetimes can't be compared directly, timestamps can.
+    return value.timestamp() if value is not None else float("-inf")
+
+
+def _created_key(item: Post | Comment):
+    # Keyset order for posts and comments alike.
+    return _timestamp(item.created_at), item.id
+
+
+def _path_key(comment: Comment) -> str:
+    return comment.path
+
+
+def _optional_str(value) -> str | None:
+    return str(value) if value is not None else None
+
+
 class MemoryRepository(AbstractRepository):
-    def __init__(self):
+    def __init__(self, thread_safe: bool = False):
+        # Readers share the lock and writers take it exclusively; without
+        # thread_safe the repository assumes a single-threaded server.
+        self._lock = ReadWriteLock() if thread_safe else NoLock()
         self.__human_users: List[User] = []
         self.__pet_users: List[User] = []
-        self.__posts: List[Post] = []
-        self.__comments: List[Comment] = []
-        self.__max_like_id = 0
-
+        self.__ids = CounterIdAllocator()
+        # Posts kept sorted oldest -> newest by (created_at, id) for keyset paging.
+        self.__feed: List[Post] = []
+        # Indexes kept in step with every mutation so lookups never scan.
+        self.__human_users_by_id: Dict[int, User] = {}
+        self.__human_users_by_name: Dict[str, User] = {}
+        self.__pet_users_by_id: Dict[int, User] = {}
+        self.__pet_users_by_name: Dict[str, User] = {}
+        # Every user whatever their type; ids and names are unique across types.
+        self.__users_by_id: Dict[int, User] = {}
+        self.__users_by_name: Dict[str, User] = {}
+        # Registered users who haven't picked a type yet; never stored.
+        self.__temp_users_by_id: Dict[int, User] = {}
+        self.__temp_users_by_name: Dict[str, User] = {}
+        self.__posts_by_id: Dict[int, Post] = {}
+        # user_id -> that user's posts, sorted oldest -> newest like the feed
+        self.__posts_by_user: Dict[int, List[Post]] = defaultdict(list)
+        # post_id -> its comments, sorted oldest -> newest by (created_at, id)
+        self.__comments_by_post: Dict[int, List[Comment]] = defaultdict(list)
+        # post_id -> its top-level comments, in the same order
+        self.__top_level_by_post: Dict[int, List[Comment]] = defaultdict(list)
+        # post_id -> its comment tree in preorder (sorted by path), so a
+        # comment's replies are the slice right after it
+        self.__threads_by_post: Dict[int, List[Comment]] = defaultdict(list)
+        self.__comments_by_id: Dict[int, Comment] = {}
+        # comment_id -> ids of the users who liked it, the comment_likes table
+        self.__comment_likers: Dict[int, Set[int]] = defaultdict(set)
+        self.__likes: Dict[Tuple[int, int], Like] = {}
+        # post_id -> PostCard, the memory twin of the post_cards table; every
+        # write that changes a post's card replaces it.
+        self.__post_cards: Dict[int, PostCard] = {}
+
+    @writes
     def populate(self, users: List[User], max_like_id) -> None:
         self.__pet_users = users
-        # Flatten posts and comments
-        self.__posts = [p for u in users for p in getattr(u, "posts", [])]
-        self.__comments = [c for u in users for c in getattr(u, "comments", [])]
-        self.__max_like_id = max_like_id
+        # Seeded comments hang off their posts, comments made since off their
+        # authors as well; index each once.
+        comments = {}
+        for user in users:
+            self.__index_user(user, self.__pet_users_by_id, self.__pet_users_by_name)
+            for post in getattr(user, "posts", []):
+                self.__index_post(post)
+                comments.update((id(c), c) for c in post.comments)
+            comments.update((id(c), c) for c in getattr(user, "comments", []))
+        for comment in comments.values():
+            self.__index_comment(comment)
+        self.__ids.seed("likes", max_like_id)
+        self.__ids.seed("users", max((u.user_id for u in users), default=None))
+        self.__ids.seed("posts", max(self.__posts_by_id, default=None))
+        self.__ids.seed(
+            "comments",
+            max(
+                (c.id for p in self.__posts_by_id.values() for c in p.comments),
+                default=None,
+            ),
+        )
+
+    @reads
+    def save_snapshot(self, path: Path | str) -> None:
+        """Write users, posts, comments and likes to *path* as a pickle that
+        load_snapshot can restore without re-parsing the CSVs."""
+        state = {
+            "version": SNAPSHOT_VERSION,
+            "pet_users": self.__pet_users,
+            "human_users": self.__human_users,
+            "comments": [c for cs in self.__comments_by_post.values() for c in cs],
+            "max_like_id": max((like.id for like in self.__likes.values()), default=0),
+            "comment_likers": dict(self.__comment_likers),
+        }
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Readers never see a half-written snapshot.
+        os.replace(tmp_path, path)
+
+    @writes
+    def load_snapshot(self, path: Path | str) -> None:
+        """Fill an empty repository from a file written by save_snapshot.
+        Only load snapshots this app wrote itself: unpickling runs code."""
+        with Path(path).open("rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {state.get('version')}")
+        self.populate(state["pet_users"], state["max_like_id"])
+        self.add_multiple_human_users(state["human_users"])
+        self.__comments_by_post.clear()
+        self.__top_level_by_post.clear()
+        self.__threads_by_post.clear()
+        self.__comments_by_id.clear()
+        for comment in state["comments"]:
+            self.__index_comment(comment)
+        self.__comment_likers.clear()
+        self.__comment_likers.update(state.get("comment_likers", {}))
+
+    def __index_user(
+        self, user: User, by_id: Dict[int, User], by_name: Dict[str, User]
+    ):
+        by_id[user.user_id] = user
+        by_name[user.username] = user
+        self.__users_by_id[user.user_id] = user
+        self.__users_by_name[user.username] = user
+
+    def __index_post(self, post: Post):
+        existing = self.__posts_by_id.get(post.id)
+        if existing is post:
+            return
+        if existing is not None:
+            # Ids are unique: a new post under a taken id replaces the old one.
+            self.__unindex_post(existing)
+        self.__posts_by_id[post.id] = post
+        insort(self.__feed, post, key=_created_key)
+        insort(self.__posts_by_user[post.user_id], post, key=_created_key)
+        for like in post.likes:
+            self.__likes[(post.id, like.user_id)] = like
+        self.__post_cards[post.id] = self.__card_for(post)
+
+    def __unindex_post(self, post: Post):
+        self.__posts_by_id.pop(post.id, None)
+        self.__feed.remove(post)
+        self.__posts_by_user[post.user_id].remove(post)
+        for like in post.likes:
+            self.__likes.pop((post.id, like.user_id), None)
+        for comment in self.__comments_by_post.pop(post.id, []):
+            self.__unindex_comment(comment)
+        self.__top_level_by_post.pop(post.id, None)
+        self.__threads_by_post.pop(post.id, None)
+        self.__post_cards.pop(post.id, None)
+
+    def __card_for(self, post: Post) -> PostCard:
+        author = self.__users_by_id.get(post.user_id)
+        return PostCard(
+            post.id,
+            post.user_id,
+            author.username if author else None,
+            _optional_str(author.profile_picture_path) if author else None,
+            post.caption,
+            post.created_at,
+            post.media_type,
+            str(post.media_path),
+            post.like_count,
+            post.comment_count,
+        )
+
+    def __refresh_card(self, post: Post):
+        if post.id in self.__post_cards:
+            self.__post_cards[post.id] = self.__card_for(post)
+
+    def __index_comment(self, comment: Comment):
+        insort(self.__comments_by_post[comment.post_id], comment, key=_created_key)
+        if comment.parent_id is None:
+            insort(self.__top_level_by_post[comment.post_id], comment, key=_created_key)
+        insort(self.__threads_by_post[comment.post_id], comment, key=_path_key)
+        self.__comments_by_id[comment.id] = comment
+
+    def __unindex_comment(self, comment: Comment):
+        self.__comments_by_id.pop(comment.id, None)
+        self.__comment_likers.pop(comment.id, None)
+
+    def next_user_id(self) -> int:
+        return self.__ids.next_id("users")
 
+    @writes
     def add_pet_user(self, user: User):
+        self.__assign_user_id(user)
         self.__pet_users.append(user)
+        self.__index_user(user, self.__pet_users_by_id, self.__pet_users_by_name)
 
+    @reads
     def get_total_user_size(self):
         return len(self.__pet_users) + len(self.__human_users)
 
+    @writes
     def add_multiple_pet_users(self, users: List[User]):
+        for user in users:
+            self.__assign_user_id(user)
+            self.__index_user(user, self.__pet_users_by_id, self.__pet_users_by_name)
         self.__pet_users.extend(users)
 
+    @writes
     def add_human_user(self, user: User):
+        self.__assign_user_id(user)
         self.__human_users.append(user)
+        self.__index_user(user, self.__human_users_by_id, self.__human_users_by_name)
 
+    @writes
     def add_multiple_human_users(self, users: List[User]):
+        for user in users:
+            self.__assign_user_id(user)
+            self.__index_user(
+                user, self.__human_users_by_id, self.__human_users_by_name
+            )
         self.__human_users.extend(users)
 
+    def __assign_user_id(self, user: User):
+        if user.user_id is None:
+            user.user_id = self.next_user_id()
+        else:
+            self.__ids.seed("users", user.user_id)
+
+    @reads
     def get_human_user_by_name(self, username) -> User:
-        return next((u for u in self.__human_users if u.username == username), None)
+        return self.__human_users_by_name.get(username)
 
+    @reads
     def get_photo_posts(self) -> List[Post]:
-        return [p for p in self.__posts if getattr(p, "media_type", None) == "photo"]
+        return [
+            p
+            for p in self.__posts_by_id.values()
+            if getattr(p, "media_type", None) == "photo"
+        ]
 
+    @reads
     def get_pet_user_by_name(self, username) -> User:
-        return next((u for u in self.__pet_users if u.username == username), None)
+        return self.__pet_users_by_name.get(username)
 
+    @reads
     def get_human_user_by_id(self, id: int) -> User:
-        return next((u for u in self.__human_users if u.user_id == id), None)
+        return self.__human_users_by_id.get(id)
 
+    @reads
     def get_pet_user_by_id(self, id: int) -> User:
-        return next((u for u in self.__pet_users if u.user_id == id), None)
-
+        return self.__pet_users_by_id.get(id)
+
+    @reads
+    def get_user_by_name(self, username: str) -> User | None:
+        user = self.__users_by_name.get(username)
+        return user or self.__temp_users_by_name.get(username)
+
+    @reads
+    def get_user_by_id(self, user_id: int) -> User | None:
+        user = self.__users_by_id.get(user_id)
+        return user or self.__temp_users_by_id.get(user_id)
+
+    @writes
+    def add_temp_user(self, user: User):
+        self.__assign_user_id(user)
+        self.__temp_users_by_id[user.user_id] = user
+        self.__temp_users_by_name[user.username] = user
+
+    @reads
+    def get_temp_user_by_name(self, username: str) -> User | None:
+        return self.__temp_users_by_name.get(username)
+
+    @reads
+    def get_temp_user_by_id(self, user_id: int) -> User | None:
+        return self.__temp_users_by_id.get(user_id)
+
+    @reads
+    def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        return [
+            self.__users_by_id[user_id]
+            for user_id in dict.fromkeys(user_ids)
+            if user_id in self.__users_by_id
+        ]
+
+    @reads
     def get_all_user_post_paths(self, user: User) -> List[str]:
-        return [str(p.media_path) for p in self.__posts if p.user_id == user.user_id]
+        return [str(p.media_path) for p in self.__posts_by_user.get(user.user_id, [])]
 
+    @reads
     def get_pet_users(self) -> List[User]:
-        return self.__pet_users
+        return list(self.__pet_users)
 
+    @reads
     def get_human_users(self) -> List[User]:
-        return self.__human_users
+        return list(self.__human_users)
 
+    @writes
     def add_post(self, pet_user: PetUser, post: Post):
-        self.__posts.append(post)
+        self.__ids.seed("posts", post.id)
+        self.__index_post(post)
         pet_user.add_post(post)
 
+    @writes
     def add_multiple_posts(self, pet_user: PetUser, posts: List[Post]):
-        self.__posts.extend(posts)
         for post in posts:
-            pet_user.add_post(post)
+            self.add_post(pet_user, post)
 
+    @writes
     def delete_post(self, pet_user: PetUser, post: Post):
         pet_user.delete_post(post)
-        self.__posts.remove(post)
+        self.__unindex_post(post)
+
+    @writes
+    def create_post(
+        self,
+        user: PetUser,
+        caption: str,
+        tags: List[str],
+        media_path: Path,
+        media_type: str,
+    ) -> Post:
+        post = Post(
+            id=self.__ids.next_id("posts"),
+            user_id=user.user_id,
+            caption=caption,
+            views=0,
+            created_at=datetime.now(UTC),
+            size=(0, 0),
+            tags=tags,
+            users_tagged=[],
+            media_path=media_path,
+            media_type=media_type,
+        )
+        self.add_post(user, post)
+        return post
+
+    @reads
+    def get_all_posts(self) -> List[Post]:
+        return list(self.__posts_by_id.values())
+
+    @reads
+    def get_feed_page(
+        self, before_created_at: datetime | None, before_id: int | None, limit: int
+    ) -> List[Post]:
+        if before_created_at is None or before_id is None:
+            end = len(self.__feed)
+        else:
+            end = bisect_left(
+                self.__feed,
+                (_timestamp(before_created_at), before_id),
+                key=_created_key,
+            )
+        start = max(0, end - limit)
+        return self.__feed[start:end][::-1]
+
+    @reads
+    def get_feed_cards(
+        self, before_created_at: datetime | None, before_id: int | None, limit: int
+    ) -> List[PostCard]:
+        return [
+            self.__post_cards[post.id]
+            for post in self.get_feed_page(before_created_at, before_id, limit)
+        ]
+
+    @reads
+    def get_user_cards(self, user_id: int) -> List[PostCard]:
+        return [
+            self.__post_cards[post.id]
+            for post in reversed(self.__posts_by_user.get(user_id, []))
+        ]
+
+    @writes
+    def check_post_cards(self, repair: bool = False) -> Dict[str, List[int]]:
+        expected = {
+            post_id: self.__card_for(post)
+            for post_id, post in self.__posts_by_id.items()
+        }
+        live = self.__post_cards
+        diff = {
+            "missing": sorted(expected.keys() - live.keys()),
+            "extra": sorted(live.keys() - expected.keys()),
+            "stale": sorted(
+                post_id
+                for post_id in expected.keys() & live.keys()
+                if expected[post_id] != live[post_id]
+            ),
+        }
+        if repair and any(diff.values()):
+            self.__post_cards = expected
+        return diff
+
+    @reads
+    def get_comment_views(self, post_id: int) -> List[CommentView]:
+        return self.__comment_views(self.__comments_by_post.get(post_id, []))
+
+    @reads
+    def get_comment_views_page(
+        self,
+        post_id: int,
+        cursor_created_at: datetime | None,
+        cursor_id: int | None,
+        limit: int,
+        newest_first: bool = False,
+    ) -> List[CommentView]:
+        comments = self.__top_level_by_post.get(post_id, [])
+        has_cursor = cursor_created_at is not None and cursor_id is not None
+        cursor = (_timestamp(cursor_created_at), cursor_id)
+        if newest_first:
+            end = (
+                bisect_left(comments, cursor, key=_created_key)
+                if has_cursor
+                else len(comments)
+            )
+            page = comments[max(0, end - limit) : end][::-1]
+        else:
+            start = (
+                bisect_right(comments, cursor, key=_created_key) if has_cursor else 0
+            )
+            page = comments[start : start + limit]
+        return self.__comment_views(page)
+
+    def __replies(self, comment: Comment) -> List[Comment]:
+        # Everything beneath the comment: the run of the post's tree whose
+        # paths continue comment.path with "/" ("0" is the next character).
+        thread = self.__threads_by_post.get(comment.post_id, [])
+        start = bisect_left(thread, comment.path + "/", key=_path_key)
+        end = bisect_left(thread, comment.path + "0", key=_path_key)
+        return thread[start:end]
+
+    @reads
+    def get_comment_replies(
+        self, post_id: int, top_level_ids: List[int], limit: int
+    ) -> List[CommentView]:
+        replies = []
+        for comment_id in sorted(top_level_ids):
+            comment = self.__comments_by_id.get(comment_id)
+            if comment is None or comment.post_id != post_id or comment.parent_id:
+                continue
+            replies += self.__replies(comment)[:limit]
+        return self.__comment_views(replies)
+
+    @reads
+    def get_comment_thread(self, post_id: int, comment_id: int) -> List[CommentView]:
+        comment = self.__comments_by_id.get(comment_id)
+        if comment is None or comment.post_id != post_id:
+            return []
+        return self.__comment_views([comment] + self.__replies(comment))
+
+    def __comment_views(self, comments: List[Comment]) -> List[CommentView]:
+        # Each distinct author is resolved once, however many comments.
+        authors = {}
+        for user_id in {comment.user_id for comment in comments}:
+            author = self.__users_by_id.get(user_id)
+            authors[user_id] = (
+                (author.username, _optional_str(author.profile_picture_path))
+                if author
+                else (None, None)
+            )
+        return [
+            CommentView(
+                comment.id,
+                comment.post_id,
+                comment.user_id,
+                *authors[comment.user_id],
+                comment.comment_string,
+                comment.created_at,
+                comment.likes,
+                comment.parent_id,
+                comment.path,
+            )
+            for comment in comments
+        ]
+
+    @reads
+    def get_user_summary(self, user_id: int) -> UserSummary | None:
+        user = self.__users_by_id.get(user_id)
+        if user is None:
+            return None
+        return UserSummary(
+            user.user_id,
+            user.username,
+            user.bio,
+            _optional_str(user.profile_picture_path),
+            len(self.__posts_by_user.get(user_id, [])),
+            len(self.get_followers(user)),
+        )
 
+    @reads
     def get_post_by_id(self, id: int) -> Post:
-        return next((p for p in self.__posts if p.id == id), None)
+        return self.__posts_by_id.get(id)
 
+    @writes
     def add_comment(self, user: User, comment: Comment):
+        self.__ids.seed("comments", comment.id)
         user.add_comment(comment)
         # Attach to post if exists
         post = self.get_post_by_id(getattr(comment, "post_id", -1))
         if post is not None:
             post.add_comment(comment)
-        self.__comments.append(comment)
+            self.__refresh_card(post)
+        self.__index_comment(comment)
 
+    @reads
     def get_comments_for_post(self, post_id: int) -> List[Comment]:
         post = self.get_post_by_id(post_id)
         return list(getattr(post, "comments", []) if post else [])
 
+    @reads
     def get_comments_by_post(self, post: Post) -> List[Comment]:
-        return [c for c in self.__comments if c.post_id == post.id]
+        return list(self.__comments_by_post.get(post.id, []))
 
+    @writes
     def add_multiple_comments(self, users: List[User], comments: List[Comment]):
         for user, comment in zip(users, comments):
+            self.__ids.seed("comments", comment.id)
             user.add_comment(comment)
-            self.__comments.append(comment)
+            self.__index_comment(comment)
 
+    @writes
     def add_like_to_comment(self, comment: Comment):
         comment.add_like()
 
-    def add_like(self, post: Post, user: User):
-        self.__max_like_id += 1
-        like = Like(self.__max_like_id, user.user_id, post.id, datetime.now(UTC))
+    @writes
+    def like_comment(
+        self, user_id: int, post_id: int, comment_id: int
+    ) -> Tuple[bool, int] | None:
+        comment = self.__comments_by_id.get(comment_id)
+        if comment is None or comment.post_id != post_id:
+            return None
+        likers = self.__comment_likers[comment_id]
+        if user_id in likers:
+            return False, comment.likes
+        likers.add(user_id)
+        comment.add_like()
+        return True, comment.likes
+
+    def __store_like(self, post: Post, user_id: int) -> bool:
+        if (post.id, user_id) in self.__likes:
+            return False
+        like_id = self.__ids.next_id("likes")
+        like = Like(like_id, user_id, post.id, datetime.now(UTC))
         post.add_like(like)
+        self.__likes[(post.id, user_id)] = like
+        self.__refresh_card(post)
+        return True
+
+    def __discard_like(self, post: Post, user_id: int) -> bool:
+        like = self.__likes.pop((post.id, user_id), None)
+        if like is None:
+            return False
+        post.remove_like(like)
+        self.__refresh_card(post)
+        return True
+
+    @writes
+    def add_like(self, post: Post, user: User):
+        self.__store_like(post, user.user_id)
 
+    @writes
     def delete_like(self, post: Post, user: User):
         """Remove a like from *post* by *user* if present."""
-        likes = getattr(post, "likes", []) or []
-        target = next(
-            (
-                l
-                for l in likes
-                if getattr(l, "user_id", None) == getattr(user, "user_id", None)
-            ),
-            None,
-        )
-        if target:
-            try:
-                likes.remove(target)
-            except ValueError:
-                pass
+        self.__discard_like(post, getattr(user, "user_id", None))
 
+    @writes
+    def toggle_like(self, user_id: int, post_id: int) -> Tuple[bool, int] | None:
+        post = self.get_post_by_id(post_id)
+        if post is None:
+            return None
+        if self.__discard_like(post, user_id):
+            return False, post.like_count
+        self.__store_like(post, user_id)
+        return True, post.like_count
+
+    @writes
     def add_multiple_likes(self, posts: List[Post], users: List[User]):
         for post, user in zip(posts, users):
-            self.__max_like_id += 1
-            like = Like(self.__max_like_id, user.user_id, post.id, datetime.now(UTC))
-            post.add_like(like)
+            self.__store_like(post, user.user_id)
 
+    @writes
     def delete_comment(self, user: User, comment: Comment):
         user.comments.remove(comment)
-        self.__comments.remove(comment)
+        post = self.get_post_by_id(comment.post_id)
+        # Replies go with the comment they answer.
+        for doomed in [comment] + self.__replies(comment):
+            if doomed is not comment:
+                author = self.__users_by_id.get(doomed.user_id)
+                if author is not None and doomed in author.comments:
+                    author.comments.remove(doomed)
+            self.__comments_by_post[doomed.post_id].remove(doomed)
+            self.__threads_by_post[doomed.post_id].remove(doomed)
+            if doomed.parent_id is None:
+                self.__top_level_by_post[doomed.post_id].remove(doomed)
+            self.__unindex_comment(doomed)
+            if post is not None:
+                post.remove_comment(doomed)
+        if post is not None:
+            self.__refresh_card(post)
 
+    @reads
     def get_posts_thumbnails(self, user_id: int) -> List[dict]:
         # Return up to 24 latest posts (photo or video) for thumbnail grid.
-        items = [p for p in self.__posts if getattr(p, "user_id", None) == user_id]
-        # Sort newest first if created_at exists.
-        items.sort(key=lambda p: getattr(p, "created_at", None), reverse=True)
+        items = self.__posts_by_user.get(user_id, [])[::-1]
         out = []
         for p in items[:24]:
             if p.media_type == "photo":  # For now, just return photos.
@@ -150,20 +631,95 @@ class MemoryRepository(AbstractRepository):
                 )
         return out
 
-    def next_comment_id(self) -> int:
-        if not self.__comments:
-            return 1
-        return max(getattr(c, "id", 0) for c in self.__comments) + 1
-
-    def create_comment(self, user: User, post: Post, text: str) -> Comment:
-        cid = self.next_comment_id()
+    @writes
+    def create_comment(
+        self, user: User, post: Post, text: str, parent_id: int | None = None
+    ) -> Comment:
+        post_id = getattr(post, "id", 0)
+        parent_path = None
+        if parent_id is not None:
+            parent = self.__comments_by_id.get(parent_id)
+            if parent is None or parent.post_id != post_id:
+                raise ValueError("Parent comment not found")
+            if parent.depth >= MAX_DEPTH:
+                raise ValueError("Replies nest too deeply")
+            parent_path = parent.path
+        comment_id = self.__ids.next_id("comments")
         comment = Comment(
-            id=cid,
+            id=comment_id,
             user_id=getattr(user, "user_id", 0),
-            post_id=getattr(post, "id", 0),
+            post_id=post_id,
             created_at=datetime.now(UTC),
             comment_string=text,
             likes=0,
+            parent_id=parent_id,
+            path=thread_path(comment_id, parent_path),
         )
         self.add_comment(user, comment)
         return comment
+
+    @reads
+    def get_engagement(
+        self, post_ids: List[int], viewer_id: int | None
+    ) -> Dict[int, dict]:
+        out = {}
+        for post_id in post_ids:
+            post = self.__posts_by_id.get(post_id)
+            if post is None:
+                continue
+            out[post_id] = {
+                "likes_count": post.like_count,
+                "comments_count": post.comment_count,
+                "liked": (post_id, viewer_id) in self.__likes,
+            }
+        return out
+
+    @writes
+    def follow_user(self, follower: User, followee: User):
+        follower.follow(followee)
+        if isinstance(followee, PetUser):
+            followee.add_follower(follower.user_id)
+
+    @writes
+    def unfollow_user(self, follower: User, followee: User):
+        follower.unfollow(followee)
+        if isinstance(followee, PetUser):
+            followee.remove_follower(follower.user_id)
+
+    @reads
+    def is_following(self, follower_id: int, followee_id: int) -> bool:
+        followee = self.get_pet_user_by_id(followee_id)
+        return followee is not None and follower_id in followee.follower_ids
+
+    @reads
+    def get_followers(self, user: User) -> List[User]:
+        followers = []
+        for follower_id in dict.fromkeys(getattr(user, "follower_ids", []) or []):
+            follower = self.__users_by_id.get(follower_id)
+            if follower is not None:
+                followers.append(follower)
+        return followers
+
+    @writes
+    def update_user(self, user: User):
+        # Users are held by reference, so only a renamed user needs its
+        # name index entry moved.
+        for by_id, by_name in (
+            (self.__pet_users_by_id, self.__pet_users_by_name),
+            (self.__human_users_by_id, self.__human_users_by_name),
+            (self.__users_by_id, self.__users_by_name),
+        ):
+            if by_id.get(user.user_id) is not user:
+                continue
+            if by_name.get(user.username) is not user:
+                stale = [name for name, u in by_name.items() if u is user]
+                for name in stale:
+                    del by_name[name]
+                by_name[user.username] = user
+        # Their cards show the username and avatar.
+        for post in self.__posts_by_user.get(user.user_id, []):
+            self.__refresh_card(post)
+
+    def get_video_thumbnail(self, post: Post, user: User) -> Post:
+        # Thumbnails are only generated on disk in database mode.
+        return post
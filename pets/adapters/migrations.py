@@ -0,0 +1,334 @@
+"""Versioned schema changes for databases created by an older orm.py.
+
+create_all only builds tables that don't exist yet, so columns and indexes
+added later never reach an existing database. Each migration here runs once,
+in its own transaction, and is recorded in the schema_version table. A new
+database built by create_all is stamped as fully migrated instead.
+"""
+
+import json
+from datetime import datetime, UTC
+from typing import Callable, List, Tuple
+
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    bindparam,
+    delete,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+    update,
+)
+
+from pets.adapters.orm import (
+    UtcDateTime,
+    comments_table,
+    like_table,
+    posts_table,
+    schema_version_table,
+    users_table,
+)
+from pets.adapters.projections import rebuild_post_cards
+from pets.domainmodel.Comment import thread_path
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = []
+
+
+def migration(version: int, description: str):
+    def register(apply: Callable):
+        MIGRATIONS.append((version, description, apply))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return apply
+
+    return register
+
+
+def add_post_counter_columns(conn):
+    existing = {c["name"] for c in inspect(conn).get_columns("posts")}
+    for column in ("like_count", "comment_count"):
+        if column not in existing:
+            conn.execute(
+                text(
+                    f"ALTER TABLE posts ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+                )
+            )
+
+
+def recount_post_counters(conn) -> int:
+    like_count = (
+        select(func.count(like_table.c.id))
+        .where(like_table.c.post_id == posts_table.c.id)
+        .scalar_subquery()
+    )
+    comment_count = (
+        select(func.count(comments_table.c.id))
+        .where(comments_table.c.post_id == posts_table.c.id)
+        .scalar_subquery()
+    )
+    result = conn.execute(
+        update(posts_table).values(like_count=like_count, comment_count=comment_count)
+    )
+    return result.rowcount
+
+
+def _reflect(conn, *table_names: str) -> MetaData:
+    # The tables as the database has them, never as orm.py declares them
+    # today: a migration must do the same thing whenever it runs.
+    existing = MetaData()
+    existing.reflect(conn, only=table_names)
+    return existing
+
+
+def _create_index(conn, table_name: str, name: str, *columns: str, unique=False):
+    table = _reflect(conn, table_name).tables[table_name]
+    # table.c raises KeyError for a column the table doesn't have.
+    index = Index(name, *(table.c[column] for column in columns), unique=unique)
+    index.create(conn, checkfirst=True)
+
+
+@migration(1, "one like per user per post")
+def _unique_likes(conn):
+    # Keep the first of any duplicate likes so the unique index can be built.
+    first_likes = select(func.min(like_table.c.id)).group_by(
+        like_table.c.user_id, like_table.c.post_id
+    )
+    conn.execute(delete(like_table).where(like_table.c.id.not_in(first_likes)))
+    _create_index(
+        conn, "likes", "ux_likes_user_post", "user_id", "post_id", unique=True
+    )
+
+
+@migration(2, "denormalized like/comment counters on posts")
+def _post_counters(conn):
+    add_post_counter_columns(conn)
+    recount_post_counters(conn)
+
+
+@migration(3, "secondary indexes on feed, profile, comment and follower lookups")
+def _secondary_indexes(conn):
+    _create_index(conn, "posts", "ix_posts_user_id_created_at", "user_id", "created_at")
+    _create_index(conn, "posts", "ix_posts_created_at_id", "created_at", "id")
+    _create_index(conn, "comments", "ix_comments_post_id", "post_id")
+    _create_index(conn, "likes", "ix_likes_post_id", "post_id")
+    _create_index(
+        conn, "user_following", "ix_user_following_followee_id", "followee_id"
+    )
+
+
+@migration(4, "native timestamps, width/height and JSON columns")
+def _native_types(conn):
+    tables = set(inspect(conn).get_table_names())
+    postgresql = conn.dialect.name == "postgresql"
+
+    if "size" in {c["name"] for c in inspect(conn).get_columns("posts")}:
+        for column in ("width", "height"):
+            conn.execute(
+                text(
+                    f"ALTER TABLE posts ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+                )
+            )
+        sizes = [
+            {"_id": post_id, "_width": w, "_height": h}
+            for post_id, size in conn.execute(text("SELECT id, size FROM posts"))
+            for w, h in [json.loads(size) if size else (0, 0)]
+        ]
+        if sizes:
+            conn.execute(
+                update(posts_table)
+                .where(posts_table.c.id == bindparam("_id"))
+                .values(width=bindparam("_width"), height=bindparam("_height")),
+                sizes,
+            )
+        conn.execute(text("ALTER TABLE posts DROP COLUMN size"))
+
+    timestamps = [
+        (users_table, "created_at"),
+        (posts_table, "created_at"),
+        (comments_table, "created_at"),
+        (like_table, "created_at"),
+        (schema_version_table, "applied_at"),
+    ]
+    for table, column in timestamps:
+        if table.name not in tables:
+            continue
+        if postgresql:
+            conn.execute(
+                text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column} "
+                    f"TYPE TIMESTAMP WITH TIME ZONE USING {column}::timestamptz"
+                )
+            )
+            continue
+        # SQLite stores both forms as text: rewrite the old isoformat
+        # strings (mixed offsets) as UTC in the DateTime storage format.
+        pk = list(table.primary_key)[0]
+        rows = [
+            {"_pk": key, "_value": datetime.fromisoformat(value)}
+            for key, value in conn.execute(
+                text(f"SELECT {pk.name}, {column} FROM {table.name}")
+            )
+            if value is not None
+        ]
+        if rows:
+            conn.execute(
+                update(table)
+                .where(pk == bindparam("_pk"))
+                .values({column: bindparam("_value")}),
+                rows,
+            )
+
+    if postgresql:
+        json_columns = [
+            ("posts", "tags"),
+            ("pet_users", "follower_ids"),
+            ("human_users", "favourite_animals"),
+        ]
+        for table_name, column in json_columns:
+            if table_name in tables:
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table_name} ALTER COLUMN {column} "
+                        f"TYPE JSON USING {column}::json"
+                    )
+                )
+
+
+@migration(5, "post_cards projection")
+def _post_cards(conn):
+    post_cards = Table(
+        "post_cards",
+        MetaData(),
+        Column("post_id", Integer, primary_key=True, autoincrement=False),
+        Column("user_id", Integer, nullable=False),
+        Column("username", String(255)),
+        Column("profile_picture_path", String(500)),
+        Column("caption", Text),
+        Column("created_at", UtcDateTime, nullable=False),
+        Column("media_type", String(50), nullable=False),
+        Column("media_path", String(500), nullable=False),
+        Column("like_count", Integer, nullable=False, default=0),
+        Column("comment_count", Integer, nullable=False, default=0),
+        Index("ix_post_cards_created_at_post_id", "created_at", "post_id"),
+        Index("ix_post_cards_user_id_created_at", "user_id", "created_at"),
+    )
+    post_cards.create(conn, checkfirst=True)
+    if {"posts", "users"} <= set(inspect(conn).get_table_names()):
+        rebuild_post_cards(conn)
+
+
+@migration(6, "comment keyset index")
+def _comment_keyset_index(conn):
+    _create_index(
+        conn,
+        "comments",
+        "ix_comments_post_id_created_at_id",
+        "post_id",
+        "created_at",
+        "id",
+    )
+    # Its post_id prefix serves everything migration 3's index did.
+    conn.execute(text("DROP INDEX ix_comments_post_id"))
+
+
+@migration(7, "one like per user per comment")
+def _comment_likes(conn):
+    # Likes counted before this have no likers on record; they stay counted.
+    existing = _reflect(conn, "comments", "users")
+    comment_likes = Table(
+        "comment_likes",
+        existing,
+        Column("comment_id", Integer, ForeignKey("comments.id"), primary_key=True),
+        Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+        Column("created_at", UtcDateTime, nullable=False),
+    )
+    comment_likes.create(conn, checkfirst=True)
+
+
+@migration(8, "comment replies: parent_id and materialized path")
+def _comment_threads(conn):
+    existing = {c["name"] for c in inspect(conn).get_columns("comments")}
+    if "parent_id" not in existing:
+        conn.execute(
+            text(
+                "ALTER TABLE comments ADD COLUMN parent_id INTEGER REFERENCES comments(id)"
+            )
+        )
+    if "path" not in existing:
+        conn.execute(
+            text(
+                "ALTER TABLE comments ADD COLUMN path VARCHAR(255) NOT NULL DEFAULT ''"
+            )
+        )
+    # Every existing comment is top level.
+    paths = [
+        {"_id": comment_id, "_path": thread_path(comment_id)}
+        for (comment_id,) in conn.execute(select(comments_table.c.id))
+    ]
+    if paths:
+        conn.execute(
+            update(comments_table)
+            .where(comments_table.c.id == bindparam("_id"))
+            .values(path=bindparam("_path")),
+            paths,
+        )
+    _create_index(conn, "comments", "ix_comments_post_id_path", "post_id", "path")
+
+
+@migration(9, "sharded post counters")
+def _post_counter_shards(conn):
+    post_counter_shards = Table(
+        "post_counter_shards",
+        _reflect(conn, "posts"),
+        Column("post_id", Integer, ForeignKey("posts.id"), primary_key=True),
+        Column("counter", String(50), primary_key=True),
+        Column("shard", Integer, primary_key=True, autoincrement=False),
+        Column("delta", Integer, nullable=False),
+    )
+    post_counter_shards.create(conn, checkfirst=True)
+
+
+def current_version(conn) -> int:
+    return conn.scalar(select(func.max(schema_version_table.c.version))) or 0
+
+
+def _record(conn, version: int):
+    conn.execute(
+        insert(schema_version_table).values(
+            version=version, applied_at=datetime.now(UTC)
+        )
+    )
+
+
+def migrate(engine) -> List[int]:
+    """Apply every migration newer than the database. Returns the versions
+    applied, in order."""
+    schema_version_table.create(engine, checkfirst=True)
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        with engine.begin() as conn:
+            if version <= current_version(conn):
+                continue
+            print(f"applying migration {version}: {description}")
+            apply(conn)
+            _record(conn, version)
+        applied.append(version)
+    return applied
+
+
+def stamp(engine):
+    """Mark a database just built by create_all as fully migrated."""
+    schema_version_table.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        done = current_version(conn)
+        for version, _, _ in MIGRATIONS:
+            if version > done:
+                _record(conn, version)
@@ -1,5 +1,7 @@
 from sqlalchemy import (
     DateTime,
+    Index,
+    JSON,
     Table,
     Column,
     Integer,
@@ -7,9 +9,9 @@ from sqlalchemy import (
     ForeignKey,
     Text,
 )
-from sqlalchemy.orm import registry, relationship, column_property
-import json
-from datetime import datetime
+from sqlalchemy.ext.mutable import MutableList
+from sqlalchemy.orm import registry, relationship, column_property, composite
+from datetime import UTC
 from pathlib import Path
 
 from pets.domainmodel.User import User
@@ -18,37 +20,29 @@ from pets.domainmodel.HumanUser import HumanUser
 from pets.domainmodel.Post import Post
 from pets.domainmodel.Comment import Comment
 from pets.domainmodel.Like import Like
+from pets.domainmodel.Size import Size
 from sqlalchemy import TypeDecorator
 
 
-class TagsType(TypeDecorator):
-    impl = String
-    cache_ok = True
-
-    def process_bind_param(self, value, dialect):
-        if value is None:
-            return None
-        return json.dumps(value)
-
-    def process_result_value(self, value, dialect):
-        if value is None:
-            return []
-        return json.loads(value)
+class UtcDateTime(TypeDecorator):
+    """Native timestamp normalised to UTC, so ordering and range filters
+    compare instants. Naive values are taken to be UTC already."""
 
-
-class DateTimeType(TypeDecorator):
-    impl = String
+    impl = DateTime(timezone=True)
     cache_ok = True
 
     def process_bind_param(self, value, dialect):
         if value is None:
             return None
-        return value.isoformat()
+        if value.tzinfo is None:
+            return value.replace(tzinfo=UTC)
+        return value.astimezone(UTC)
 
     def process_result_value(self, value, dialect):
-        if value is None:
-            return None
-        return datetime.fromisoformat(value)
+        # SQLite keeps no offset; the stored value is always UTC.
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=UTC)
+        return value
 
 
 class AnimalTypeType(TypeDecorator):
@@ -87,37 +81,6 @@ class PathType(TypeDecorator):
         return Path(value)
 
 
-class ListType(TypeDecorator):
-    impl = String
-    cache_ok = True
-
-    def process_bind_param(self, value, dialect):
-        if value is None:
-            return None
-        return json.dumps(value)
-
-    def process_result_value(self, value, dialect):
-        if value is None:
-            return []
-        return json.loads(value)
-
-
-class SizeType(TypeDecorator):
-    impl = String
-    cache_ok = True
-
-    def process_bind_param(self, value, dialect):
-        if value is None:
-            return None
-        return json.dumps(list(value)) if value else json.dumps([0, 0])
-
-    def process_result_value(self, value, dialect):
-        if value is None:
-            return (0, 0)
-        data = json.loads(value)
-        return tuple(data)
-
-
 mapper_registry = registry()
 metadata = mapper_registry.metadata
 
@@ -129,7 +92,7 @@ users_table = Table(
     Column("email", String(255), unique=True, nullable=False),
     Column("password_hash", String(255), nullable=False),
     Column("profile_picture_path", PathType(500)),
-    Column("created_at", DateTimeType, nullable=False),
+    Column("created_at", UtcDateTime, nullable=False),
     Column("bio", Text),
     Column("type", String(50)),
 )
@@ -139,6 +102,8 @@ user_following_table = Table(
     metadata,
     Column("follower_id", Integer, ForeignKey("users.id"), primary_key=True),
     Column("followee_id", Integer, ForeignKey("users.id"), primary_key=True),
+    # followers of a user; the primary key already covers follower_id first
+    Index("ix_user_following_followee_id", "followee_id"),
 )
 
 pet_users_table = Table(
@@ -148,14 +113,14 @@ pet_users_table = Table(
     # store animal_type as enum/string using AnimalTypeType
     Column("animal_type", AnimalTypeType, nullable=True),
     # store follower ids as a json list
-    Column("follower_ids", ListType, nullable=True),
+    Column("follower_ids", MutableList.as_mutable(JSON), nullable=True),
 )
 
 human_users_table = Table(
     "human_users",
     metadata,
     Column("id", Integer, ForeignKey("users.id"), primary_key=True),
-    Column("favourite_animals", ListType, nullable=True),
+    Column("favourite_animals", MutableList.as_mutable(JSON), nullable=True),
 )
 
 
@@ -166,11 +131,18 @@ posts_table = Table(
     Column("user_id", Integer, ForeignKey("pet_users.id"), nullable=False),
     Column("caption", Text, nullable=True),
     Column("views", Integer, nullable=False, default=0),
-    Column("created_at", DateTimeType, nullable=False),
-    Column("size", SizeType, nullable=False),
-    Column("tags", TagsType, nullable=False),
+    Column("created_at", UtcDateTime, nullable=False),
+    Column("width", Integer, nullable=False, default=0, server_default="0"),
+    Column("height", Integer, nullable=False, default=0, server_default="0"),
+    Column("tags", JSON, nullable=False),
     Column("media_path", PathType, nullable=False),
     Column("media_type", String(50), nullable=False),
+    # denormalized counters maintained by the like/comment write paths
+    Column("like_count", Integer, nullable=False, default=0, server_default="0"),
+    Column("comment_count", Integer, nullable=False, default=0, server_default="0"),
+    # profile grid (user's posts newest first) and keyset feed ordering
+    Index("ix_posts_user_id_created_at", "user_id", "created_at"),
+    Index("ix_posts_created_at_id", "created_at", "id"),
 )
 
 post_user_association = Table(
@@ -187,8 +159,15 @@ comments_table = Table(
     Column("post_id", Integer, ForeignKey("posts.id"), nullable=False),
     Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
     Column("text", Text, nullable=False),
-    Column("created_at", DateTimeType, nullable=False),
+    Column("created_at", UtcDateTime, nullable=False),
     Column("likes", Integer, nullable=False, default=0),
+    Column("parent_id", Integer, ForeignKey("comments.id"), nullable=True),
+    # materialized path, see pets.domainmodel.Comment.thread_path
+    Column("path", String(255), nullable=False, default=""),
+    # a post's comments in keyset (created_at, id) order, either direction
+    Index("ix_comments_post_id_created_at_id", "post_id", "created_at", "id"),
+    # a post's threads in path order: any subtree is one contiguous range
+    Index("ix_comments_post_id_path", "post_id", "path"),
 )
 
 like_table = Table(
@@ -197,7 +176,66 @@ like_table = Table(
     Column("id", Integer, primary_key=True, autoincrement=True),
     Column("user_id", Integer, ForeignKey("pet_users.id"), nullable=False),
     Column("post_id", Integer, ForeignKey("posts.id"), nullable=False),
-    Column("created_at", DateTimeType, nullable=False),
+    Column("created_at", UtcDateTime, nullable=False),
+    # one like per user per post; toggle_like relies on it for ON CONFLICT
+    Index("ux_likes_user_post", "user_id", "post_id", unique=True),
+    # per-post counts; lookups by user_id use the unique index above
+    Index("ix_likes_post_id", "post_id"),
+)
+
+comment_likes_table = Table(
+    "comment_likes",
+    metadata,
+    Column("comment_id", Integer, ForeignKey("comments.id"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("created_at", UtcDateTime, nullable=False),
+)
+
+# like_count deltas not yet folded into posts, a few rows per post so a like
+# storm on one post spreads over them (see pets.adapters.counters)
+post_counter_shards_table = Table(
+    "post_counter_shards",
+    metadata,
+    Column("post_id", Integer, ForeignKey("posts.id"), primary_key=True),
+    Column("counter", String(50), primary_key=True),
+    Column("shard", Integer, primary_key=True, autoincrement=False),
+    Column("delta", Integer, nullable=False),
+)
+
+# one feed/profile card per post: the post's card fields plus its author's
+# username and avatar, kept in step by the repository's write paths (see
+# pets.adapters.projections) so card reads never join
+post_cards_table = Table(
+    "post_cards",
+    metadata,
+    Column("post_id", Integer, primary_key=True, autoincrement=False),
+    Column("user_id", Integer, nullable=False),
+    Column("username", String(255)),
+    Column("profile_picture_path", String(500)),
+    Column("caption", Text),
+    Column("created_at", UtcDateTime, nullable=False),
+    Column("media_type", String(50), nullable=False),
+    Column("media_path", String(500), nullable=False),
+    Column("like_count", Integer, nullable=False, default=0),
+    Column("comment_count", Integer, nullable=False, default=0),
+    Index("ix_post_cards_created_at_post_id", "created_at", "post_id"),
+    Index("ix_post_cards_user_id_created_at", "user_id", "created_at"),
+)
+
+# hi/lo id allocation: next_value is the first id not yet reserved per table
+id_blocks_table = Table(
+    "id_blocks",
+    metadata,
+    Column("name", String(50), primary_key=True),
+    Column("next_value", Integer, nullable=False),
+)
+
+# one row per migration applied by pets.adapters.migrations
+schema_version_table = Table(
+    "schema_version",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", UtcDateTime, nullable=False),
 )
 
 
@@ -269,10 +307,12 @@ def map_model_to_tables():
             "_Post__caption": posts_table.c.caption,
             "_Post__views": posts_table.c.views,
             "_Post__created_at": posts_table.c.created_at,
-            "_Post__size": posts_table.c.size,
+            "_Post__size": composite(Size, posts_table.c.width, posts_table.c.height),
             "_Post__tags": posts_table.c.tags,
             "_Post__media_path": posts_table.c.media_path,
             "_Post__media_type": posts_table.c.media_type,
+            "_Post__like_count": posts_table.c.like_count,
+            "_Post__comment_count": posts_table.c.comment_count,
             "_Post__user": relationship(PetUser, back_populates="_PetUser__posts"),
             "_Post__comments": relationship(
                 Comment, back_populates="_Comment__post", cascade="all, delete-orphan"
@@ -293,6 +333,8 @@ def map_model_to_tables():
             "_Comment__created_at": comments_table.c.created_at,
             "_Comment__comment_string": comments_table.c.text,
             "_Comment__likes": comments_table.c.likes,
+            "_Comment__parent_id": comments_table.c.parent_id,
+            "_Comment__path": comments_table.c.path,
             "_Comment__post": relationship(Post, back_populates="_Post__comments"),
         },
     )
@@ -1,29 +1,80 @@
+from pathlib import Path
+
 from pets.adapters.repository import AbstractRepository
-from pets.adapters.datareaders.data_reader import DataReader
+from pets.adapters.datareaders import DEFAULT_CHUNK_SIZE, chunked
+from pets.adapters.datareaders.comments_reader import CommentsReader
+from pets.adapters.datareaders.data_reader import DataReader, read_in_parallel
+from pets.adapters.datareaders.likes_reader import LikesReader
+from pets.adapters.datareaders.pet_user_reader import PetUserReader
+from pets.adapters.datareaders.posts_reader import PostsReader
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
 
+def snapshot_is_current(snapshot_path: Path | str) -> bool:
+    """True when the snapshot exists and is newer than every seed CSV."""
+    snapshot_path = Path(snapshot_path)
+    if not snapshot_path.exists():
+        return False
+    newest_csv = max(
+        (p.stat().st_mtime for p in DATA_DIR.glob("*.csv")), default=float("-inf")
+    )
+    return snapshot_path.stat().st_mtime > newest_csv
 
-def populate(repo: AbstractRepository, database_mode: bool = False):
-    data_reader = DataReader()
 
+def populate(
+    repo: AbstractRepository,
+    database_mode: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    processes: int = 0,
+):
+    """Seed *repo* from the CSVs. processes > 1 parses the four files in
+    parallel worker processes."""
     if database_mode:
-        # Database mode: add data via repository methods
-        print("populating pet users...")
-        repo.add_multiple_pet_users(data_reader.users)
-        print("done populating pet users")
-        print("populating posts...")
-        repo.add_multiple_posts(data_reader.users, data_reader.posts)
-        print("done populating posts")
-        print("populating comments...")
-        repo.add_multiple_comments(data_reader.users, data_reader.comments)
-        print("done populating comments")
-        print("populating likes...")
-        repo.add_multiple_likes(data_reader.likes)
-        print("done populating likes")
-        print("populating followers...")
-        repo.add_multiple_followers(
-            [(u.user_id, u.follower_ids) for u in data_reader.users]
-        )
-        print("done populating followers")
+        # Database mode: stream chunks through the repository bulk methods
+        _populate_database(repo, chunk_size, processes)
     else:
-        # Memory mode: simple population
+        # Memory mode: the repository keeps the whole linked graph anyway
+        data_reader = DataReader(processes)
         repo.populate(data_reader.users, data_reader.max_like_id)
+
+
+def _populate_database(repo: AbstractRepository, chunk_size: int, processes: int):
+    if processes > 1:
+        # Parsed files come back whole, so only the inserts are chunked.
+        pet_user_reader, posts_reader, likes_reader, comments_reader = read_in_parallel(
+            processes
+        )
+        users = chunked(pet_user_reader.users, chunk_size)
+        posts = chunked(posts_reader.posts, chunk_size)
+        comments = chunked(comments_reader.comments, chunk_size)
+        likes = chunked(likes_reader.likes, chunk_size)
+    else:
+        # Only one chunk of rows is alive at a time.
+        users = PetUserReader().iter_pet_users(chunk_size)
+        posts = PostsReader().iter_posts(chunk_size)
+        comments = CommentsReader().iter_comments(chunk_size)
+        likes = LikesReader().iter_likes(chunk_size)
+
+    loader = repo.bulk_loader()
+    # Follow edges need every user inserted first; keep just the ids.
+    followers = []
+
+    def users_noting_followers():
+        for chunk in users:
+            followers.extend((u.user_id, u.follower_ids) for u in chunk)
+            yield chunk
+
+    print("populating pet users...")
+    loader.load_pet_users(users_noting_followers())
+    print("populating posts...")
+    loader.load_posts(posts)
+    print("populating comments...")
+    loader.load_comments(comments)
+    print("populating likes...")
+    loader.load_likes(likes)
+    print("populating followers...")
+    loader.load_followers(followers)
+    # Posts were inserted before their likes and comments.
+    repo.backfill_post_counters()
+    print(loader.report())
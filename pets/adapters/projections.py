@@ -0,0 +1,95 @@
+"""The post_cards projection: one denormalized feed/profile card per post.
+
+The repository keeps it current inside the same transaction as each write
+that changes a card: posts created or deleted, like and comment counters,
+and author renames or new avatars. Everything here takes a Connection or a
+Session. rebuild_post_cards recomputes the table from the source tables
+and diff_post_cards compares the two, for checking a live database.
+"""
+
+from typing import Dict, Iterable, List
+
+from sqlalchemy import String, delete, insert, select, type_coerce, update
+
+from pets.adapters.orm import post_cards_table, posts_table, users_table
+
+CARD_COLUMNS = [c.name for c in post_cards_table.columns]
+
+
+def _card_source():
+    # Rows shaped like post_cards, computed from posts and users.
+    return select(
+        posts_table.c.id.label("post_id"),
+        posts_table.c.user_id,
+        users_table.c.username,
+        type_coerce(users_table.c.profile_picture_path, String).label(
+            "profile_picture_path"
+        ),
+        posts_table.c.caption,
+        posts_table.c.created_at,
+        posts_table.c.media_type,
+        type_coerce(posts_table.c.media_path, String).label("media_path"),
+        posts_table.c.like_count,
+        posts_table.c.comment_count,
+    ).select_from(
+        posts_table.outerjoin(users_table, users_table.c.id == posts_table.c.user_id)
+    )
+
+
+def refresh_post_cards(conn, post_ids: Iterable[int]):
+    """Recompute the cards of these posts; a deleted post's card goes away."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    conn.execute(
+        delete(post_cards_table).where(post_cards_table.c.post_id.in_(post_ids))
+    )
+    conn.execute(
+        insert(post_cards_table).from_select(
+            CARD_COLUMNS, _card_source().where(posts_table.c.id.in_(post_ids))
+        )
+    )
+
+
+def refresh_user_post_cards(conn, user_id: int):
+    """Recompute every card of one author, e.g. after a rename."""
+    conn.execute(delete(post_cards_table).where(post_cards_table.c.user_id == user_id))
+    conn.execute(
+        insert(post_cards_table).from_select(
+            CARD_COLUMNS, _card_source().where(posts_table.c.user_id == user_id)
+        )
+    )
+
+
+def set_post_card_count(conn, post_id: int, column: str, value: int):
+    # column is like_count or comment_count, copied from posts after the
+    # counter update that produced value.
+    conn.execute(
+        update(post_cards_table)
+        .where(post_cards_table.c.post_id == post_id)
+        .values({column: value})
+    )
+
+
+def rebuild_post_cards(conn) -> int:
+    """Replace the whole projection. Returns the number of cards."""
+    conn.execute(delete(post_cards_table))
+    return conn.execute(
+        insert(post_cards_table).from_select(CARD_COLUMNS, _card_source())
+    ).rowcount
+
+
+def diff_post_cards(conn) -> Dict[str, List[int]]:
+    """Post ids whose card is missing, has no post any more ("extra") or
+    differs from what rebuild_post_cards would write ("stale")."""
+    expected = {row.post_id: tuple(row) for row in conn.execute(_card_source())}
+    live = {row.post_id: tuple(row) for row in conn.execute(select(post_cards_table))}
+    return {
+        "missing": sorted(expected.keys() - live.keys()),
+        "extra": sorted(live.keys() - expected.keys()),
+        "stale": sorted(
+            post_id
+            for post_id in expected.keys() & live.keys()
+            if expected[post_id] != live[post_id]
+        ),
+    }
@@ -0,0 +1,56 @@
+"""Read-only views for the hot read endpoints.
+
+Both repositories build these straight from rows (or from their indexes in
+memory mode) so the feed, comment list and user panel never hydrate ORM
+objects just to copy a few fields out of them. They are plain NamedTuples:
+immutable, attribute access like the domain objects, and no per-instance
+__dict__.
+"""
+
+from datetime import datetime
+from typing import NamedTuple
+
+
+class PostCard(NamedTuple):
+    # Same fields, in the same order, as the post_cards table.
+    id: int
+    user_id: int
+    username: str | None
+    profile_picture_path: str | None
+    caption: str | None
+    created_at: datetime
+    media_type: str
+    media_path: str
+    like_count: int
+    comment_count: int
+
+
+class CommentView(NamedTuple):
+    id: int
+    post_id: int
+    user_id: int
+    author: str | None
+    profile_picture_path: str | None
+    text: str
+    created_at: datetime
+    likes: int
+    parent_id: int | None
+    path: str
+
+    @property
+    def depth(self) -> int:
+        return self.path.count("/")
+
+    @property
+    def top_level_id(self) -> int:
+        # The comment that starts this one's thread (itself when top level).
+        return int(self.path.split("/", 1)[0])
+
+
+class UserSummary(NamedTuple):
+    user_id: int
+    username: str
+    bio: str | None
+    profile_picture_path: str | None
+    posts_count: int
+    followers_count: int
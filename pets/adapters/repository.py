@@ -1,8 +1,10 @@
 import abc
-from typing import List
-from datetime import date
+from typing import Dict, List, Tuple
+from datetime import date, datetime
+from pathlib import Path
 
 
+from pets.adapters.read_models import CommentView, PostCard, UserSummary
 from pets.domainmodel import PetUser, HumanUser, User, Like, Comment, Post
 
 repo_instance = None
@@ -54,6 +56,39 @@ class AbstractRepository(abc.ABC):
         # Retrieves a User by their ID.
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_user_by_name(self, username: str) -> User:
+        # Retrieves a Pet, Human or Temp User by their username, as the
+        # right subclass.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_user_by_id(self, user_id: int) -> User:
+        # Retrieves a Pet, Human or Temp User by their ID.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def add_temp_user(self, user: User):
+        # Holds a newly registered User who hasn't picked a type yet. Temp
+        # Users are kept in memory only; get_user_by_name/_by_id find them too.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_temp_user_by_name(self, username: str) -> User:
+        # Retrieves a temp User by their username.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_temp_user_by_id(self, user_id: int) -> User:
+        # Retrieves a temp User by their ID.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        # Retrieves the Users with the given IDs, each once and in the order
+        # given; unknown IDs are skipped.
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_all_user_post_paths(self, user: User) -> List[str]:
         # Retrieves all post media paths for a given user.
@@ -74,6 +109,18 @@ class AbstractRepository(abc.ABC):
         # Adds a Post to the repository.
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def create_post(
+        self,
+        user: PetUser,
+        caption: str,
+        tags: List[str],
+        media_path: Path,
+        media_type: str,
+    ) -> Post:
+        # Creates a Post with a newly allocated ID and adds it to the repository.
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_photo_posts(self) -> List[Post]:
         # Retrieves all photo Posts.
@@ -131,7 +178,7 @@ class AbstractRepository(abc.ABC):
 
     @abc.abstractmethod
     def delete_comment(self, user: User, comment: Comment):
-        # Deletes a Comment from the repository.
+        # Deletes a Comment, and every reply beneath it, from the repository.
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -140,13 +187,17 @@ class AbstractRepository(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def next_comment_id(self) -> int:
-        # Retrieves the next available comment ID.
+    def next_user_id(self) -> int:
+        # Allocates an id for a User that is not yet stored (e.g. a TempUser).
         raise NotImplementedError
 
     @abc.abstractmethod
-    def create_comment(self, user: User, post: Post, text: str) -> Comment:
-        # Creates and adds a Comment to the repository.
+    def create_comment(
+        self, user: User, post: Post, text: str, parent_id: int | None = None
+    ) -> Comment:
+        # Creates and adds a Comment to the repository, as a reply to the
+        # Comment parent_id when given. Raises ValueError when the parent is
+        # not on the Post or is already nested MAX_DEPTH deep.
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -193,3 +244,92 @@ class AbstractRepository(abc.ABC):
     def get_all_posts(self) -> List[type[Post]]:
         # Retrieves all Posts in the repository.
         raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_feed_page(
+        self, before_created_at: datetime | None, before_id: int | None, limit: int
+    ) -> List[Post]:
+        # Retrieves up to limit Posts, newest first, strictly older than the
+        # (before_created_at, before_id) keyset cursor (or from the top when None).
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_feed_cards(
+        self, before_created_at: datetime | None, before_id: int | None, limit: int
+    ) -> List[PostCard]:
+        # The same page as get_feed_page, as read-only PostCards.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_user_cards(self, user_id: int) -> List[PostCard]:
+        # A User's PostCards, newest first.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def check_post_cards(self, repair: bool = False) -> Dict[str, List[int]]:
+        # Compares the stored PostCards with ones rebuilt from the Posts and
+        # returns the differing post ids under "missing", "extra" and "stale";
+        # with repair, replaces the stored cards when any differ.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_comment_views_page(
+        self,
+        post_id: int,
+        cursor_created_at: datetime | None,
+        cursor_id: int | None,
+        limit: int,
+        newest_first: bool = False,
+    ) -> List[CommentView]:
+        # Up to limit of a Post's top-level CommentViews past the
+        # (created_at, id) cursor, oldest first or newest first; no cursor
+        # starts at the end the order begins from.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_comment_replies(
+        self, post_id: int, top_level_ids: List[int], limit: int
+    ) -> List[CommentView]:
+        # The first limit replies, at any depth, under each of a Post's
+        # top-level Comments, in thread order.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_comment_thread(self, post_id: int, comment_id: int) -> List[CommentView]:
+        # A Comment and every reply beneath it, in thread order; [] when the
+        # Comment is not on the Post.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_comment_views(self, post_id: int) -> List[CommentView]:
+        # The Post's Comments in the order they were made, each with its
+        # author's username and profile picture.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_user_summary(self, user_id: int) -> UserSummary | None:
+        # A User's profile fields with post and follower counts, or None.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_engagement(
+        self, post_ids: List[int], viewer_id: int | None
+    ) -> Dict[int, dict]:
+        # Retrieves {post_id: {"likes_count", "comments_count", "liked"}} for
+        # many Posts at once; "liked" is whether viewer_id has liked the Post.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def toggle_like(self, user_id: int, post_id: int) -> Tuple[bool, int] | None:
+        # Likes the Post if user_id hasn't yet, otherwise removes the Like.
+        # Returns (liked, like_count), or None when the Post does not exist.
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def like_comment(
+        self, user_id: int, post_id: int, comment_id: int
+    ) -> Tuple[bool, int] | None:
+        # Likes the Comment once per user; liking it again changes nothing.
+        # Returns (liked, likes), where liked is False for a repeat, or None
+        # when the Comment does not exist under post_id.
+        raise NotImplementedError
@@ -0,0 +1,47 @@
+import threading
+from collections import OrderedDict
+
+from pets.domainmodel.User import User
+
+
+class UserCache:
+    """A small thread-safe LRU of users by id, shared across requests.
+
+    The database repository stores detached copies here and merges them
+    into the current session on a hit, so entries are never handed out or
+    changed in place. Anything that changes a stored user's row (or its
+    type) must invalidate it.
+    """
+
+    def __init__(self, max_size: int = 128):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.__max_size = max_size
+        self.__users: "OrderedDict[int, User]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__users)
+
+    def get(self, user_id: int) -> User | None:
+        with self.__lock:
+            user = self.__users.get(user_id)
+            if user is not None:
+                self.__users.move_to_end(user_id)
+            return user
+
+    def put(self, user_id: int, user: User):
+        with self.__lock:
+            self.__users[user_id] = user
+            self.__users.move_to_end(user_id)
+            while len(self.__users) > self.__max_size:
+                self.__users.popitem(last=False)
+
+    def invalidate(self, *user_ids: int):
+        with self.__lock:
+            for user_id in user_ids:
+                self.__users.pop(user_id, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__users.clear()
@@ -0,0 +1,118 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+from sqlalchemy.engine import Connection, Engine
+
+WriteOperation = Callable[[Connection], object]
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Serializes database writes through one writer thread.
+
+    Callers submit a function of a Connection and get a Future back. The
+    writer takes everything queued at that moment (up to max_batch), runs it
+    in a single transaction and commits once, so a burst of writes costs one
+    fsync instead of one each. If any operation in a batch fails, the batch
+    is rolled back and each operation is retried in its own transaction, so
+    only the failing caller sees the error. Operations may therefore run
+    twice and must not have side effects outside the connection.
+    """
+
+    def __init__(self, engine: Engine, max_batch: int = 256):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.__engine = engine
+        self.__max_batch = max_batch
+        self.__queue: "queue.Queue" = queue.Queue()
+        self.__closed = False
+        self.__batches = 0
+        self.__writes = 0
+        self.__thread = threading.Thread(
+            target=self.__run, name="pets-db-writer", daemon=True
+        )
+        self.__thread.start()
+
+    @property
+    def batches(self) -> int:
+        # Transactions committed so far; for tests and tuning.
+        return self.__batches
+
+    @property
+    def writes(self) -> int:
+        # Operations committed so far, across all batches.
+        return self.__writes
+
+    def submit(self, operation: WriteOperation) -> Future:
+        if self.__closed:
+            raise RuntimeError("write queue is closed")
+        if threading.current_thread() is self.__thread:
+            raise RuntimeError("cannot submit to the write queue from its writer")
+        future = Future()
+        self.__queue.put((operation, future))
+        return future
+
+    def execute(self, operation: WriteOperation):
+        """Submit an operation and wait for its result (or exception)."""
+        return self.submit(operation).result()
+
+    def close(self):
+        """Finish everything already queued, then stop the writer."""
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__queue.put(_STOP)
+        self.__thread.join()
+
+    def __run(self):
+        while True:
+            item = self.__queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.__max_batch:
+                try:
+                    item = self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self.__commit(batch)
+            if stop:
+                return
+
+    def __commit(self, batch: List[Tuple[WriteOperation, Future]]):
+        batch = [(op, f) for op, f in batch if f.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            with self.__engine.begin() as conn:
+                results = [operation(conn) for operation, _ in batch]
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            for operation, future in batch:
+                self.__run_alone(operation, future)
+            return
+        self.__batches += 1
+        self.__writes += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def __run_alone(self, operation: WriteOperation, future: Future):
+        try:
+            with self.__engine.begin() as conn:
+                result = operation(conn)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            self.__batches += 1
+            self.__writes += 1
+            future.set_result(result)
@@ -75,6 +75,8 @@ def login():
             else:
                 session["is_temp"] = False
             session["user_name"] = user["user_name"]
+            session["user_id"] = int(user["user_id"])
+            session["user_type"] = user["user_type"]
             return redirect(url_for("feed.feed"))
 
         except services.UnknownUserException:
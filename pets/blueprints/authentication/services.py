@@ -35,9 +35,7 @@ def add_user(user_name: str, email: str, password: str):
         raise ValueError("username is required")
 
     username_clean = user_name.strip()
-    existing = repo.get_pet_user_by_name(username_clean) or repo.get_human_user_by_name(
-        username_clean
-    )
+    existing = repo.get_user_by_name(username_clean)
 
     if existing is not None:
         raise NameNotUniqueException
@@ -51,7 +49,7 @@ def add_user(user_name: str, email: str, password: str):
 
     if testing:
         new_user = TempUser(
-            user_id=repo.get_temp_user_max_id() + 1,
+            user_id=repo.next_user_id(),
             username=username_clean,
             email=email,
             password_hash=password_hash,
@@ -73,11 +71,7 @@ def add_user(user_name: str, email: str, password: str):
 
 
 def get_user(user_name: str, repo: AbstractRepository):
-    user = (
-        repo.get_pet_user_by_name(user_name)
-        or repo.get_human_user_by_name(user_name)
-        or repo.get_temp_user_by_name(user_name)
-    )
+    user = repo.get_user_by_name(user_name)
 
     if user is None:
         print(
@@ -89,11 +83,7 @@ def get_user(user_name: str, repo: AbstractRepository):
 
 def authenticate_user(user_name: str, password: str, repo: AbstractRepository):
     authenticated = False
-    user = (
-        repo.get_pet_user_by_name(user_name)
-        or repo.get_human_user_by_name(user_name)
-        or repo.get_temp_user_by_name(user_name)
-    )
+    user = repo.get_user_by_name(user_name)
     if user is None:
         print(
             f"DEBUG: authenticate_user - no user for '{user_name}' (repo: {repo.__class__.__name__})"
@@ -108,11 +98,7 @@ def authenticate_user(user_name: str, password: str, repo: AbstractRepository):
 
 
 def get_user_by_id(user_id, repo: AbstractRepository):
-    user = (
-        repo.get_pet_user_by_id(user_id)
-        or repo.get_human_user_by_id(user_id)
-        or repo.get_temp_user_by_id(user_id)
-    )
+    user = repo.get_user_by_id(user_id)
     if user is None:
         raise UnknownUserException
     return user_to_dict(user)
@@ -124,5 +110,6 @@ def user_to_dict(user: User) -> dict:
         "email": user.email,
         "user_name": user.username,
         "password": user.password_hash,
+        "user_type": user.__class__.__name__,
     }
     return user_dict
@@ -1,4 +1,7 @@
+import base64
 import math
+from collections import defaultdict
+from datetime import datetime
 from pathlib import Path
 from flask import (
     Blueprint,
@@ -10,11 +13,22 @@ from flask import (
     url_for,
 )
 from pets.adapters import repository
+from pets.adapters.read_models import CommentView, PostCard, UserSummary
 from pets.blueprints.authentication.authentication import login_required
 from pets.blueprints.services import _repo
+from pets.domainmodel.TempUser import TempUser
+from pets.utilities.auth import get_session_user
 
 feed_bp = Blueprint("feed", __name__)
 BATCH_SIZE = 8
+MAX_ENGAGEMENT_IDS = 100
+COMMENTS_PAGE_SIZE = 20
+MAX_COMMENTS_PAGE_SIZE = 100
+COMMENT_ORDERS = {"oldest": False, "newest": True}
+# Replies shown under each top-level comment of a page; the rest of a thread
+# comes from the thread endpoint.
+REPLIES_PREVIEW = 3
+MAX_REPLIES_PREVIEW = 20
 
 
 def _truncate_count(count: int) -> str:
@@ -26,24 +40,44 @@ def _truncate_count(count: int) -> str:
         return str(count)
 
 
-def _serialize_post(p):
-    created = getattr(p, "created_at", "")
-    if hasattr(created, "isoformat"):
-        created = created.isoformat()
-    media_path = getattr(p, "media_path", "")
-    if isinstance(media_path, Path):
-        media_path = str(media_path)
+def _encode_cursor(post) -> str:
+    raw = f"{post.created_at.isoformat()}|{int(post.id)}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
 
-    user_id = getattr(p, "user_id", None)
+
+def _stored(user):
+    # Temp users aren't saved yet, so they can't like, comment or follow.
+    return None if isinstance(user, TempUser) else user
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError when the cursor was not produced by _encode_cursor."""
+    raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    created_at, post_id = raw.rsplit("|", 1)
+    return datetime.fromisoformat(created_at), int(post_id)
+
+
+def _feed_page(before_created_at=None, before_id=None):
+    """Return (posts, next_cursor); next_cursor is None on the last page."""
+    # Ask for one extra row to learn whether another page exists.
+    page = _repo().get_feed_cards(before_created_at, before_id, BATCH_SIZE + 1)
+    posts = page[:BATCH_SIZE]
+    next_cursor = (
+        _encode_cursor(posts[-1]) if len(page) > BATCH_SIZE and posts else None
+    )
+    return posts, next_cursor
+
+
+def _serialize_post(card: PostCard):
     return {
-        "id": int(getattr(p, "id", 0)),
-        "user_id": int(user_id),
-        "caption": str(getattr(p, "caption", "")),
-        "created_at": created,
-        "media_type": str(getattr(p, "media_type", "")),
-        "media_path": str(media_path),
-        "likes_count": _truncate_count(len(getattr(p, "likes", []))),
-        "comments_count": _truncate_count(len(getattr(p, "comments", []))),
+        "id": card.id,
+        "user_id": card.user_id,
+        "caption": str(card.caption),
+        "created_at": card.created_at.isoformat(),
+        "media_type": card.media_type,
+        "media_path": card.media_path,
+        "likes_count": _truncate_count(card.like_count),
+        "comments_count": _truncate_count(card.comment_count),
     }
 
 
@@ -55,36 +89,21 @@ def like_post(post_id: int):
     if not username:
         return jsonify({"error": "Not authenticated"}), 401
 
-    user = repo.get_human_user_by_name(username) or repo.get_pet_user_by_name(username)
+    user = _stored(get_session_user())
     if not user:
         return jsonify({"error": "User not found"}), 403
 
-    post = repo.get_post_by_id(post_id)
-    if not post:
+    result = repo.toggle_like(user.user_id, post_id)
+    if result is None:
         return jsonify({"error": "Post not found"}), 404
+    liked, likes_count = result
 
-    user_id = getattr(user, "id", None)
-    likes_list = getattr(post, "likes", []) or []
-    existing = next(
-        (l for l in likes_list if getattr(l, "user_id", None) == user_id), None
-    )
-
-    if existing:
-        # user already liked -> remove (toggle off)
-        repo.delete_like(user, post)
-        liked = False
-    else:
-        # not liked -> add (toggle on)
-        repo.add_like(user, post)
-        liked = True
-
-    likes_count = len(getattr(post, "likes", []) or [])
     return (
         jsonify(
             {
                 "post_id": post_id,
                 "liked": liked,
-                "already_liked": existing is not None,
+                "already_liked": not liked,
                 "likes_count": likes_count,
             }
         ),
@@ -92,6 +111,36 @@ def like_post(post_id: int):
     )
 
 
+@feed_bp.route("/api/posts/engagement")
+def engagement():
+    """Counts and the viewer's liked flag for a batch of posts (?ids=1,2,3)."""
+    try:
+        post_ids = [int(i) for i in request.args.get("ids", "").split(",") if i.strip()]
+    except ValueError:
+        return jsonify({"error": "Invalid post ids"}), 400
+    if len(post_ids) > MAX_ENGAGEMENT_IDS:
+        return jsonify({"error": "Too many post ids"}), 400
+
+    repo = _repo()
+    username = session.get("user_name")
+    viewer = get_session_user() if username else None
+    viewer_id = viewer.user_id if viewer else None
+
+    stats = repo.get_engagement(post_ids, viewer_id)
+    return jsonify(
+        {
+            "engagement": {
+                str(post_id): {
+                    "likes_count": _truncate_count(s["likes_count"]),
+                    "comments_count": _truncate_count(s["comments_count"]),
+                    "liked": s["liked"],
+                }
+                for post_id, s in stats.items()
+            }
+        }
+    )
+
+
 @feed_bp.route("/")
 @login_required
 def feed():
@@ -100,49 +149,39 @@ def feed():
     if not session.get("user_name"):
         return redirect(url_for("authentication_bp.register"))
 
-    all_posts = _repo().get_all_posts()
-    all_posts.sort(key=lambda p: getattr(p, "created_at", None), reverse=True)
-    initial = all_posts[:BATCH_SIZE]
+    initial, next_cursor = _feed_page()
 
-    session_user_name = session.get("user_name")
-    session_user = (
-        _repo().get_pet_user_by_name(session_user_name)
-        or _repo().get_human_user_by_name(session_user_name)
-        or _repo().get_temp_user_by_name(session_user_name)
-    )
+    session_user = get_session_user()
     type = session_user.__class__.__name__
 
     return render_template(
         "pages/feed.html",
         posts=initial,
+        next_cursor=next_cursor or "",
         type=type,
-        likes_count={p.id: len(getattr(p, "likes", []) or []) for p in initial},
-        comments_count={p.id: len(getattr(p, "comments", []) or []) for p in initial},
+        likes_count={p.id: p.like_count for p in initial},
+        comments_count={p.id: p.comment_count for p in initial},
     )
 
 
 @feed_bp.route("/api/feed")
 def feed_batch():
-    all_posts = _repo().get_all_posts()
-    all_posts.sort(key=lambda p: getattr(p, "created_at", None), reverse=True)
-    try:
-        offset = int(request.args.get("offset", 0))
-        if offset < 0:
-            offset = 0
-    except ValueError:
-        offset = 0
-    slice_ = all_posts[offset : offset + BATCH_SIZE]
-    next_offset = offset + len(slice_)
-    has_more = next_offset < len(all_posts)
+    cursor = request.args.get("cursor", "")
+    if cursor:
+        try:
+            before_created_at, before_id = _decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        posts, next_cursor = _feed_page(before_created_at, before_id)
+    else:
+        posts, next_cursor = _feed_page()
 
     return jsonify(
         {
-            "posts": [_serialize_post(p) for p in slice_],
-            "offset": offset,
-            "next_offset": next_offset,
-            "has_more": has_more,
+            "posts": [_serialize_post(p) for p in posts],
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
             "batch_size": BATCH_SIZE,
-            "total": len(all_posts),
         }
     )
 
@@ -155,19 +194,22 @@ def add_like_to_comment(post_id: int, comment_id: int):
     if not username:
         return jsonify({"error": "Not authenticated"}), 401
 
-    comments = repo.get_comments_for_post(post_id)
-    comment = next((c for c in comments if getattr(c, "id", None) == comment_id), None)
+    user = _stored(get_session_user())
+    if not user:
+        return jsonify({"error": "User not found"}), 403
 
-    if not comment:
+    result = repo.like_comment(user.user_id, post_id, comment_id)
+    if result is None:
         return jsonify({"error": "Comment not found"}), 404
+    liked, likes = result
 
-    repo.add_like_to_comment(comment)
     return jsonify(
         {
-            "message": "Like added to comment",
+            "message": "Like added to comment" if liked else "Comment already liked",
             "post_id": post_id,
             "comment_id": comment_id,
-            "likes": getattr(comment, "likes", 0),
+            "liked": liked,
+            "likes": likes,
         }
     ), 200
 
@@ -179,7 +221,7 @@ def comments(post_id: int):
         username = session.get("user_name")
         if not username:
             return jsonify({"error": "Not authenticated"}), 401
-        user = repo.get_human_user_by_name(username) or repo.get_pet_user_by_name(username)
+        user = _stored(get_session_user())
         if not user:
             return jsonify({"error": "User not found"}), 403
         post = repo.get_post_by_id(post_id)
@@ -192,8 +234,16 @@ def comments(post_id: int):
             return jsonify({"error": "Empty comment"}), 400
         if len(text) > 500:
             return jsonify({"error": "Comment too long"}), 400
-
-        comment = repo.create_comment(user, post, text)
+        parent_id = data.get("parent_id")
+        if parent_id is not None and (
+            isinstance(parent_id, bool) or not isinstance(parent_id, int)
+        ):
+            return jsonify({"error": "Invalid parent_id"}), 400
+
+        try:
+            comment = repo.create_comment(user, post, text, parent_id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         created = getattr(comment, "created_at", "")
         if hasattr(created, "isoformat"):
             created = created.isoformat()
@@ -217,67 +267,125 @@ def comments(post_id: int):
                         "profile_picture_path": str(pfp),
                         "likes": 0,
                         "can_delete": True,
+                        "parent_id": comment.parent_id,
+                        "path": comment.path,
+                        "depth": comment.depth,
                     },
                 }
             ),
             201,
         )
 
-    # GET branch
+    # GET branch: one page of comments, ?cursor=&limit=&order=oldest|newest
+    order = request.args.get("order", "oldest")
+    if order not in COMMENT_ORDERS:
+        return jsonify({"error": "Invalid order"}), 400
+    try:
+        limit = int(request.args.get("limit", COMMENTS_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    limit = max(1, min(limit, MAX_COMMENTS_PAGE_SIZE))
+    try:
+        replies_limit = int(request.args.get("replies", REPLIES_PREVIEW))
+    except ValueError:
+        return jsonify({"error": "Invalid replies"}), 400
+    replies_limit = max(0, min(replies_limit, MAX_REPLIES_PREVIEW))
+    cursor_created_at = cursor_id = None
+    cursor = request.args.get("cursor", "")
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = _decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
     post = repo.get_post_by_id(post_id)
     items = []
     if post is not None:
-        items = list(getattr(post, "comments", []) or [])
+        # One extra row tells whether another page exists.
+        items = repo.get_comment_views_page(
+            post_id, cursor_created_at, cursor_id, limit + 1, COMMENT_ORDERS[order]
+        )
+    next_cursor = _encode_cursor(items[limit - 1]) if len(items) > limit else None
+    items = items[:limit]
+
+    # One more reply than shown tells whether a thread continues.
+    replies = defaultdict(list)
+    if items and replies_limit:
+        for reply in repo.get_comment_replies(
+            post_id, [c.id for c in items], replies_limit + 1
+        ):
+            replies[reply.top_level_id].append(reply)
+
+    session_user_id = _session_user_id()
+    comments = []
+    for c in items:
+        comment = _serialize_comment(c, session_user_id, post.user_id)
+        comment["replies"] = [
+            _serialize_comment(r, session_user_id, post.user_id)
+            for r in replies[c.id][:replies_limit]
+        ]
+        comment["more_replies"] = len(replies[c.id]) > replies_limit
+        comments.append(comment)
 
-    # Resolve session user id to compare ownership
-    session_username = session.get("user_name")
-    session_user = (
-        repo.get_human_user_by_name(session_username) or
-        repo.get_pet_user_by_name(session_username)
-        if session_username else None
+    return jsonify(
+        {
+            "post_id": post_id,
+            "current_user_id": session_user_id,
+            "comments": comments,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        }
     )
-    session_user_id = int(getattr(session_user, "id", getattr(session_user, "user_id", 0))) if session_user else None
 
-    def user_for(user_id: int):
-        return repo.get_human_user_by_id(user_id) or repo.get_pet_user_by_id(user_id)
 
-    def username_for(user_id: int):
-        u = user_for(user_id)
-        return getattr(u, "username", f"User {user_id}")
+@feed_bp.route("/api/comments/<int:post_id>/thread/<int:comment_id>")
+def comment_thread(post_id: int, comment_id: int):
+    """A comment and every reply beneath it, in thread order."""
+    repo = _repo()
+    post = repo.get_post_by_id(post_id)
+    thread = repo.get_comment_thread(post_id, comment_id) if post else []
+    if not thread:
+        return jsonify({"error": "Comment not found"}), 404
+    session_user_id = _session_user_id()
+    return jsonify(
+        {
+            "post_id": post_id,
+            "current_user_id": session_user_id,
+            "comments": [
+                _serialize_comment(c, session_user_id, post.user_id) for c in thread
+            ],
+        }
+    )
 
-    def ser(c):
-        created = getattr(c, "created_at", "")
-        if hasattr(created, "isoformat"):
-            created = created.isoformat()
-        uid = int(getattr(c, "user_id", 0))
-        u = user_for(uid)
-        pfp = getattr(u, "profile_picture_path", "")
-        if "." == str(pfp):
-            pfp = Path("/static/images/assets/user.png")
 
-        author = getattr(c, "author", None) or username_for(uid)
-        text = getattr(c, "text", None) or getattr(c, "comment_string", "")
-        likes = int(getattr(c, "likes", 0))
+def _session_user_id():
+    # Resolve session user id to compare ownership
+    session_username = session.get("user_name")
+    session_user = get_session_user() if session_username else None
+    return int(getattr(session_user, "id", getattr(session_user, "user_id", 0))) if session_user else None
 
-        # can_delete if the comment's user_id matches the session user's id
-        can_delete = session_user_id is not None and uid == session_user_id or post.user_id == session_user_id
 
-        return {
-            "id": int(getattr(c, "id", 0)),
-            "author": str(author),
-            "user_id": uid,
-            "text": str(text),
-            "created_at": created,
-            "profile_picture_path": str(pfp),
-            "likes": likes,
-            "can_delete": can_delete,
-        }
+def _serialize_comment(c: CommentView, session_user_id, post_user_id):
+    pfp = c.profile_picture_path or ""
+    if "." == pfp:
+        pfp = "/static/images/assets/user.png"
 
-    return jsonify({
-        "post_id": post_id,
-        "current_user_id": session_user_id,
-        "comments": [ser(c) for c in items]
-    })
+    # can_delete if the comment's user_id matches the session user's id
+    can_delete = session_user_id is not None and c.user_id == session_user_id or post_user_id == session_user_id
+
+    return {
+        "id": c.id,
+        "author": c.author or f"User {c.user_id}",
+        "user_id": c.user_id,
+        "text": c.text,
+        "created_at": c.created_at.isoformat(),
+        "profile_picture_path": pfp,
+        "likes": c.likes,
+        "can_delete": can_delete,
+        "parent_id": c.parent_id,
+        "path": c.path,
+        "depth": c.depth,
+    }
 
 
 @feed_bp.route("/delete/post/<int:post_id>/comment/<int:comment_id>", methods=["POST"])
@@ -287,9 +395,7 @@ def delete_comment(post_id:int, comment_id: int):
     username = session.get("user_name")
     if not username:
         return jsonify({"error": "Not authenticated"}), 401
-    user = repo.get_human_user_by_name(username) or repo.get_pet_user_by_name(
-        username
-    )
+    user = _stored(get_session_user())
     if not user:
         return jsonify({"error": "User not found"}), 403
 
@@ -305,7 +411,7 @@ def delete_comment(post_id:int, comment_id: int):
     if getattr(comment, "user_id", None) != getattr(user, "id", getattr(user, "user_id", None)) and post.user_id != user.user_id:
         return jsonify({"error": "Unauthorized to delete this comment"}), 403
 
-    comment_user = repo.get_human_user_by_id(getattr(comment, "user_id", None)) or repo.get_pet_user_by_id(getattr(comment, "user_id", None))
+    comment_user = repo.get_user_by_id(getattr(comment, "user_id", None))
     if not comment_user:
         return jsonify({"error": "Comment author not found"}), 404
 
@@ -316,39 +422,37 @@ def delete_comment(post_id:int, comment_id: int):
 
 @feed_bp.route("/api/user/<int:user_id>")
 def user(user_id: int):
-    session_user = session.get("user_name")
-    if session_user:
-        repo = _repo()
-        session_user = (
-            repo.get_human_user_by_name(session_user)
-            or repo.get_pet_user_by_name(session_user)
-            or repo.get_temp_user_by_name(session_user)
-        )
-    else:
-        session_user = None
+    session_user = get_session_user()
     repo = _repo()
-    user = (
-        repo.get_pet_user_by_id(user_id)
-        or repo.get_human_user_by_id(user_id)
-        or repo.get_temp_user_by_id(user_id)
-    )
+    user = repo.get_user_summary(user_id)
+    if user is None:
+        temp_user = repo.get_temp_user_by_id(user_id)
+        if temp_user is not None:
+            # Not stored yet, so nothing to count.
+            user = UserSummary(
+                temp_user.user_id,
+                temp_user.username,
+                temp_user.bio,
+                temp_user.profile_picture_path,
+                0,
+                0,
+            )
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    def serialize(u):
-        return {
-            "id": int(getattr(u, "user_id", 0)),
-            "username": str(getattr(u, "username", "")),
-            "bio": str(getattr(u, "bio", "")),
-            "profile_picture_path": str(getattr(u, "profile_picture_path", "")),
-            "posts_count": len(getattr(u, "posts", [])),
-            "followers_count": len(repo.get_followers(u)),
+    return jsonify(
+        {
+            "id": user.user_id,
+            "username": user.username,
+            "bio": str(user.bio),
+            "profile_picture_path": str(user.profile_picture_path),
+            "posts_count": user.posts_count,
+            "followers_count": user.followers_count,
             "posts_thumbnails": repo.get_posts_thumbnails(user_id),
             "following": repo.is_following(session_user.user_id, user.user_id),
             "session_user_id": session_user.user_id if session_user else None,
         }
-
-    return jsonify(serialize(user))
+    )
 
 
 @feed_bp.route("/follow/<int:user_id>", methods=["POST"])
@@ -359,13 +463,11 @@ def follow_user(user_id: int):
     if not username:
         return jsonify({"error": "Not authenticated"}), 401
 
-    follower = repo.get_human_user_by_name(username) or repo.get_pet_user_by_name(
-        username
-    )
+    follower = _stored(get_session_user())
     if not follower:
         return jsonify({"error": "User not found"}), 403
 
-    followee = repo.get_pet_user_by_id(user_id) or repo.get_human_user_by_id(user_id)
+    followee = _stored(repo.get_user_by_id(user_id))
     if not followee:
         return jsonify({"error": "User to follow not found"}), 404
 
@@ -391,13 +493,11 @@ def unfollow_user(user_id: int):
     if not username:
         return jsonify({"error": "Not authenticated"}), 401
 
-    follower = repo.get_human_user_by_name(username) or repo.get_pet_user_by_name(
-        username
-    )
+    follower = _stored(get_session_user())
     if not follower:
         return jsonify({"error": "User not found"}), 403
 
-    followee = repo.get_pet_user_by_id(user_id) or repo.get_human_user_by_id(user_id)
+    followee = _stored(repo.get_user_by_id(user_id))
     if not followee:
         return jsonify({"error": "User to unfollow not found"}), 404
 
@@ -15,8 +15,10 @@ post_bp = Blueprint("post", __name__)
 def view_post(id: int):
     repo = _repo()
     post = repo.get_post_by_id(id)
-    user = repo.get_pet_user_by_id(post.user_id)
     if not post:
+        return "Post not found", 404
+    user = repo.get_user_by_id(post.user_id)
+    if not user:
         return "User not found", 404
 
     post_path = (
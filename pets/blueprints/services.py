@@ -1,4 +1,5 @@
 from pets.adapters import repository
+from pets.domainmodel.PetUser import PetUser
 
 
 def _repo():
@@ -10,7 +11,7 @@ def _repo():
 
 def user_type_by_name(username: str) -> str | None:
     repo = _repo()
-    user = repo.get_pet_user_by_name(username)
-    if user:
-        return "pet"
-    return "human"
+    user = repo.get_user_by_name(username)
+    if user is None:
+        return None
+    return "pet" if isinstance(user, PetUser) else "human"
@@ -10,6 +10,7 @@ from flask import (
 from werkzeug.utils import secure_filename
 from pets.blueprints.authentication.authentication import login_required
 from pets.blueprints.services import _repo
+from pets.utilities.auth import get_current_user
 from PIL import Image
 
 upload_bp = Blueprint("upload", __name__)
@@ -25,9 +26,7 @@ def allowed_file(filename):
 @upload_bp.route("/upload", methods=["GET"])
 @login_required
 def upload_page():
-    username = session.get("user_name")
-    repo = _repo()
-    user = repo.get_pet_user_by_name(username)
+    user = get_current_user()
     if not user:
         return "User not found", 404
     return render_template("pages/upload/upload.html", user=user)
@@ -160,7 +159,7 @@ def finalize_upload():
     except Exception as e:
         temp_remove_error = str(e)
 
-    user = _repo().get_pet_user_by_name(user_name)
+    user = get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -178,8 +177,6 @@ def finalize_upload():
 
     print(post.media_type)
 
-    _repo().add_post(user, post)
-
     resp = {
         "success": True,
         "message": "Upload completed",
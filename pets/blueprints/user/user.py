@@ -13,6 +13,11 @@ from pets.blueprints.authentication.authentication import login_required
 from pets.blueprints.services import _repo
 
 from pets.blueprints.user.services import save_file
+from pets.utilities.auth import (
+    get_current_user,
+    get_session_user,
+    remember_session_user,
+)
 
 user_bp = Blueprint("user", __name__)
 
@@ -21,15 +26,13 @@ user_bp = Blueprint("user", __name__)
 @login_required
 def view_user_profile(username: str):
     repo = _repo()
-    user = (
-        repo.get_human_user_by_name(username)
-        or repo.get_pet_user_by_name(username)
-        or repo.get_temp_user_by_name(username)
-    )
+    user = repo.get_user_by_name(username)
     if not user:
         return "User not found", 404
-    if "." == str(user.profile_picture_path):
-        user.profile_picture_path = Path("../static/images/assets/user.png")
+    image_path = user.profile_picture_path
+    if "." == str(image_path):
+        # Display-only default; the user's stored path stays unset.
+        image_path = Path("../static/images/assets/user.png")
     # Adjusted template path to match actual location under pages/
 
     if session.get("is_temp"):
@@ -37,7 +40,7 @@ def view_user_profile(username: str):
             "pages/user/profile.html",
             user=user,
             posts=[],
-            image_path=user.profile_picture_path,
+            image_path=image_path,
             post_path_tuples=[],
             type="TempUser",
         )
@@ -46,20 +49,20 @@ def view_user_profile(username: str):
         return render_template(
             "pages/user/profile.html",
             user=user,
-            image_path=user.profile_picture_path,
+            image_path=image_path,
             type="HumanUser",
         )
 
-    session_user = session.get("user_name")
-    session_user_obj = repo.get_human_user_by_name(
-        session_user
-    ) or repo.get_pet_user_by_name(session_user)
-    # Process posts to generate video thumbnails
+    session_user_obj = get_session_user()
+    # Cards come from the post_cards projection, newest first; only videos
+    # need their Post loaded, to generate a thumbnail.
     posts = []
-    for post in user.posts:
+    for post in repo.get_user_cards(user.user_id):
         if post.media_type == "video":
             print(f"Post ID {post.id} is a video with media path {post.media_path}")
-            thumbnail_post = _repo().get_video_thumbnail(post, user)
+            thumbnail_post = repo.get_video_thumbnail(
+                repo.get_post_by_id(post.id), user
+            )
             if thumbnail_post:
                 print(
                     f"Generated thumbnail for Post ID {post.id} at {thumbnail_post.media_path}"
@@ -72,7 +75,6 @@ def view_user_profile(username: str):
                 )  # Fallback to original post if thumbnail generation fails
         else:
             posts.append(post)
-    posts.sort(key=lambda p: p.created_at, reverse=True)
 
     ## Temporary fix for media path issues move to standard service when only database used
     post_paths = [
@@ -87,7 +89,7 @@ def view_user_profile(username: str):
         "pages/user/profile.html",
         user=user,
         posts=posts,
-        image_path=user.profile_picture_path,
+        image_path=image_path,
         post_path_tuples=post_path_tuples,
         type=session_user_obj.__class__.__name__,
     )
@@ -101,11 +103,7 @@ def user_settings(user_id: int):
     if not username:
         return redirect(url_for("authentication.login"))
 
-    user = (
-        repo.get_human_user_by_name(username)
-        or repo.get_pet_user_by_name(username)
-        or repo.get_temp_user_by_name(username)
-    )
+    user = get_session_user()
     if request.method == "POST":
         if not user or user.user_id != user_id:
             return "Unauthorized", 403
@@ -126,7 +124,6 @@ def user_settings(user_id: int):
             # convert temp user to permanent user
             new_user = repo.convert_temp_user_to_permanent(user, user_type)
             session["is_temp"] = False
-            session["user_name"] = new_user.username
             user = new_user
 
         else:
@@ -138,6 +135,8 @@ def user_settings(user_id: int):
                 pass
         # update user in repo
         repo.update_user(user)
+        # The id stays the same but the type may have changed.
+        remember_session_user(user)
         return redirect(
             url_for(
                 "user.view_user_profile",
@@ -162,17 +161,8 @@ def user_settings(user_id: int):
 @login_required
 def view_followers(username: str):
     repo = _repo()
-    session_username = session.get("user_name")
-    session_user_obj = (
-        repo.get_human_user_by_name(session_username)
-        or repo.get_pet_user_by_name(session_username)
-        or repo.get_temp_user_by_name(session_username)
-    )
-    user = (
-        repo.get_human_user_by_name(username)
-        or repo.get_pet_user_by_name(username)
-        or repo.get_temp_user_by_name(username)
-    )
+    session_user_obj = get_session_user()
+    user = repo.get_user_by_name(username)
     if not user:
         return "User not found", 404
     followers = repo.get_followers(user)
@@ -192,7 +182,7 @@ def delete_post(post_id: int):
     if not username:
         return redirect(url_for("authentication.login"))
 
-    user = repo.get_pet_user_by_name(username)
+    user = get_current_user()
     post = repo.get_post_by_id(post_id)
     if not post or post.user_id != user.id:
         return "Unauthorized", 403
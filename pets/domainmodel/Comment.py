@@ -2,6 +2,17 @@ from datetime import datetime
 from typing import List
 from pets.domainmodel.Like import Like
 
+# Each id in a materialized path is zero-padded to this width, so paths sort
+# as strings into thread order: every comment directly before its replies.
+PATH_WIDTH = 10
+# Deepest reply allowed; keeps paths within the 255 characters stored.
+MAX_DEPTH = 20
+
+
+def thread_path(comment_id: int, parent_path: str | None = None) -> str:
+    segment = f"{comment_id:0{PATH_WIDTH}d}"
+    return f"{parent_path}/{segment}" if parent_path else segment
+
 
 class Comment:
     __id: int
@@ -10,6 +21,8 @@ class Comment:
     __created_at: datetime
     __comment_string: str
     __likes: int
+    __parent_id: int | None
+    __path: str
 
     def __init__(
         self,
@@ -19,6 +32,8 @@ class Comment:
         created_at: datetime,
         comment_string: str,
         likes: int,
+        parent_id: int | None = None,
+        path: str | None = None,
     ):
         self.__id = id
         self.__user_id = user_id
@@ -26,6 +41,10 @@ class Comment:
         self.__created_at = created_at
         self.__comment_string = comment_string
         self.__likes = likes
+        self.__parent_id = parent_id
+        # Ancestors' ids then this comment's own; a top-level comment's path
+        # is just its id.
+        self.__path = path if path is not None else thread_path(id)
 
     def __eq__(self, other):
         if not isinstance(other, Comment):
@@ -64,6 +83,18 @@ class Comment:
     def comment_string(self, value: str):
         self.__comment_string = value
 
+    @property
+    def parent_id(self) -> int | None:
+        return self.__parent_id
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def depth(self) -> int:
+        return self.__path.count("/")
+
     @property
     def likes(self) -> int:
         return self.__likes
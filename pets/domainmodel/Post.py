@@ -2,6 +2,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, TYPE_CHECKING, Tuple
 
+from pets.domainmodel.Size import Size
+
 if TYPE_CHECKING:
     from pets.domainmodel.Comment import Comment
     from pets.domainmodel.Like import Like
@@ -13,6 +15,8 @@ class Post:
     __user_id: int
     __likes: List["Like"]
     __comments: List["Comment"]
+    __like_count: int
+    __comment_count: int
     __caption: str
     __views: int
     __created_at: datetime
@@ -36,22 +40,29 @@ class Post:
         media_type: str,
         comments: List["Comment"] = None,
         likes: List["Like"] = None,
+        like_count: int = None,
+        comment_count: int = None,
     ):
         self.__id = id
         self.__user_id = user_id
         self.__likes = likes if likes is not None else []
         self.__comments = comments if comments is not None else []
+        # Denormalized counters so readers never need to load likes/comments.
+        self.__like_count = like_count if like_count is not None else len(self.__likes)
+        self.__comment_count = (
+            comment_count if comment_count is not None else len(self.__comments)
+        )
         self.__caption = caption
         self.__views = views
         self.__created_at = created_at
-        self.__size = size
+        self.__size = Size(*size) if size else Size(0, 0)
         self.__tags = tags
         self.__users_tagged = users_tagged
         self.__media_path = media_path
         self.__media_type = media_type
 
     def __str__(self):
-        return f"Post {self.id} by User {self.user_id}: '{self.caption}' with {len(self.likes)} likes and {len(self.comments)} comments and media type {self.media_type}."
+        return f"Post {self.id} by User {self.user_id}: '{self.caption}' with {self.like_count} likes and {self.comment_count} comments and media type {self.media_type}."
 
     def __eq__(self, other):
         if not isinstance(other, Post):
@@ -74,6 +85,14 @@ class Post:
     def comments(self) -> List["Comment"]:
         return self.__comments
 
+    @property
+    def like_count(self) -> int:
+        return self.__like_count
+
+    @property
+    def comment_count(self) -> int:
+        return self.__comment_count
+
     @property
     def caption(self) -> str:
         return self.__caption
@@ -109,18 +128,22 @@ class Post:
     def add_like(self, like: "Like"):
         if like not in self.__likes:
             self.__likes.append(like)
+            self.__like_count += 1
 
     def remove_like(self, like: "Like"):
         if like in self.__likes:
             self.__likes.remove(like)
+            self.__like_count -= 1
 
     def add_comment(self, comment: "Comment"):
         if comment not in self.__comments:
             self.__comments.append(comment)
+            self.__comment_count += 1
 
     def remove_comment(self, comment: "Comment"):
         if comment in self.__comments:
             self.__comments.remove(comment)
+            self.__comment_count -= 1
 
     def increment_views(self):
         self.__views += 1
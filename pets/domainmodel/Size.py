@@ -0,0 +1,10 @@
+from typing import NamedTuple
+
+
+class Size(NamedTuple):
+    width: int
+    height: int
+
+    def __composite_values__(self):
+        # Lets the ORM store a size as separate width/height columns.
+        return self.width, self.height
@@ -3,10 +3,18 @@ document.addEventListener('DOMContentLoaded', () => {
   let currentPostId = null;
   let currentUserId = null;
   let inflight = null;
+  // Comments come a page at a time, newest first; the opaque keyset cursor
+  // for the next page is empty once the thread is exhausted.
+  const PAGE_SIZE = 20;
+  let nextCursor = '';
+  let loadingMore = false;
+  // Comment the form is replying to, if any.
+  let replyTo = null;
   const form = document.getElementById('commentForm');
   const textarea = document.getElementById('commentText');
   const submitBtn = document.getElementById('commentSubmit');
   const statusEl = document.getElementById('commentStatus');
+  const defaultPlaceholder = textarea ? textarea.placeholder : '';
 
   function timeago(iso) {
     if (!iso) return '';
@@ -65,13 +73,15 @@ document.addEventListener('DOMContentLoaded', () => {
     const likes = typeof c.likes === 'number' ? c.likes : 0;
     const canDelete = !!c.can_delete;
     const commentIdAttr = c.id ? `data-comment-id="${escapeHtml(String(c.id))}"` : '';
+    const depth = typeof c.depth === 'number' ? c.depth : 0;
+    const pathAttr = c.path ? `data-path="${escapeHtml(c.path)}"` : '';
 
     // Conditionally include delete button
     const deleteBtn = canDelete
       ? `<button class="comment-delete" type="button" aria-label="Delete comment"><img src="/static/images/assets/trash-can.png" alt="delete"></button>`
       : '';
 
-    return `<li class="comment-item" data-user-id="${escapeHtml(String(c.user_id||''))}" ${commentIdAttr}>
+    return `<li class="comment-item${depth ? ' comment-reply' : ''}" style="--depth:${depth}" data-user-id="${escapeHtml(String(c.user_id||''))}" ${commentIdAttr} ${pathAttr}>
         ${avatarMarkup(author, profile)}
         <div class="comment-body">
           <div class="comment-author">${escapeHtml(author)}</div>
@@ -80,35 +90,135 @@ document.addEventListener('DOMContentLoaded', () => {
         </div>
         <div class="comment-actions">
           <button class="comment-like" type="button" aria-label="Like comment">Like</button>
+          <button class="comment-reply-to" type="button" aria-label="Reply to comment">Reply</button>
           ${deleteBtn}
         </div>
       </li>`;
   }
 
+  // A top-level comment, the first few of its replies, and a link to the
+  // rest of the thread when there are more.
+  function buildThreadHTML(c) {
+    const more = c.more_replies
+      ? `<li class="comment-more" data-thread-id="${escapeHtml(String(c.id))}"><button class="comment-more-replies" type="button">View more replies</button></li>`
+      : '';
+    return buildCommentHTML(c) + (c.replies || []).map(buildCommentHTML).join('') + more;
+  }
+
+  // The item and every reply rendered beneath it.
+  function subtreeItems(item) {
+    const items = [item];
+    const path = item.dataset.path;
+    let next = item.nextElementSibling;
+    while (path && next && (next.dataset.path || '').startsWith(`${path}/`)) {
+      items.push(next);
+      next = next.nextElementSibling;
+    }
+    return items;
+  }
+
   function renderComments(comments, currentUserId) {
     if (!comments.length) return renderEmpty();
     listEl.setAttribute('aria-busy','false');
-    listEl.innerHTML = comments.map(buildCommentHTML).join('');
+    listEl.innerHTML = comments.map(buildThreadHTML).join('');
+  }
+
+  function commentsUrl(pid, cursor) {
+    const params = new URLSearchParams({ order: 'newest', limit: String(PAGE_SIZE) });
+    if (cursor) params.set('cursor', cursor);
+    return `/api/comments/${pid}?${params}`;
   }
 
   async function loadComments(postId) {
     const pid = String(postId || '');
     if (!pid || pid === currentPostId) return;
     currentPostId = pid;
+    nextCursor = '';
+    clearReply();
     renderSkeleton();
     if (inflight) try { await inflight; } catch {}
-    inflight = fetch(`/api/comments/${pid}`)
+    inflight = fetch(commentsUrl(pid))
       .then(r => r.ok ? r.json() : Promise.reject(r.status))
       .then(data => {
         currentUserId = data.current_user_id || null;
         if (String(data.post_id) !== currentPostId) return; // stale
+        nextCursor = data.next_cursor || '';
         renderComments(data.comments || [], currentUserId);
       })
       .catch(err => {
         console.error('Comments load failed', err);
         if (currentPostId === pid) renderEmpty('Failed to load.');
       })
-      .finally(() => { inflight = null; });
+      .finally(() => {
+        inflight = null;
+        if (nearBottom()) loadMoreComments(); // first page didn't fill the panel
+      });
+  }
+
+  function nearBottom() {
+    return listEl.scrollTop + listEl.clientHeight >= listEl.scrollHeight - 200;
+  }
+
+  async function loadMoreComments() {
+    if (!nextCursor || loadingMore || inflight) return;
+    const pid = currentPostId;
+    loadingMore = true;
+    try {
+      const res = await fetch(commentsUrl(pid, nextCursor));
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const data = await res.json();
+      if (String(data.post_id) !== currentPostId) return; // switched posts
+      nextCursor = data.next_cursor || '';
+      listEl.insertAdjacentHTML('beforeend', (data.comments || []).map(buildThreadHTML).join(''));
+    } catch (err) {
+      console.error('Loading more comments failed', err);
+      nextCursor = '';
+    } finally {
+      loadingMore = false;
+    }
+  }
+
+  listEl.addEventListener('scroll', () => {
+    if (nearBottom()) loadMoreComments();
+  });
+
+  // Replace a thread's preview with the whole thread.
+  listEl.addEventListener('click', async e => {
+    const btn = e.target.closest('.comment-more-replies');
+    if (!btn) return;
+    const more = btn.closest('.comment-more');
+    const threadId = more.dataset.threadId;
+    const root = listEl.querySelector(`.comment-item[data-comment-id="${threadId}"]`);
+    if (!root) return;
+    btn.disabled = true;
+    try {
+      const res = await fetch(`/api/comments/${encodeURIComponent(currentPostId)}/thread/${encodeURIComponent(threadId)}`);
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const data = await res.json();
+      subtreeItems(root).slice(1).forEach(el => el.remove());
+      root.insertAdjacentHTML('afterend', (data.comments || []).slice(1).map(buildCommentHTML).join(''));
+      more.remove();
+    } catch (err) {
+      console.error('Loading replies failed', err);
+      btn.disabled = false;
+    }
+  });
+
+  listEl.addEventListener('click', e => {
+    const btn = e.target.closest('.comment-reply-to');
+    if (!btn) return;
+    const item = btn.closest('.comment-item');
+    const author = item.querySelector('.comment-author')?.textContent || '';
+    replyTo = { id: Number(item.dataset.commentId), item };
+    if (textarea) {
+      textarea.placeholder = `Reply to ${author}`;
+      textarea.focus();
+    }
+  });
+
+  function clearReply() {
+    replyTo = null;
+    if (textarea) textarea.placeholder = defaultPlaceholder;
   }
 
 
@@ -162,7 +272,7 @@ document.addEventListener('DOMContentLoaded', () => {
         throw new Error(msg);
       }
 
-      // success: server doesn't return new like count currently; keep optimistic or adjust if server provides data
+      // success: show the server's count, which repeat likes don't change
       const data = await res.json().catch(()=>null);
       if (data && typeof data.likes === 'number') {
         likesEl.textContent = `${data.likes}❤`;
@@ -204,8 +314,9 @@ document.addEventListener('DOMContentLoaded', () => {
         throw new Error(msg);
       }
 
-      // Remove comment from DOM
-      item.remove();
+      // Remove comment (and its replies, deleted with it) from DOM
+      const removed = subtreeItems(item);
+      removed.forEach(el => el.remove());
 
       // If no comments left, show empty message
       if (listEl.querySelectorAll('.comment-item').length === 0) {
@@ -218,7 +329,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const commentCounter = card.querySelector('.engagement-item:nth-child(2)');
         if (commentCounter) {
           let count = parseInt(commentCounter.textContent) || 0;
-          count = Math.max(0, count - 1);
+          count = Math.max(0, count - removed.length);
           commentCounter.textContent = `💬 ${count}`;
         }
       }
@@ -255,7 +366,7 @@ document.addEventListener('DOMContentLoaded', () => {
       const res = await fetch(`/api/comments/${currentPostId}`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ text })
+        body: JSON.stringify(replyTo ? { text, parent_id: replyTo.id } : { text })
       });
       if (!res.ok) {
         const err = await res.json().catch(()=>({error:'Failed'}));
@@ -263,9 +374,16 @@ document.addEventListener('DOMContentLoaded', () => {
       }
       const data = await res.json();
       const c = data.comment;
-      // Prepend new comment
       if (listEl.querySelector('.empty')) listEl.innerHTML = '';
-      listEl.insertAdjacentHTML('afterbegin', buildCommentHTML(c));
+      if (replyTo && replyTo.item.isConnected) {
+        // Replies go at the end of the thread they answer
+        const thread = subtreeItems(replyTo.item);
+        thread[thread.length - 1].insertAdjacentHTML('afterend', buildCommentHTML(c));
+      } else {
+        // Prepend new comment
+        listEl.insertAdjacentHTML('afterbegin', buildCommentHTML(c));
+      }
+      clearReply();
       textarea.value = '';
       setStatus('Posted', 'success');
 
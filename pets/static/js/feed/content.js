@@ -2,18 +2,35 @@
 document.addEventListener('DOMContentLoaded', () => {
   const cards = document.querySelectorAll('.short-card');
 
+  // Likes in flight per post; a double-tap while one is pending is dropped so
+  // the server-side toggle always sees taps in order.
+  const pendingLikes = new Set();
+
   async function sendLike(postId) {
-    if (!postId) return;
+    if (!postId || pendingLikes.has(postId)) return;
+    pendingLikes.add(postId);
     try {
-      await fetch(`/api/posts/${encodeURIComponent(postId)}/like`, {
+      const res = await fetch(`/api/posts/${encodeURIComponent(postId)}/like`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({})
       });
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const data = await res.json();
+      const card = document.querySelector(`.short-card[data-id="${postId}"]`);
+      if (card) {
+        const likesEl = card.querySelector('.engagement-item');
+        if (likesEl) likesEl.textContent = `❤️ ${data.likes_count}`;
+        card.classList.toggle('liked', !!data.liked);
+        card.dataset.liked = data.liked ? '1' : '0';
+      }
     } catch (err) {
       console.error('Like request failed', err);
+    } finally {
+      pendingLikes.delete(postId);
     }
   }
+  window.sendLike = sendLike;
 
   // Prevent iOS double-tap zoom
   (function preventIOSZoom() {
@@ -43,7 +60,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     function likePost() {
       const pid = card.dataset.id || card.getAttribute('data-id');
-      createHeartBurst(card);
+      if (typeof createHeartBurst === 'function') createHeartBurst(card);
       sendLike(pid);
     }
 
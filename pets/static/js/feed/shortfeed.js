@@ -2,9 +2,10 @@ document.addEventListener('DOMContentLoaded', () => {
   const container = document.getElementById('shortfeed');
   if (!container) return;
 
-  let offset = container.querySelectorAll('.short-card').length;
+  // Opaque keyset cursor from the server; empty means no further pages.
+  let cursor = container.dataset.nextCursor || '';
   let loading = false;
-  let hasMore = true;
+  let hasMore = cursor !== '';
   let batchSize = 16;
   const PREFETCH_THRESHOLD = 3;
   let activePostId = null;
@@ -29,8 +30,8 @@ document.addEventListener('DOMContentLoaded', () => {
       if (likeInProgress) return;
       likeInProgress = true;
       const pid = card.dataset.id;
-      createHeartBurst(card);
-      sendLike(pid);
+      if (typeof createHeartBurst === 'function') createHeartBurst(card);
+      if (window.sendLike) window.sendLike(pid);
       setTimeout(() => { likeInProgress = false; }, DOUBLE_TAP_THRESHOLD);
     }
 
@@ -176,14 +177,15 @@ document.addEventListener('DOMContentLoaded', () => {
     if (loading || !hasMore) return;
     loading = true;
     try {
-      const res = await fetch(`/api/feed?offset=${offset}`);
+      const res = await fetch(`/api/feed?cursor=${encodeURIComponent(cursor)}`);
       if (!res.ok) throw new Error(`HTTP ${res.status}`);
       const data = await res.json();
       batchSize = data.batch_size || batchSize;
       hasMore = data.has_more;
       data.posts.forEach(addCard);
-      offset = data.next_offset;
+      cursor = data.next_cursor || '';
       attachObservers();
+      refreshEngagement(data.posts.map(p => p.id));
     } catch (err) {
       console.error('Load batch failed:', err);
     } finally {
@@ -191,6 +193,28 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   }
 
+  // One request per batch: counts plus whether the viewer liked each card.
+  async function refreshEngagement(ids) {
+    if (!ids.length) return;
+    try {
+      const res = await fetch(`/api/posts/engagement?ids=${ids.map(encodeURIComponent).join(',')}`);
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const data = await res.json();
+      Object.entries(data.engagement || {}).forEach(([id, e]) => {
+        const card = container.querySelector(`.short-card[data-id="${id}"]`);
+        if (!card) return;
+        const [likesEl, commentsEl] = card.querySelectorAll('.engagement-item');
+        if (likesEl) likesEl.textContent = `❤️ ${e.likes_count}`;
+        if (commentsEl) commentsEl.textContent = `💬 ${e.comments_count}`;
+        card.classList.toggle('liked', !!e.liked);
+        card.dataset.liked = e.liked ? '1' : '0';
+      });
+    } catch (err) {
+      console.error('Engagement refresh failed:', err);
+    }
+  }
+  window.refreshEngagement = refreshEngagement;
+
   function addCard(post) {
     const art = document.createElement('article');
     art.className = 'post short-card';
@@ -308,6 +332,7 @@ document.addEventListener('DOMContentLoaded', () => {
   });
 
   attachObservers();
+  refreshEngagement([...container.querySelectorAll('.short-card')].map(c => c.dataset.id));
 
   function currentCard() {
     return container.querySelector(`.short-card[data-id="${activePostId}"]`);
@@ -1,35 +1,50 @@
 """Authentication utility functions for the recipe application."""
 
-from flask import session
+from flask import g, session
 import pets.adapters.repository as repository
+from pets.domainmodel.PetUser import PetUser
 
 
-def get_current_user():
-    """Get current user from session or return None if not logged in."""
+def remember_session_user(user):
+    """Store the logged-in user's id and type in the session (and for the
+    rest of this request), so later requests fetch them by id."""
+    session["user_id"] = user.user_id
+    session["user_type"] = user.__class__.__name__
+    session["user_name"] = user.username
+    g.session_user = user
+
+
+def _load_session_user(repo):
+    user_id = session.get("user_id")
+    if user_id is not None:
+        if session.get("user_type") == "TempUser":
+            # Temp users only live in the repository's memory.
+            return repo.get_temp_user_by_id(user_id)
+        return repo.get_user_by_id(user_id)
     username = session.get("user_name")
     if not username:
         return None
+    # Sessions from before user_id was stored: upgrade them.
+    user = repo.get_user_by_name(username)
+    if user is not None:
+        remember_session_user(user)
+    return user
 
-    repo = repository.repo_instance
-    if repo is None:
-        return None
 
-    return repo.get_pet_user_by_name(username)
+def get_session_user():
+    """The logged-in user of any type, looked up once per request."""
+    if "session_user" not in g:
+        repo = repository.repo_instance
+        g.session_user = _load_session_user(repo) if repo is not None else None
+    return g.session_user
+
+
+def get_current_user():
+    """Get current user from session or return None if not logged in."""
+    user = get_session_user()
+    return user if isinstance(user, PetUser) else None
 
 
 def is_logged_in():
     """Check if user is currently logged in and exists in repository."""
-    username = session.get("user_name")
-    if not username:
-        return False
-
-    repo = repository.repo_instance
-    if repo is None:
-        return False
-
-    user = (
-        repo.get_pet_user_by_name(username)
-        or repo.get_human_user_by_name(username)
-        or repo.get_temp_user_by_name(username)
-    )
-    return user is not None
+    return get_session_user() is not None
@@ -1,10 +1,14 @@
 from pathlib import Path
 
 import pytest
+from sqlalchemy import NullPool, create_engine
+from sqlalchemy.orm import clear_mappers, sessionmaker
 
 from datetime import datetime
 
 from pets import create_app, MemoryRepository, populate
+from pets.adapters.database_repository import SqlAlchemyRepository
+from pets.adapters.orm import map_model_to_tables, mapper_registry
 from pets.domainmodel.User import User
 from pets.domainmodel.PetUser import PetUser
 from pets.domainmodel.HumanUser import HumanUser
@@ -126,6 +130,29 @@ def in_memory_repository() -> MemoryRepository:
     return repository
 
 
+@pytest.fixture
+def database_repository(tmp_path) -> SqlAlchemyRepository:
+    database_uri = f"sqlite:///{tmp_path / 'pets-test.db'}"
+    engine = create_engine(
+        database_uri,
+        connect_args={"check_same_thread": False},
+        poolclass=NullPool,
+    )
+    clear_mappers()
+    map_model_to_tables()
+    mapper_registry.metadata.create_all(engine)
+    session_factory = sessionmaker(
+        autocommit=False, autoflush=True, bind=engine, expire_on_commit=False
+    )
+    # Strict loading: a lazy load nobody asked for raises.
+    repository = SqlAlchemyRepository(session_factory, engine, strict_loading=True)
+    populate(repository, database_mode=True)
+    yield repository
+    repository.close_session()
+    clear_mappers()
+    engine.dispose()
+
+
 @pytest.fixture(scope="function", autouse=True)
 def client():
     my_app = create_app()
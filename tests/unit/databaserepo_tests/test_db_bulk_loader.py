@@ -0,0 +1,57 @@
+from sqlalchemy import create_engine, func, select
+
+from pets.adapters.bulk_loader import BulkLoader
+from pets.adapters.datareaders import chunked
+from pets.adapters.datareaders.data_reader import DataReader
+from pets.adapters.orm import (
+    like_table,
+    metadata,
+    pet_users_table,
+    user_following_table,
+    users_table,
+)
+
+
+def _count(engine, table):
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(table))
+
+
+class TestBulkLoader:
+    def test_loads_every_table_and_reports_timings(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+        metadata.create_all(engine)
+        data = DataReader()
+        loader = BulkLoader(engine)
+
+        loader.load_pet_users(chunked(data.users, 3))
+        loader.load_posts(chunked(data.posts, 3))
+        loader.load_comments(chunked(data.comments, 3))
+        loader.load_likes(chunked(data.likes, 3))
+        # 999 was never loaded, so its edge is dropped; duplicates collapse.
+        loader.load_followers([(1, [2, 2, 999]), (2, [1])])
+
+        assert _count(engine, users_table) == len(data.users)
+        assert _count(engine, pet_users_table) == len(data.users)
+        assert _count(engine, like_table) == len(data.likes)
+        assert _count(engine, user_following_table) == 2
+        timings = loader.timings
+        assert timings["likes"][0] == len(data.likes)
+        assert set(timings) == {"users", "posts", "comments", "likes", "user_following"}
+        assert "likes: " in loader.report()
+        engine.dispose()
+
+    def test_add_multiple_followers_skips_unknown_and_existing(
+        self, database_repository
+    ):
+        database_repository.add_multiple_followers([(1, [2, 3, 999]), (2, [1])])
+        database_repository.add_multiple_followers([(1, [2])])
+        assert database_repository.is_following(2, 1)
+        assert database_repository.is_following(3, 1)
+        assert database_repository.is_following(1, 2)
+        assert not database_repository.is_following(999, 1)
+        with database_repository._session_cm as scm:
+            rows = scm.session.scalar(
+                select(func.count()).select_from(user_following_table)
+            )
+        assert rows == 3
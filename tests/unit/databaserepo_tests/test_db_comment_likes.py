@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from pets.adapters.orm import comment_likes_table, comments_table
+
+
+def _liker_rows(repo, comment_id):
+    with repo._session_cm as scm:
+        return scm.session.scalar(
+            select(func.count()).where(comment_likes_table.c.comment_id == comment_id)
+        )
+
+
+def _likes(repo, comment_id):
+    with repo._session_cm as scm:
+        return scm.session.scalar(
+            select(comments_table.c.likes).where(comments_table.c.id == comment_id)
+        )
+
+
+class TestCommentLikes:
+    def test_repeat_likes_are_not_counted(self, database_repository):
+        comment = database_repository.get_comment_views(1)[0]
+        assert database_repository.like_comment(2, 1, comment.id) == (
+            True,
+            comment.likes + 1,
+        )
+        assert database_repository.like_comment(2, 1, comment.id) == (
+            False,
+            comment.likes + 1,
+        )
+        assert database_repository.like_comment(3, 1, comment.id) == (
+            True,
+            comment.likes + 2,
+        )
+        assert _liker_rows(database_repository, comment.id) == 2
+
+    def test_comment_must_belong_to_the_post(self, database_repository):
+        comment = database_repository.get_comment_views(1)[0]
+        assert database_repository.like_comment(2, 2, comment.id) is None
+        assert database_repository.like_comment(2, 1, 99999) is None
+        assert _liker_rows(database_repository, comment.id) == 0
+        assert _likes(database_repository, comment.id) == comment.likes
+
+    def test_deleting_a_comment_drops_its_likes(self, database_repository):
+        user = database_repository.get_pet_user_by_id(1)
+        post = database_repository.get_post_by_id(2)
+        comment = database_repository.create_comment(user, post, "like me")
+        database_repository.like_comment(2, 2, comment.id)
+        database_repository.delete_comment(user, comment)
+        assert _liker_rows(database_repository, comment.id) == 0
+
+    def test_concurrent_clicks_count_once_per_user(self, database_repository):
+        comment = database_repository.get_comment_views(3)[0]
+        clicks = [user_id for user_id in (1, 2, 3) for _ in range(5)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(
+                pool.map(
+                    lambda uid: database_repository.like_comment(uid, 3, comment.id),
+                    clicks,
+                )
+            )
+        assert sum(liked for liked, _ in results) == 3
+        assert _likes(database_repository, comment.id) == comment.likes + 3
+        assert _liker_rows(database_repository, comment.id) == 3
@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import select
+
+from pets.adapters.orm import comments_table, posts_table
+from pets.domainmodel.Comment import MAX_DEPTH
+
+
+@pytest.fixture
+def thread(database_repository):
+    # root
+    #   first
+    #     nested
+    #   second
+    repo = database_repository
+    user, post = repo.get_pet_user_by_id(1), repo.get_post_by_id(2)
+    root = repo.create_comment(user, post, "root")
+    first = repo.create_comment(user, post, "first", root.id)
+    nested = repo.create_comment(user, post, "nested", first.id)
+    second = repo.create_comment(user, post, "second", root.id)
+    return root, first, nested, second
+
+
+def _comment_count(repo, post_id):
+    with repo._session_cm as scm:
+        return scm.session.scalar(
+            select(posts_table.c.comment_count).where(posts_table.c.id == post_id)
+        )
+
+
+class TestCommentThreads:
+    def test_replies_extend_their_parents_path(self, thread):
+        root, first, nested, second = thread
+        assert (first.parent_id, nested.parent_id) == (root.id, first.id)
+        assert first.path == f"{root.id:010d}/{first.id:010d}"
+        assert nested.path == f"{first.path}/{nested.id:010d}"
+        assert nested.depth == 2
+
+    def test_thread_comes_back_in_thread_order(self, database_repository, thread):
+        root, first, nested, second = thread
+        views = database_repository.get_comment_thread(2, root.id)
+        assert [v.id for v in views] == [root.id, first.id, nested.id, second.id]
+        assert [v.depth for v in views] == [0, 1, 2, 1]
+        assert [v.id for v in database_repository.get_comment_thread(2, first.id)] == [
+            first.id,
+            nested.id,
+        ]
+        assert database_repository.get_comment_thread(1, root.id) == []
+
+    def test_pages_are_top_level_with_reply_previews(self, database_repository, thread):
+        root, first, nested, second = thread
+        page = database_repository.get_comment_views_page(2, None, None, 100)
+        assert root.id in [v.id for v in page]
+        assert all(v.parent_id is None for v in page)
+
+        replies = database_repository.get_comment_replies(2, [v.id for v in page], 2)
+        assert [r.id for r in replies] == [first.id, nested.id]
+        assert {r.top_level_id for r in replies} == {root.id}
+
+    def test_parent_must_be_on_the_post(self, database_repository, thread):
+        user, post = (
+            database_repository.get_pet_user_by_id(1),
+            database_repository.get_post_by_id(1),
+        )
+        with pytest.raises(ValueError):
+            database_repository.create_comment(user, post, "stray", thread[0].id)
+        with pytest.raises(ValueError):
+            database_repository.create_comment(user, post, "orphan", 99999)
+
+    def test_nesting_is_capped(self, database_repository, thread):
+        user = database_repository.get_pet_user_by_id(1)
+        post = database_repository.get_post_by_id(2)
+        parent = thread[0]
+        for _ in range(MAX_DEPTH):
+            parent = database_repository.create_comment(user, post, "deeper", parent.id)
+        with pytest.raises(ValueError):
+            database_repository.create_comment(user, post, "too deep", parent.id)
+
+    def test_deleting_a_comment_deletes_its_replies(self, database_repository, thread):
+        root, first, nested, second = thread
+        count = _comment_count(database_repository, 2)
+        user = database_repository.get_pet_user_by_id(1)
+        database_repository.delete_comment(user, first)
+        assert [v.id for v in database_repository.get_comment_thread(2, root.id)] == [
+            root.id,
+            second.id,
+        ]
+        assert _comment_count(database_repository, 2) == count - 2
+        with database_repository._session_cm as scm:
+            assert (
+                scm.session.scalar(
+                    select(comments_table.c.id).where(comments_table.c.id == nested.id)
+                )
+                is None
+            )
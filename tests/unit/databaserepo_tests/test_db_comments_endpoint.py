@@ -0,0 +1,141 @@
+import pytest
+from sqlalchemy import event
+
+import pets.adapters.repository as repository
+
+
+@pytest.fixture
+def db_client(client, database_repository, monkeypatch):
+    # The app's routes, backed by the test database.
+    monkeypatch.setattr(repository, "repo_instance", database_repository)
+    client.application.secret_key = "test"
+    with client.session_transaction() as session:
+        session.update(user_name="muffux", user_id=1, user_type="PetUser")
+    return client
+
+
+@pytest.fixture
+def statements(database_repository):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = database_repository._engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def _get_comments(client, statements, post_id, **params):
+    statements.clear()
+    response = client.get(f"/api/comments/{post_id}", query_string=params)
+    assert response.status_code == 200
+    return response.get_json(), len(statements)
+
+
+class TestCommentsEndpoint:
+    def test_query_count_does_not_grow_with_comments(
+        self, db_client, database_repository, statements
+    ):
+        before, queries = _get_comments(db_client, statements, 1)
+        before = before["comments"]
+
+        post = database_repository.get_post_by_id(1)
+        for i in range(20):
+            author = database_repository.get_pet_user_by_id(i % 3 + 1)
+            database_repository.create_comment(author, post, f"comment {i}")
+        database_repository.close_session()
+
+        page, queries_after = _get_comments(db_client, statements, 1, limit=100)
+        after = page["comments"]
+        assert len(after) == len(before) + 20
+        assert {c["author"] for c in after[-3:]} == {"muffux", "deez", "doogle"}
+        assert queries_after == queries
+        # Session user, post, the comments joined to their authors, and
+        # their reply previews.
+        assert queries <= 4
+
+    def test_pages_follow_the_cursor(self, db_client, database_repository, statements):
+        post = database_repository.get_post_by_id(2)
+        author = database_repository.get_pet_user_by_id(1)
+        for i in range(5):
+            database_repository.create_comment(author, post, f"comment {i}")
+        database_repository.close_session()
+        everything = [
+            c["id"]
+            for c in _get_comments(db_client, statements, 2, limit=100)[0]["comments"]
+        ]
+
+        for order, expected in (("oldest", everything), ("newest", everything[::-1])):
+            seen, cursor = [], ""
+            while True:
+                page, _ = _get_comments(
+                    db_client, statements, 2, order=order, limit=2, cursor=cursor
+                )
+                assert len(page["comments"]) <= 2
+                seen += [c["id"] for c in page["comments"]]
+                if not page["has_more"]:
+                    break
+                cursor = page["next_cursor"]
+            assert seen == expected
+
+    def test_rejects_bad_parameters(self, db_client):
+        for params in ({"order": "sideways"}, {"limit": "x"}, {"cursor": "!!"}):
+            response = db_client.get("/api/comments/1", query_string=params)
+            assert response.status_code == 400
+
+    def test_like_counts_once_without_loading_the_thread(
+        self, db_client, database_repository, statements
+    ):
+        comment = database_repository.get_comment_views(1)[0]
+        url = f"/api/post/1/comment/{comment.id}"
+
+        statements.clear()
+        first = db_client.post(url)
+        assert first.status_code == 200
+        assert first.get_json()["likes"] == comment.likes + 1
+        # Session user, then the insert and the increment; no comment reads.
+        assert len(statements) <= 3
+        assert not any(
+            s.lstrip().startswith("SELECT") and "FROM comments" in s for s in statements
+        )
+
+        again = db_client.post(url).get_json()
+        assert (again["liked"], again["likes"]) == (False, comment.likes + 1)
+        assert db_client.post(f"/api/post/2/comment/{comment.id}").status_code == 404
+
+    def test_replies_preview_and_thread(self, db_client, statements):
+        def post_comment(**body):
+            response = db_client.post("/api/comments/2", json=body)
+            assert response.status_code == 201
+            return response.get_json()["comment"]
+
+        root = post_comment(text="root")
+        replies = [
+            post_comment(text=f"reply {i}", parent_id=root["id"]) for i in range(3)
+        ]
+        nested = post_comment(text="nested", parent_id=replies[0]["id"])
+        assert (nested["parent_id"], nested["depth"]) == (replies[0]["id"], 2)
+        bad = db_client.post(
+            "/api/comments/1", json={"text": "x", "parent_id": root["id"]}
+        )
+        assert bad.status_code == 400
+
+        page, queries = _get_comments(db_client, statements, 2, replies=2)
+        top = next(c for c in page["comments"] if c["id"] == root["id"])
+        assert all(c["parent_id"] is None for c in page["comments"])
+        assert [r["id"] for r in top["replies"]] == [replies[0]["id"], nested["id"]]
+        assert top["more_replies"] is True
+        # The same four queries however many threads have replies.
+        assert queries <= 4
+
+        thread = db_client.get(f"/api/comments/2/thread/{root['id']}").get_json()
+        assert [c["id"] for c in thread["comments"]] == [
+            root["id"],
+            replies[0]["id"],
+            nested["id"],
+            replies[1]["id"],
+            replies[2]["id"],
+        ]
+        assert db_client.get(f"/api/comments/1/thread/{root['id']}").status_code == 404
@@ -0,0 +1,43 @@
+from sqlalchemy import QueuePool, text
+
+from config import Config
+from pets.adapters.engine import create_database_engine
+
+
+def engine_config(database_uri):
+    config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+    config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    return config
+
+
+class TestDatabaseEngine:
+    def test_sqlite_file_engine_is_pooled_and_tuned(self, tmp_path):
+        engine = create_database_engine(engine_config(f"sqlite:///{tmp_path / 'e.db'}"))
+        try:
+            assert isinstance(engine.pool, QueuePool)
+            with engine.connect() as conn:
+                assert conn.scalar(text("PRAGMA journal_mode")) == "wal"
+                assert conn.scalar(text("PRAGMA synchronous")) == 1
+                assert (
+                    conn.scalar(text("PRAGMA busy_timeout"))
+                    == Config.SQLITE_BUSY_TIMEOUT_MS
+                )
+                assert (
+                    conn.scalar(text("PRAGMA cache_size"))
+                    == -Config.SQLITE_CACHE_SIZE_KIB
+                )
+        finally:
+            engine.dispose()
+
+    def test_in_memory_engine_skips_pragmas(self):
+        engine = create_database_engine(engine_config("sqlite://"))
+        with engine.connect() as conn:
+            assert conn.scalar(text("PRAGMA journal_mode")) == "memory"
+        engine.dispose()
+
+    def test_repository_uses_the_engine_it_was_given(self, database_repository):
+        with database_repository._session_cm as scm:
+            assert scm.session.get_bind() is database_repository._engine
+        session = database_repository._session_factory()
+        assert session.get_bind() is database_repository._engine
+        session.close()
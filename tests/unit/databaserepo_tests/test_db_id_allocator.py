@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from pets.adapters.id_allocator import HiLoIdAllocator
+from pets.adapters.orm import comments_table, users_table
+
+
+class TestIdAllocation:
+    def test_hilo_starts_after_existing_ids(self, database_repository):
+        with database_repository._session_cm as scm:
+            max_user_id = scm.session.scalar(select(func.max(users_table.c.id)))
+        assert database_repository.next_user_id() == max_user_id + 1
+
+    def test_hilo_allocators_never_overlap(self, database_repository):
+        # Two allocators on one database behave like two worker processes.
+        workers = [
+            HiLoIdAllocator(database_repository._engine, block_size=7) for _ in range(2)
+        ]
+        calls = [workers[i % 2] for i in range(400)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ids = list(pool.map(lambda w: w.next_id("users"), calls))
+        assert len(set(ids)) == len(ids)
+
+    def test_parallel_comments_get_unique_ids(self, database_repository):
+        def comment(i):
+            # Like a request, each thread loads its own user and post.
+            user = database_repository.get_pet_user_by_id(1)
+            post = database_repository.get_post_by_id(1)
+            database_repository.create_comment(user, post, f"c{i}")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(comment, range(40)))
+        with database_repository._session_cm as scm:
+            ids = scm.session.scalars(select(comments_table.c.id)).all()
+            post_count = scm.session.scalar(
+                select(func.count()).where(comments_table.c.post_id == 1)
+            )
+        assert len(set(ids)) == len(ids)
+        engagement = database_repository.get_engagement([1], None)
+        assert engagement[1]["comments_count"] == post_count
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func, select
+
+from pets.adapters.counters import CounterCompactor, ShardedCounter
+from pets.adapters.orm import post_cards_table, post_counter_shards_table, posts_table
+
+
+@pytest.fixture
+def sharded_repository(database_repository):
+    database_repository._like_counter = ShardedCounter(4)
+    return database_repository
+
+
+def _stored_counts(repo, post_id):
+    with repo._session_cm as scm:
+        return scm.session.execute(
+            select(posts_table.c.like_count, post_cards_table.c.like_count)
+            .join(post_cards_table, post_cards_table.c.post_id == posts_table.c.id)
+            .where(posts_table.c.id == post_id)
+        ).one()
+
+
+def _shard_rows(repo):
+    with repo._session_cm as scm:
+        return scm.session.scalar(
+            select(func.count()).select_from(post_counter_shards_table)
+        )
+
+
+class TestShardedLikeCounters:
+    def test_likes_land_on_shards_until_compacted(self, sharded_repository):
+        repo = sharded_repository
+        before, _ = _stored_counts(repo, 4)
+        for user_id in range(10, 20):
+            assert repo.toggle_like(user_id, 4) == (True, before + user_id - 9)
+        assert repo.toggle_like(10, 4) == (False, before + 9)
+
+        assert _stored_counts(repo, 4) == (before, before)
+        assert 0 < _shard_rows(repo) <= 4
+        # Reads add the pending shards.
+        assert repo.get_engagement([4], None)[4]["likes_count"] == before + 9
+        card = next(c for c in repo.get_feed_cards(None, None, 10) if c.id == 4)
+        assert card.like_count == before + 9
+
+        assert repo.compact_counters() == 1
+        assert _stored_counts(repo, 4) == (before + 9, before + 9)
+        assert _shard_rows(repo) == 0
+        assert repo.get_engagement([4], None)[4]["likes_count"] == before + 9
+
+    def test_backfill_discards_shards(self, sharded_repository):
+        repo = sharded_repository
+        before, _ = _stored_counts(repo, 5)
+        repo.toggle_like(30, 5)
+        repo.backfill_post_counters()
+        assert _shard_rows(repo) == 0
+        assert _stored_counts(repo, 5) == (before + 1, before + 1)
+
+    def test_like_storm_with_compaction_running(self, sharded_repository):
+        # Many users like one post at once while the compactor folds shards
+        # underneath them: no like may be lost or counted twice.
+        repo = sharded_repository
+        before, _ = _stored_counts(repo, 6)
+        compactor = CounterCompactor(repo.compact_counters, 0.01)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(
+                pool.map(lambda uid: repo.toggle_like(uid, 6), range(100, 300))
+            )
+        compactor.close()
+        assert all(liked for liked, _ in results)
+        assert _shard_rows(repo) == 0
+        assert _stored_counts(repo, 6) == (before + 200, before + 200)
+
+    def test_shard_count_must_be_positive(self):
+        with pytest.raises(ValueError):
+            ShardedCounter(0)
+
+    def test_lost_like_race_reports_pending_likes(
+        self, sharded_repository, monkeypatch
+    ):
+        repo = sharded_repository
+        before, _ = _stored_counts(repo, 7)
+        for user_id in range(40, 43):
+            repo.toggle_like(user_id, 7)
+        # As if another request inserted this user's like first.
+        monkeypatch.setattr(repo, "_insert_ignoring_conflicts", lambda *a, **k: False)
+        assert repo.toggle_like(43, 7) == (True, before + 3)
+        assert repo.toggle_like(43, 99999) is None
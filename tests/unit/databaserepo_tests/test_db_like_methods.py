@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from pets.adapters.orm import like_table, posts_table
+
+
+def _like_rows(repo, post_id):
+    with repo._session_cm as scm:
+        return scm.session.scalar(
+            select(func.count()).where(like_table.c.post_id == post_id)
+        )
+
+
+def _like_count(repo, post_id):
+    with repo._session_cm as scm:
+        return scm.session.scalar(
+            select(posts_table.c.like_count).where(posts_table.c.id == post_id)
+        )
+
+
+class TestLikeMethods:
+    def test_toggle_like_on_and_off(self, database_repository):
+        before = _like_count(database_repository, 2)
+        liked, count = database_repository.toggle_like(3, 2)
+        assert (liked, count) == (True, before + 1)
+        liked, count = database_repository.toggle_like(3, 2)
+        assert (liked, count) == (False, before)
+        assert _like_rows(database_repository, 2) == before
+
+    def test_toggle_like_missing_post(self, database_repository):
+        assert database_repository.toggle_like(1, 99999) is None
+
+    def test_concurrent_toggles_stay_consistent(self, database_repository):
+        # Every user double-taps from several threads at once: each pair of
+        # toggles must cancel out without duplicate rows or a drifting count.
+        before = _like_count(database_repository, 3)
+        taps = [user_id for user_id in (2, 3, 4, 5) for _ in range(4)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda uid: database_repository.toggle_like(uid, 3), taps))
+        assert _like_count(database_repository, 3) == before
+        assert _like_rows(database_repository, 3) == before
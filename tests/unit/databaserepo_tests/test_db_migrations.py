@@ -0,0 +1,189 @@
+import re
+import sqlite3
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, select, text
+from sqlalchemy.engine import Engine
+
+from pets.adapters import migrations
+from pets.adapters.orm import metadata, posts_table
+
+# posts, likes and user_following as orm.py defined them before counters,
+# the unique like index, the secondary indexes and native column types.
+OLD_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY, username VARCHAR(255) NOT NULL,
+    email VARCHAR(255) NOT NULL, password_hash VARCHAR(255) NOT NULL,
+    profile_picture_path VARCHAR(500), created_at VARCHAR NOT NULL, bio TEXT,
+    type VARCHAR(50)
+);
+CREATE TABLE posts (
+    id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, caption TEXT,
+    views INTEGER NOT NULL, created_at VARCHAR NOT NULL, size VARCHAR NOT NULL,
+    tags VARCHAR NOT NULL, media_path VARCHAR NOT NULL,
+    media_type VARCHAR(50) NOT NULL
+);
+CREATE TABLE comments (
+    id INTEGER PRIMARY KEY, post_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+    text TEXT NOT NULL, created_at VARCHAR NOT NULL, likes INTEGER NOT NULL
+);
+CREATE TABLE likes (
+    id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, post_id INTEGER NOT NULL,
+    created_at VARCHAR NOT NULL
+);
+CREATE TABLE user_following (
+    follower_id INTEGER NOT NULL, followee_id INTEGER NOT NULL,
+    PRIMARY KEY (follower_id, followee_id)
+);
+INSERT INTO users VALUES (1, 'cat', 'cat@example.com', 'x', 'cat.png', '2025-01-01T00:00:00', '', 'pet_user');
+INSERT INTO posts VALUES (1, 1, '', 0, '2025-01-01T00:00:00', '[0, 0]', '[]', '', 'photo');
+INSERT INTO posts VALUES (2, 1, '', 0, '2025-01-01T01:30:00+02:00', '[640, 480]', '["cat"]', '', 'photo');
+INSERT INTO comments VALUES (1, 1, 2, 'hi', '2025-01-01T00:00:00', 0);
+INSERT INTO likes VALUES (1, 2, 1, '2025-01-01T00:00:00');
+INSERT INTO likes VALUES (2, 2, 1, '2025-01-01T00:00:01');
+INSERT INTO likes VALUES (3, 3, 1, '2025-01-01T00:00:02');
+"""
+
+HOT_TABLES = ("posts", "comments", "likes", "user_following", "post_cards")
+
+
+def _index_names(engine, table):
+    return {i["name"] for i in inspect(engine).get_indexes(table)}
+
+
+def _indexes(engine, table):
+    return {
+        (i["name"], tuple(i["column_names"]), bool(i["unique"]))
+        for i in inspect(engine).get_indexes(table)
+    }
+
+
+class TestMigrations:
+    def test_migrate_upgrades_an_old_database(self, tmp_path):
+        path = tmp_path / "old.db"
+        with sqlite3.connect(path) as conn:
+            conn.executescript(OLD_SCHEMA)
+        engine = create_engine(f"sqlite:///{path}")
+
+        assert migrations.migrate(engine) == [1, 2, 3, 4, 5, 6, 7, 8, 9]
+        assert migrations.migrate(engine) == []
+        assert "comment_likes" in inspect(engine).get_table_names()
+
+        assert {"ux_likes_user_post", "ix_likes_post_id"} <= _index_names(
+            engine, "likes"
+        )
+        assert "ix_posts_user_id_created_at" in _index_names(engine, "posts")
+        comment_indexes = _index_names(engine, "comments")
+        assert "ix_comments_post_id_created_at_id" in comment_indexes
+        assert "ix_comments_post_id" not in comment_indexes
+        with engine.connect() as conn:
+            # The duplicate like was dropped before counting.
+            assert conn.execute(
+                text("SELECT like_count, comment_count FROM posts WHERE id = 1")
+            ).one() == (2, 1)
+            assert conn.scalar(text("SELECT COUNT(*) FROM likes")) == 2
+            # 01:30+02:00 is 23:30 UTC the day before, so it sorts first now.
+            rows = conn.execute(
+                select(posts_table.c.id, posts_table.c.created_at).order_by(
+                    posts_table.c.created_at
+                )
+            ).all()
+            assert [post_id for post_id, _ in rows] == [2, 1]
+            assert rows[0][1] == datetime(2024, 12, 31, 23, 30, tzinfo=UTC)
+            assert conn.execute(
+                select(
+                    posts_table.c.width, posts_table.c.height, posts_table.c.tags
+                ).where(posts_table.c.id == 2)
+            ).one() == (640, 480, ["cat"])
+            # Cards were built from the migrated posts.
+            assert conn.execute(
+                text("SELECT post_id, username, like_count FROM post_cards ORDER BY 1")
+            ).all() == [(1, "cat", 2), (2, "cat", 0)]
+            # The existing comment became a top-level thread.
+            assert conn.execute(
+                text("SELECT parent_id, path FROM comments WHERE id = 1")
+            ).one() == (None, "0000000001")
+        assert "size" not in {c["name"] for c in inspect(engine).get_columns("posts")}
+        engine.dispose()
+
+    def test_migrated_indexes_match_a_new_database(self, tmp_path):
+        path = tmp_path / "old.db"
+        with sqlite3.connect(path) as conn:
+            conn.executescript(OLD_SCHEMA)
+        migrated = create_engine(f"sqlite:///{path}")
+        migrations.migrate(migrated)
+        new = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+        metadata.create_all(new)
+        for table in HOT_TABLES + ("comment_likes", "post_counter_shards"):
+            assert _indexes(migrated, table) == _indexes(new, table), table
+        migrated.dispose()
+        new.dispose()
+
+    def test_index_on_a_missing_column_fails(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE likes (id INTEGER PRIMARY KEY)"))
+            with pytest.raises(KeyError):
+                migrations._create_index(conn, "likes", "ix_likes_post_id", "post_id")
+        engine.dispose()
+
+    def test_stamped_database_has_nothing_to_apply(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+        metadata.create_all(engine)
+        migrations.stamp(engine)
+        assert migrations.migrate(engine) == []
+        engine.dispose()
+
+
+@pytest.fixture
+def captured_sql():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(
+            ("SELECT", "DELETE", "UPDATE")
+        ):
+            statements.append((conn.engine.url.database, statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", capture)
+
+
+class TestQueryPlans:
+    def test_hot_queries_use_indexes(self, database_repository, captured_sql):
+        repo = database_repository
+        first_page = repo.get_feed_page(None, None, 3)
+        repo.get_feed_page(first_page[-1].created_at, first_page[-1].id, 3)
+        cards = repo.get_feed_cards(None, None, 3)
+        repo.get_feed_cards(cards[-1].created_at, cards[-1].id, 3)
+        repo.get_user_cards(1)
+        repo.get_posts_thumbnails(1)
+        repo.get_comments_for_post(1)
+        for newest_first in (False, True):
+            views = repo.get_comment_views_page(1, None, None, 2, newest_first)
+            repo.get_comment_views_page(
+                1, views[-1].created_at, views[-1].id, 2, newest_first
+            )
+        repo.get_comment_replies(1, [view.id for view in views], 3)
+        repo.get_comment_thread(1, views[0].id)
+        user, post = repo.get_pet_user_by_id(2), repo.get_post_by_id(1)
+        repo.add_like(user, post)
+        repo.delete_like(user, post)
+        repo.get_followers(user)
+        repo.get_engagement([1, 2, 3], 2)
+        assert captured_sql
+
+        full_scans = []
+        for database, statement, parameters in captured_sql:
+            with sqlite3.connect(database) as conn:
+                plan = conn.execute(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                ).fetchall()
+            for *_, detail in plan:
+                # "SCAN t" without "USING ... INDEX" reads the whole table.
+                match = re.match(r"SCAN (\w+)", detail)
+                if match and match.group(1) in HOT_TABLES and "INDEX" not in detail:
+                    full_scans.append((detail, statement))
+        assert full_scans == []
@@ -0,0 +1,27 @@
+from sqlalchemy import func, select
+
+from pets.adapters.datareaders.data_reader import DataReader
+from pets.adapters.orm import comments_table, like_table, posts_table
+
+
+class TestPopulate:
+    def test_streamed_seed_matches_csv_data(self, database_repository):
+        data = DataReader()
+        with database_repository._session_cm as scm:
+            post_ids = scm.session.scalars(select(posts_table.c.id)).all()
+            likes = scm.session.scalar(select(func.count()).select_from(like_table))
+            comments = scm.session.scalar(
+                select(func.count()).select_from(comments_table)
+            )
+        assert sorted(post_ids) == sorted(p.id for p in data.posts)
+        assert likes == len(data.likes)
+        assert comments == len(data.comments)
+
+    def test_counters_are_backfilled_after_streaming(self, database_repository):
+        data = DataReader()
+        engagement = database_repository.get_engagement(
+            [p.id for p in data.posts], None
+        )
+        for post in data.posts:
+            assert engagement[post.id]["likes_count"] == post.like_count
+            assert engagement[post.id]["comments_count"] == post.comment_count
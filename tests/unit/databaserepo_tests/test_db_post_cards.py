@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from sqlalchemy import delete, update
+
+from pets.adapters.orm import post_cards_table
+
+NO_DIFF = {"missing": [], "extra": [], "stale": []}
+
+
+class TestPostCards:
+    def test_cards_follow_writes(self, database_repository):
+        repo = database_repository
+        author = repo.get_pet_user_by_id(1)
+        commenter = repo.get_pet_user_by_id(2)
+
+        post = repo.create_post(author, "new", [], Path("images/new.jpg"), "image")
+        card = repo.get_user_cards(1)[0]
+        assert (card.id, card.username, card.caption) == (
+            post.id,
+            author.username,
+            "new",
+        )
+
+        repo.toggle_like(commenter.user_id, post.id)
+        comment = repo.create_comment(commenter, post, "hi")
+        card = repo.get_user_cards(1)[0]
+        assert (card.like_count, card.comment_count) == (1, 1)
+
+        repo.delete_comment(commenter, comment)
+        assert repo.get_user_cards(1)[0].comment_count == 0
+
+        author.username = "renamed"
+        repo.update_user(author)
+        assert {c.username for c in repo.get_user_cards(1)} == {"renamed"}
+        assert repo.check_post_cards() == NO_DIFF
+
+        repo.delete_post(author, repo.get_post_by_id(post.id))
+        assert post.id not in {c.id for c in repo.get_user_cards(1)}
+        assert repo.check_post_cards() == NO_DIFF
+
+    def test_check_detects_and_repairs(self, database_repository):
+        with database_repository._engine.begin() as conn:
+            conn.execute(
+                update(post_cards_table)
+                .where(post_cards_table.c.post_id == 1)
+                .values(like_count=99)
+            )
+            conn.execute(
+                delete(post_cards_table).where(post_cards_table.c.post_id == 2)
+            )
+
+        assert database_repository.check_post_cards(repair=True) == {
+            "missing": [2],
+            "extra": [],
+            "stale": [1],
+        }
+        assert database_repository.check_post_cards() == NO_DIFF
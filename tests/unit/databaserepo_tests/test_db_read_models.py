@@ -0,0 +1,44 @@
+from pets.adapters.read_models import CommentView, PostCard, UserSummary
+
+
+class TestReadModels:
+    def test_feed_cards_match_feed_page(self, database_repository):
+        posts = database_repository.get_feed_page(None, None, 4)
+        cards = database_repository.get_feed_cards(None, None, 4)
+        assert all(isinstance(c, PostCard) for c in cards)
+        assert [c.id for c in cards] == [p.id for p in posts]
+        assert [(c.media_path, c.like_count) for c in cards] == [
+            (str(p.media_path), p.like_count) for p in posts
+        ]
+        last = cards[-1]
+        older = database_repository.get_feed_cards(last.created_at, last.id, 100)
+        assert [c.id for c in older] == [
+            p.id
+            for p in database_repository.get_feed_page(last.created_at, last.id, 100)
+        ]
+
+    def test_comment_views_include_authors(self, database_repository):
+        user = database_repository.get_pet_user_by_id(2)
+        post = database_repository.get_post_by_id(1)
+        comment = database_repository.create_comment(user, post, "hello")
+        views = database_repository.get_comment_views(1)
+        assert all(isinstance(v, CommentView) for v in views)
+        assert [v.id for v in views] == sorted(
+            c.id for c in database_repository.get_comments_for_post(1)
+        )
+        assert views[-1].id == comment.id
+        assert (views[-1].author, views[-1].text) == (user.username, "hello")
+        assert isinstance(views[-1].profile_picture_path, (str, type(None)))
+
+    def test_user_summary(self, database_repository):
+        follower = database_repository.get_pet_user_by_id(2)
+        user = database_repository.get_pet_user_by_id(1)
+        database_repository.follow_user(follower, user)
+        summary = database_repository.get_user_summary(1)
+        assert isinstance(summary, UserSummary)
+        assert (summary.username, summary.posts_count) == (
+            user.username,
+            len(database_repository.get_user_cards(1)),
+        )
+        assert summary.followers_count == 1
+        assert database_repository.get_user_summary(99999) is None
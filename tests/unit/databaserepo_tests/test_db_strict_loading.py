@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker
+
+from pets.adapters.database_repository import SqlAlchemyRepository
+
+
+class TestStrictLoading:
+    def test_unloaded_relationships_raise(self, database_repository):
+        post = database_repository.get_post_by_id(1)
+        with pytest.raises(InvalidRequestError):
+            post.comments
+        posts = database_repository.get_feed_page(None, None, 8)
+        assert all(p.caption is not None and p.like_count >= 0 for p in posts)
+        with pytest.raises(InvalidRequestError):
+            posts[0].likes
+        user = database_repository.get_pet_user_by_name("muffux")
+        with pytest.raises(InvalidRequestError):
+            user.posts
+
+    def test_off_by_default(self, database_repository):
+        engine = database_repository._engine
+        repo = SqlAlchemyRepository(
+            sessionmaker(bind=engine, expire_on_commit=False), engine
+        )
+        try:
+            post = repo.get_post_by_id(2)
+            assert all(c.post_id == 2 for c in post.comments)
+        finally:
+            repo.close_session()
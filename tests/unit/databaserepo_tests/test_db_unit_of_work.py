@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import event, func, select
+
+from pets.adapters.orm import comments_table
+
+
+@pytest.fixture
+def engine_events(database_repository):
+    events = {"statements": 0, "commit": 0, "rollback": 0}
+    engine = database_repository._engine
+
+    def count(name):
+        def listener(*args):
+            events[name] += 1
+
+        event.listen(engine, name, listener)
+        return name, listener
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        events["statements"] += 1
+
+    listeners = [count("commit"), count("rollback")]
+    listeners.append(("before_cursor_execute", count_statement))
+    event.listen(engine, "before_cursor_execute", count_statement)
+    yield events
+    for name, listener in listeners:
+        event.remove(engine, name, listener)
+
+
+def _stored_comments(repo, post_id):
+    with repo._engine.connect() as conn:
+        return conn.scalar(
+            select(func.count()).where(comments_table.c.post_id == post_id)
+        )
+
+
+class TestUnitOfWork:
+    def test_repeated_lookups_use_the_identity_map(
+        self, database_repository, engine_events
+    ):
+        database_repository.begin_unit_of_work()
+        user = database_repository.get_pet_user_by_id(1)
+        post = database_repository.get_post_by_id(1)
+        statements = engine_events["statements"]
+
+        assert database_repository.get_pet_user_by_id(1) is user
+        assert database_repository.get_post_by_id(1) is post
+        assert user.username and post.caption
+        assert engine_events["statements"] == statements
+        assert engine_events["rollback"] == 0
+
+        database_repository.end_unit_of_work()
+        assert engine_events["commit"] == 1
+
+    def test_writes_commit_once_at_the_end(self, database_repository, engine_events):
+        before = _stored_comments(database_repository, 5)
+        database_repository.begin_unit_of_work()
+        user = database_repository.get_pet_user_by_id(2)
+        post = database_repository.get_post_by_id(5)
+        first = database_repository.create_comment(user, post, "one")
+        second = database_repository.create_comment(user, post, "two")
+        assert first.id != second.id
+        assert engine_events["commit"] == 0
+        # Another connection can't see the request's writes yet.
+        assert _stored_comments(database_repository, 5) == before
+
+        database_repository.end_unit_of_work()
+        assert engine_events["commit"] == 1
+        assert _stored_comments(database_repository, 5) == before + 2
+
+    def test_exception_rolls_the_unit_back(self, database_repository):
+        before = _stored_comments(database_repository, 6)
+        database_repository.begin_unit_of_work()
+        user = database_repository.get_pet_user_by_id(2)
+        post = database_repository.get_post_by_id(6)
+        database_repository.create_comment(user, post, "discarded")
+        database_repository.end_unit_of_work(RuntimeError("request failed"))
+        assert _stored_comments(database_repository, 6) == before
+
+    def test_ending_without_a_unit_is_a_no_op(self, database_repository):
+        database_repository.end_unit_of_work()
+        assert database_repository.get_pet_user_by_id(1) is not None
+
+    def test_read_outside_a_unit_stays_loaded(self, database_repository, engine_events):
+        post = database_repository.get_post_by_id(2)
+        statements = engine_events["statements"]
+        # The read-only block committed rather than rolled back, so nothing
+        # was expired and column access needs no query.
+        assert post.caption is not None and post.like_count >= 0
+        assert engine_events["statements"] == statements
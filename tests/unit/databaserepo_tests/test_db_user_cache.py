@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import event
+
+from pets.adapters.user_cache import UserCache
+from pets.domainmodel.PetUser import PetUser
+
+
+@pytest.fixture
+def cached_repository(database_repository):
+    database_repository._user_cache = UserCache(max_size=8)
+    return database_repository
+
+
+@pytest.fixture
+def statements(cached_repository):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = cached_repository._engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def _next_request(repo):
+    # What the app's teardown does: a fresh session per request.
+    repo.close_session()
+
+
+class TestUserCache:
+    def test_lru_evicts_least_recently_used(self):
+        cache = UserCache(max_size=2)
+        cache.put(1, "one")
+        cache.put(2, "two")
+        cache.get(1)
+        cache.put(3, "three")
+        assert (cache.get(1), cache.get(2), cache.get(3)) == ("one", None, "three")
+        cache.invalidate(1, 3)
+        assert len(cache) == 0
+
+    def test_warm_lookup_costs_no_query(self, cached_repository, statements):
+        first = cached_repository.get_user_by_id(3)
+        _next_request(cached_repository)
+        statements.clear()
+
+        user = cached_repository.get_user_by_id(3)
+        assert statements == []
+        assert isinstance(user, PetUser)
+        assert user is not first
+        assert (user.username, user.animal_type) == (first.username, first.animal_type)
+        # Attached to the new session, so relationships can still load.
+        assert user in cached_repository._session_cm.session
+
+    def test_update_user_invalidates(self, cached_repository, statements):
+        user = cached_repository.get_user_by_id(2)
+        user.bio = "changed"
+        cached_repository.update_user(user)
+        _next_request(cached_repository)
+        statements.clear()
+
+        assert cached_repository.get_user_by_id(2).bio == "changed"
+        assert len(statements) == 1
+
+    def test_follow_invalidates_both_users(self, cached_repository):
+        follower = cached_repository.get_user_by_id(2)
+        followee = cached_repository.get_user_by_id(3)
+        cached_repository.get_user_by_id(1)
+        cached_repository.follow_user(follower, followee)
+
+        cache = cached_repository._user_cache
+        assert (cache.get(2), cache.get(3)) == (None, None)
+        assert cache.get(1) is not None
+
+    def test_unit_of_work_forgets_changes_after_commit(self, cached_repository):
+        cached_repository.begin_unit_of_work()
+        user = cached_repository.get_user_by_id(2)
+        user.bio = "in a unit of work"
+        cached_repository.update_user(user)
+        # Another request caches the row before the unit of work commits.
+        cached_repository._user_cache.put(2, "stale")
+        cached_repository.end_unit_of_work()
+
+        assert cached_repository._user_cache.get(2) is None
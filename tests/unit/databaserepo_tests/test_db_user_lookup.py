@@ -0,0 +1,69 @@
+from datetime import datetime, UTC
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+from pets.domainmodel.HumanUser import HumanUser
+from pets.domainmodel.PetUser import PetUser
+from pets.domainmodel.TempUser import TempUser
+
+
+@pytest.fixture
+def statements(database_repository):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = database_repository._engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def human(database_repository):
+    user = HumanUser(
+        None, "walker", "walker@example.com", "hash", Path(""), datetime.now(UTC)
+    )
+    database_repository.add_human_user(user)
+    database_repository.close_session()
+    return user
+
+
+class TestUserLookup:
+    def test_get_user_by_name_is_one_query(self, database_repository, statements):
+        user = database_repository.get_user_by_name("deez")
+        assert isinstance(user, PetUser)
+        # Subclass columns came back with the row.
+        user.animal_type
+        assert len(statements) == 1
+
+    def test_get_user_returns_subclass(self, database_repository, human, statements):
+        by_name = database_repository.get_user_by_name("walker")
+        assert type(by_name) is HumanUser
+        assert database_repository.get_user_by_id(human.user_id) is by_name
+        # The second lookup was answered from the identity map.
+        assert len(statements) == 1
+        assert database_repository.get_user_by_name("nobody") is None
+
+    def test_get_users_by_ids(self, database_repository, human, statements):
+        users = database_repository.get_users_by_ids(
+            [human.user_id, 99999, 2, human.user_id]
+        )
+        assert [(type(u), u.user_id) for u in users] == [
+            (HumanUser, human.user_id),
+            (PetUser, 2),
+        ]
+        assert len(statements) == 1
+        assert database_repository.get_users_by_ids([]) == []
+
+    def test_temp_users_are_found(self, database_repository):
+        temp = TempUser(
+            database_repository.next_user_id(), "visitor", "v@example.com", "hash"
+        )
+        database_repository.add_temp_user(temp)
+        assert database_repository.get_user_by_name("visitor") is temp
+        assert database_repository.get_user_by_id(temp.user_id) is temp
+        assert database_repository.get_users_by_ids([temp.user_id, 1])[0] is temp
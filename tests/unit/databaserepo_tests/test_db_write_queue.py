@@ -0,0 +1,127 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func, select, text
+
+from pets.adapters.orm import comments_table, posts_table, user_following_table
+from pets.adapters.write_queue import WriteQueue
+
+
+@pytest.fixture
+def queued_repository(database_repository):
+    database_repository._write_queue = WriteQueue(database_repository._engine)
+    yield database_repository
+    database_repository.close_write_queue()
+
+
+def _post_counts(repo, post_id):
+    with repo._session_cm as scm:
+        return scm.session.execute(
+            select(posts_table.c.like_count, posts_table.c.comment_count).where(
+                posts_table.c.id == post_id
+            )
+        ).one()
+
+
+class TestWriteQueue:
+    def test_queued_writes_share_one_commit(self, database_repository):
+        write_queue = WriteQueue(database_repository._engine)
+        started, release = threading.Event(), threading.Event()
+        try:
+            # Hold the writer so the next submissions pile up behind it.
+            first = write_queue.submit(lambda conn: started.set() or release.wait(5))
+            started.wait(5)
+            futures = [
+                write_queue.submit(
+                    lambda conn, i=i: conn.execute(
+                        text("UPDATE posts SET views = views + 1 WHERE id = 1")
+                    ).rowcount
+                )
+                for i in range(20)
+            ]
+            release.set()
+            assert first.result() is True
+            assert [f.result() for f in futures] == [1] * 20
+        finally:
+            write_queue.close()
+        assert (write_queue.batches, write_queue.writes) == (2, 21)
+
+    def test_failing_write_only_fails_its_caller(self, database_repository):
+        write_queue = WriteQueue(database_repository._engine)
+        release = threading.Event()
+        try:
+            write_queue.submit(lambda conn: release.wait(5))
+            good = write_queue.submit(
+                lambda conn: conn.execute(
+                    text("UPDATE posts SET views = 777 WHERE id = 1")
+                ).rowcount
+            )
+            bad = write_queue.submit(lambda conn: conn.execute(text("SELECT nope")))
+            release.set()
+            assert good.result() == 1
+            with pytest.raises(Exception):
+                bad.result()
+        finally:
+            write_queue.close()
+        with database_repository._session_cm as scm:
+            views = scm.session.scalar(
+                select(posts_table.c.views).where(posts_table.c.id == 1)
+            )
+        assert views == 777
+
+    def test_closed_queue_rejects_writes(self, database_repository):
+        write_queue = WriteQueue(database_repository._engine)
+        write_queue.close()
+        with pytest.raises(RuntimeError):
+            write_queue.submit(lambda conn: None)
+
+
+class TestQueuedRepositoryWrites:
+    def test_concurrent_likes_and_comments(self, queued_repository):
+        likes_before, comments_before = _post_counts(queued_repository, 4)
+
+        def comment(i):
+            # Like a request, each thread loads its own user and post.
+            user = queued_repository.get_pet_user_by_id(2)
+            post = queued_repository.get_post_by_id(4)
+            return queued_repository.create_comment(user, post, f"queued {i}")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            comments = list(pool.map(comment, range(40)))
+            toggles = list(
+                pool.map(lambda uid: queued_repository.toggle_like(uid, 4), [1, 3, 4])
+            )
+
+        assert len({c.id for c in comments}) == 40
+        assert all(liked for liked, _ in toggles)
+        assert _post_counts(queued_repository, 4) == (
+            likes_before + 3,
+            comments_before + 40,
+        )
+        with queued_repository._session_cm as scm:
+            stored = scm.session.scalar(
+                select(func.count()).where(comments_table.c.text.like("queued %"))
+            )
+        assert stored == 40
+
+    def test_follow_and_comment_like(self, queued_repository):
+        follower = queued_repository.get_pet_user_by_id(2)
+        followee = queued_repository.get_pet_user_by_id(3)
+        queued_repository.follow_user(follower, followee)
+        assert 2 in followee.follower_ids
+        queued_repository.follow_user(follower, followee)
+        with queued_repository._session_cm as scm:
+            rows = scm.session.scalar(
+                select(func.count()).where(
+                    user_following_table.c.follower_id == 2,
+                    user_following_table.c.followee_id == 3,
+                )
+            )
+        assert rows == 1
+
+        comment = queued_repository.get_comments_for_post(1)[0]
+        likes = comment.likes
+        queued_repository.add_like_to_comment(comment)
+        assert comment.likes == likes + 1
+        assert queued_repository.get_comments_for_post(1)[0].likes == likes + 1
@@ -0,0 +1,14 @@
+from pets.adapters.datareaders.data_reader import DataReader
+
+
+def test_data_reader_parallel_matches_sequential():
+    sequential = DataReader()
+    parallel = DataReader(processes=4)
+    assert [u.user_id for u in parallel.users] == [u.user_id for u in sequential.users]
+    assert [p.id for p in parallel.posts] == [p.id for p in sequential.posts]
+    assert parallel.max_like_id == sequential.max_like_id
+    for seq_post, par_post in zip(sequential.posts, parallel.posts):
+        assert par_post.like_count == seq_post.like_count
+        assert par_post.comment_count == seq_post.comment_count
+    for seq_user, par_user in zip(sequential.users, parallel.users):
+        assert [p.id for p in par_user.posts] == [p.id for p in seq_user.posts]
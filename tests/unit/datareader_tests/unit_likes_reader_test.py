@@ -60,3 +60,14 @@ def test_likes_reader_reads_multiple_likes(test_likes_reader):
     post_ids = [like.post_id for like in likes]
     assert len(set(user_ids)) > 1
     assert len(set(post_ids)) > 1
+
+
+def test_likes_reader_iter_likes_chunks(test_likes_reader):
+    chunks = list(test_likes_reader.iter_likes(chunk_size=4))
+    assert all(len(chunk) == 4 for chunk in chunks[:-1])
+    assert 1 <= len(chunks[-1]) <= 4
+    ids = [like.id for chunk in chunks for like in chunk]
+    assert ids == [like.id for like in LikesReader().read_likes()]
+    assert test_likes_reader.max_like_id == max(ids)
+    # Streaming doesn't accumulate rows on the reader.
+    assert test_likes_reader.likes == []
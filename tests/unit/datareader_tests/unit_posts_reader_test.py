@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from pets.adapters.datareaders.posts_reader import PostsReader
+
 
 def test_posts_reader(test_posts_reader):
     posts = test_posts_reader.read_posts()
@@ -83,3 +85,11 @@ def test_posts_reader_assign_likes_and_comments(
 
         assert len(post.likes) == len(post_likes)
         assert len(post.comments) == len(post_comments)
+
+
+def test_posts_reader_iter_posts_chunks(test_posts_reader):
+    chunks = list(test_posts_reader.iter_posts(chunk_size=3))
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    assert [p.id for chunk in chunks for p in chunk] == [
+        p.id for p in PostsReader().read_posts()
+    ]
@@ -82,3 +82,17 @@ def test_add_duplicate_post(test_pet_user, test_post):
     assert (
         len(test_pet_user.posts) == initial_post_count
     )  # Count should remain the same
+
+
+def test_post_counters_follow_likes_and_comments(test_post, test_like, test_comment):
+    assert test_post.like_count == 0
+    assert test_post.comment_count == 0
+    test_post.add_like(test_like)
+    test_post.add_like(test_like)  # duplicates are ignored
+    test_post.add_comment(test_comment)
+    assert test_post.like_count == 1
+    assert test_post.comment_count == 1
+    test_post.remove_like(test_like)
+    test_post.remove_comment(test_comment)
+    assert test_post.like_count == 0
+    assert test_post.comment_count == 0
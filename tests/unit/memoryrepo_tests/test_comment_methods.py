@@ -1,4 +1,7 @@
+import pytest
+
 from pets.domainmodel.Comment import Comment
+from pets.domainmodel.Post import Post
 from datetime import datetime
 
 
@@ -35,6 +38,18 @@ class TestCommentMethods:
         in_memory_repository.add_like_to_comment(test_comment)
         assert test_comment.likes == original_likes_len + 1
 
+    def test_like_comment_once_per_user(
+        self, in_memory_repository, test_user, test_post, test_comment
+    ):
+        in_memory_repository.add_comment(test_user, test_comment)
+        likes = test_comment.likes
+        like = in_memory_repository.like_comment
+        assert like(2, test_post.id, test_comment.id) == (True, likes + 1)
+        assert like(2, test_post.id, test_comment.id) == (False, likes + 1)
+        assert like(3, test_post.id, test_comment.id) == (True, likes + 2)
+        assert like(2, test_post.id + 1, test_comment.id) is None
+        assert like(2, test_post.id, 99999) is None
+
     def test_delete_comment(
         self, in_memory_repository, test_user, test_post, test_comment
     ):
@@ -53,3 +68,81 @@ class TestCommentMethods:
         assert comment.comment_string == "Creating a new comment"
         assert comment.user_id == test_user.user_id
         assert comment.post_id == test_post.id
+
+    def test_create_and_delete_comment_update_post_counter(
+        self, in_memory_repository, test_pet_user, test_user
+    ):
+        post = Post(
+            9999, test_pet_user.user_id, "", 0, datetime.now(), (0, 0), [], [], "", ""
+        )
+        in_memory_repository.add_post(test_pet_user, post)
+        comment = in_memory_repository.create_comment(test_user, post, "Hi")
+        assert post.comment_count == 1
+        in_memory_repository.delete_comment(test_user, comment)
+        assert post.comment_count == 0
+
+    def test_parallel_create_comment_ids_are_unique(
+        self, in_memory_repository, test_user, test_post
+    ):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            comments = list(
+                pool.map(
+                    lambda i: in_memory_repository.create_comment(
+                        test_user, test_post, f"comment {i}"
+                    ),
+                    range(200),
+                )
+            )
+        ids = [c.id for c in comments]
+        assert len(set(ids)) == len(ids)
+
+    def test_comment_views_page_walks_both_orders(self, in_memory_repository):
+        repo = in_memory_repository
+        post = repo.get_post_by_id(2)
+        author = repo.get_pet_user_by_id(1)
+        for i in range(5):
+            repo.create_comment(author, post, f"comment {i}")
+        everything = [v.id for v in repo.get_comment_views(2)]
+
+        for newest_first, expected in ((False, everything), (True, everything[::-1])):
+            seen, cursor = [], (None, None)
+            while True:
+                page = repo.get_comment_views_page(2, *cursor, 3, newest_first)
+                seen += [v.id for v in page]
+                if len(page) < 3:
+                    break
+                cursor = (page[-1].created_at, page[-1].id)
+            assert seen == expected
+
+    def test_replies_form_a_thread(self, in_memory_repository):
+        repo = in_memory_repository
+        post = repo.get_post_by_id(2)
+        author = repo.get_pet_user_by_id(1)
+        root = repo.create_comment(author, post, "root")
+        first = repo.create_comment(author, post, "first", root.id)
+        nested = repo.create_comment(author, post, "nested", first.id)
+        second = repo.create_comment(author, post, "second", root.id)
+
+        thread = repo.get_comment_thread(2, root.id)
+        assert [v.id for v in thread] == [root.id, first.id, nested.id, second.id]
+        assert [v.depth for v in thread] == [0, 1, 2, 1]
+        assert repo.get_comment_thread(1, root.id) == []
+
+        page = repo.get_comment_views_page(2, None, None, 100)
+        assert all(v.parent_id is None for v in page)
+        replies = repo.get_comment_replies(2, [v.id for v in page], 2)
+        assert [r.id for r in replies] == [first.id, nested.id]
+
+        with pytest.raises(ValueError):
+            repo.create_comment(author, repo.get_post_by_id(1), "stray", root.id)
+
+        count = post.comment_count
+        repo.delete_comment(author, first)
+        assert [v.id for v in repo.get_comment_thread(2, root.id)] == [
+            root.id,
+            second.id,
+        ]
+        assert post.comment_count == count - 2
+        assert nested not in author.comments
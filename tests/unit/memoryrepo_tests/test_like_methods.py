@@ -1,3 +1,9 @@
+from datetime import datetime
+from pathlib import Path
+
+from pets.domainmodel.PetUser import PetUser
+
+
 class TestLikeMethods:
     def test_add_like(
         self, in_memory_repository, test_pet_user, test_user, test_post, test_like
@@ -16,6 +22,7 @@ class TestLikeMethods:
         original_likes_len = len(test_post.likes)
         in_memory_repository.delete_like(test_post, test_user)
         assert len(test_post.likes) == original_likes_len - 1
+        assert test_post.like_count == len(test_post.likes)
 
     def test_add_multiple_likes(
         self, in_memory_repository, test_pet_user, test_user, test_post
@@ -23,7 +30,32 @@ class TestLikeMethods:
         in_memory_repository.add_pet_user(test_pet_user)
         in_memory_repository.add_post(test_pet_user, test_post)
         original_likes_len = len(test_post.likes)
+        # One like per user per post, so the second liker needs its own id.
+        other_user = PetUser(
+            9999, "other_pet", "other_pet@example.com", "hash", Path(""), datetime.now()
+        )
         in_memory_repository.add_multiple_likes(
-            [test_post, test_post], [test_user, test_pet_user]
+            [test_post, test_post], [test_user, other_user]
         )
         assert len(test_post.likes) == original_likes_len + 2
+        in_memory_repository.add_multiple_likes([test_post], [test_user])
+        assert len(test_post.likes) == original_likes_len + 2
+
+    def test_get_engagement(self, in_memory_repository, test_pet_user, test_user):
+        posts = in_memory_repository.get_feed_page(None, None, 3)
+        liked, other = posts[0], posts[1]
+        in_memory_repository.add_like(liked, test_user)
+        stats = in_memory_repository.get_engagement(
+            [liked.id, other.id, -1], test_user.user_id
+        )
+        assert set(stats) == {liked.id, other.id}
+        assert stats[liked.id]["liked"] is True
+        assert stats[liked.id]["likes_count"] == liked.like_count
+        assert stats[other.id]["comments_count"] == other.comment_count
+
+    def test_toggle_like(self, in_memory_repository, test_user):
+        post = in_memory_repository.get_feed_page(None, None, 1)[0]
+        before = post.like_count
+        assert in_memory_repository.toggle_like(999, post.id) == (True, before + 1)
+        assert in_memory_repository.toggle_like(999, post.id) == (False, before)
+        assert in_memory_repository.toggle_like(999, -1) is None
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+NO_DIFF = {"missing": [], "extra": [], "stale": []}
+
+
+class TestPostCardMethods:
+    def test_cards_follow_writes(self, in_memory_repository, test_user):
+        repo = in_memory_repository
+        author = repo.get_pet_user_by_id(1)
+
+        post = repo.create_post(author, "new", [], Path("images/new.jpg"), "image")
+        card = repo.get_user_cards(1)[0]
+        assert (card.id, card.username, card.caption) == (
+            post.id,
+            author.username,
+            "new",
+        )
+
+        repo.toggle_like(test_user.user_id, post.id)
+        comment = repo.create_comment(test_user, post, "hi")
+        card = repo.get_user_cards(1)[0]
+        assert (card.like_count, card.comment_count) == (1, 1)
+
+        repo.delete_comment(test_user, comment)
+        assert repo.get_user_cards(1)[0].comment_count == 0
+
+        author.username = "renamed"
+        repo.update_user(author)
+        assert {c.username for c in repo.get_user_cards(1)} == {"renamed"}
+        assert repo.check_post_cards() == NO_DIFF
+
+        repo.delete_post(author, post)
+        assert post.id not in {c.id for c in repo.get_user_cards(1)}
+        assert repo.check_post_cards() == NO_DIFF
+
+    def test_user_cards_match_posts(self, in_memory_repository):
+        user = in_memory_repository.get_pet_user_by_id(1)
+        cards = in_memory_repository.get_user_cards(1)
+        assert [c.id for c in cards] == [
+            p.id
+            for p in sorted(
+                user.posts, key=lambda p: (p.created_at, p.id), reverse=True
+            )
+        ]
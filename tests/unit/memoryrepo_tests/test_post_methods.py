@@ -1,23 +1,45 @@
+from datetime import datetime
+from pathlib import Path
+
+from pets.domainmodel.Post import Post
+
+
+def _new_post(post_id, user):
+    # Post ids are unique, so tests adding posts use ids the CSV data
+    # doesn't already hold.
+    return Post(
+        post_id,
+        user.user_id,
+        "this is a test post",
+        1,
+        datetime.now(),
+        (180, 180),
+        [],
+        [user],
+        Path(""),
+        "photo",
+    )
+
+
 class TestPostMethods:
-    def test_add_post(self, in_memory_repository, test_pet_user, test_post):
+    def test_add_post(self, in_memory_repository, test_pet_user):
         in_memory_repository.add_pet_user(test_pet_user)
         original_posts_len = len(
             in_memory_repository.get_all_user_post_paths(test_pet_user)
         )
-        in_memory_repository.add_post(test_pet_user, test_post)
+        in_memory_repository.add_post(test_pet_user, _new_post(9999, test_pet_user))
         assert (
             len(in_memory_repository.get_all_user_post_paths(test_pet_user))
             == original_posts_len + 1
         )
 
-    def test_add_multiple_posts(self, in_memory_repository, test_pet_user, test_post):
+    def test_add_multiple_posts(self, in_memory_repository, test_pet_user):
         in_memory_repository.add_pet_user(test_pet_user)
         original_posts_len = len(
             in_memory_repository.get_all_user_post_paths(test_pet_user)
         )
-        post2 = test_post
-        post2.title = "<TITLE>"
-        in_memory_repository.add_multiple_posts(test_pet_user, [test_post, post2])
+        posts = [_new_post(9998, test_pet_user), _new_post(9999, test_pet_user)]
+        in_memory_repository.add_multiple_posts(test_pet_user, posts)
         assert (
             len(in_memory_repository.get_all_user_post_paths(test_pet_user))
             == original_posts_len + 2
@@ -41,3 +63,48 @@ class TestPostMethods:
         retrieved_post = in_memory_repository.get_post_by_id(test_post.id)
         assert retrieved_post is not None
         assert retrieved_post.id == test_post.id
+
+    def test_get_feed_page_newest_first(self, in_memory_repository):
+        page = in_memory_repository.get_feed_page(None, None, 4)
+        keys = [(p.created_at, p.id) for p in page]
+        assert len(page) == 4
+        assert keys == sorted(keys, reverse=True)
+
+    def test_get_feed_page_cursor_is_stable(
+        self, in_memory_repository, test_pet_user, test_post
+    ):
+        first = in_memory_repository.get_feed_page(None, None, 3)
+        last = first[-1]
+        # A post arriving between page loads must not shift the next page.
+        in_memory_repository.add_pet_user(test_pet_user)
+        in_memory_repository.add_post(test_pet_user, test_post)
+        second = in_memory_repository.get_feed_page(last.created_at, last.id, 3)
+        all_posts = in_memory_repository.get_feed_page(None, None, 100)
+        expected = all_posts[all_posts.index(last) + 1 : all_posts.index(last) + 4]
+        assert second == expected
+        assert test_post not in second
+
+    def test_deleted_post_leaves_no_index_entries(
+        self, in_memory_repository, test_pet_user, test_user
+    ):
+        in_memory_repository.add_pet_user(test_pet_user)
+        test_post = _new_post(9999, test_pet_user)
+        in_memory_repository.add_post(test_pet_user, test_post)
+        in_memory_repository.add_like(test_post, test_user)
+        in_memory_repository.create_comment(test_user, test_post, "hi")
+        in_memory_repository.delete_post(test_pet_user, test_post)
+        assert in_memory_repository.get_post_by_id(9999) is None
+        assert in_memory_repository.get_comments_by_post(test_post) == []
+        assert in_memory_repository.get_engagement([9999], test_user.user_id) == {}
+        thumbnail_ids = [
+            t["id"]
+            for t in in_memory_repository.get_posts_thumbnails(test_pet_user.user_id)
+        ]
+        assert 9999 not in thumbnail_ids
+
+    def test_thumbnails_are_newest_first(self, in_memory_repository):
+        user_id = in_memory_repository.get_pet_users()[0].user_id
+        thumbnails = in_memory_repository.get_posts_thumbnails(user_id)
+        posts = [in_memory_repository.get_post_by_id(t["id"]) for t in thumbnails]
+        created = [p.created_at.timestamp() for p in posts]
+        assert created == sorted(created, reverse=True)
@@ -0,0 +1,33 @@
+from pets.adapters.read_models import CommentView, PostCard, UserSummary
+
+
+class TestReadModelMethods:
+    def test_feed_cards_match_feed_page(self, in_memory_repository):
+        posts = in_memory_repository.get_feed_page(None, None, 4)
+        cards = in_memory_repository.get_feed_cards(None, None, 4)
+        assert all(isinstance(c, PostCard) for c in cards)
+        assert [c.id for c in cards] == [p.id for p in posts]
+        assert [c.media_path for c in cards] == [str(p.media_path) for p in posts]
+        last = cards[-1]
+        older = in_memory_repository.get_feed_cards(last.created_at, last.id, 4)
+        assert older and all(c.id not in {p.id for p in posts} for c in older)
+
+    def test_comment_views_include_authors(self, in_memory_repository, test_user):
+        post = in_memory_repository.get_post_by_id(1)
+        seeded = len(post.comments)
+        comment = in_memory_repository.create_comment(test_user, post, "hello")
+        views = in_memory_repository.get_comment_views(1)
+        assert all(isinstance(v, CommentView) for v in views)
+        assert len(views) == seeded + 1
+        assert views[-1].id == comment.id
+        assert views[-1].text == "hello"
+        assert all(v.author for v in views[:seeded])
+
+    def test_user_summary(self, in_memory_repository):
+        user = in_memory_repository.get_pet_user_by_id(1)
+        summary = in_memory_repository.get_user_summary(1)
+        assert isinstance(summary, UserSummary)
+        assert summary.username == user.username
+        assert summary.posts_count == len(user.posts)
+        assert summary.followers_count == len(in_memory_repository.get_followers(user))
+        assert in_memory_repository.get_user_summary(99999) is None
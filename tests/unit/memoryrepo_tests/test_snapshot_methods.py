@@ -0,0 +1,54 @@
+import os
+import pickle
+
+import pytest
+
+from pets.adapters.memory_repository import MemoryRepository
+from pets.adapters.populate_repository import DATA_DIR, snapshot_is_current
+
+
+class TestSnapshotMethods:
+    def test_snapshot_round_trip(self, in_memory_repository, test_user, tmp_path):
+        post = in_memory_repository.get_post_by_id(2)
+        in_memory_repository.create_comment(test_user, post, "before snapshot")
+        in_memory_repository.toggle_like(test_user.user_id, 2)
+        path = tmp_path / "pets.pkl"
+        in_memory_repository.save_snapshot(path)
+
+        restored = MemoryRepository()
+        restored.load_snapshot(path)
+
+        assert [p.id for p in restored.get_feed_page(None, None, 100)] == [
+            p.id for p in in_memory_repository.get_feed_page(None, None, 100)
+        ]
+        ids = [p.id for p in in_memory_repository.get_all_posts()]
+        assert restored.get_engagement(ids, test_user.user_id) == (
+            in_memory_repository.get_engagement(ids, test_user.user_id)
+        )
+        for user in in_memory_repository.get_pet_users():
+            assert restored.get_pet_user_by_name(user.username).user_id == user.user_id
+        restored_post = restored.get_post_by_id(2)
+        assert len(restored.get_comments_by_post(restored_post)) == len(
+            in_memory_repository.get_comments_by_post(post)
+        )
+        # Ids keep counting from where the snapshot left off.
+        comment = restored.create_comment(test_user, restored_post, "after")
+        assert comment.id > max(c.id for c in post.comments)
+
+    def test_unknown_snapshot_version_is_rejected(self, tmp_path):
+        path = tmp_path / "pets.pkl"
+        path.write_bytes(pickle.dumps({"version": -1}))
+        with pytest.raises(ValueError):
+            MemoryRepository().load_snapshot(path)
+
+    def test_snapshot_is_current_only_when_newer_than_csvs(
+        self, in_memory_repository, tmp_path
+    ):
+        path = tmp_path / "pets.pkl"
+        assert not snapshot_is_current(path)
+        in_memory_repository.save_snapshot(path)
+        newest_csv = max(p.stat().st_mtime for p in DATA_DIR.glob("*.csv"))
+        os.utime(path, (newest_csv + 10, newest_csv + 10))
+        assert snapshot_is_current(path)
+        os.utime(path, (newest_csv - 10, newest_csv - 10))
+        assert not snapshot_is_current(path)
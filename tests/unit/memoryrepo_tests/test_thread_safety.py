@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pets.adapters.locking import ReadWriteLock
+from pets.adapters.memory_repository import MemoryRepository
+from pets.adapters.populate_repository import populate
+
+
+@pytest.fixture
+def thread_safe_repository() -> MemoryRepository:
+    repository = MemoryRepository(thread_safe=True)
+    populate(repository)
+    return repository
+
+
+class TestThreadSafety:
+    def test_concurrent_likes_and_comments_stay_consistent(
+        self, thread_safe_repository
+    ):
+        repo = thread_safe_repository
+        users = repo.get_pet_users()
+        posts = repo.get_all_posts()
+        before = {p.id: (p.like_count, p.comment_count) for p in posts}
+
+        def hammer(i):
+            user = users[i % len(users)]
+            post = posts[i % len(posts)]
+            # Two toggles cancel out; the comment and feed read are kept.
+            repo.toggle_like(user.user_id, post.id)
+            comment = repo.create_comment(user, post, f"comment {i}")
+            repo.toggle_like(user.user_id, post.id)
+            repo.get_feed_page(None, None, 5)
+            return comment
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            comments = list(pool.map(hammer, range(800)))
+
+        ids = [c.id for c in comments]
+        assert len(set(ids)) == len(ids)
+        for post in posts:
+            likes, comment_count = before[post.id]
+            added = sum(1 for c in comments if c.post_id == post.id)
+            assert post.like_count == likes == len(post.likes)
+            assert post.comment_count == comment_count + added
+            assert len(repo.get_comments_by_post(post)) >= added
+
+    def test_readers_share_and_writers_exclude(self):
+        lock = ReadWriteLock()
+        both_reading = threading.Barrier(2, timeout=5)
+        log = []
+
+        def reader():
+            with lock.read():
+                # Only passes if both readers hold the lock at once.
+                both_reading.wait()
+                log.append("read")
+
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        for t in readers:
+            t.start()
+        for t in readers:
+            t.join()
+        assert log == ["read", "read"]
+
+        with lock.write():
+
+            def late_reader():
+                with lock.read():
+                    log.append("late read")
+
+            t = threading.Thread(target=late_reader)
+            t.start()
+            time.sleep(0.1)  # give the reader a chance to (wrongly) get in
+            log.append("write")
+        t.join()
+        assert log[-2:] == ["write", "late read"]
+
+    def test_read_lock_cannot_be_upgraded(self):
+        lock = ReadWriteLock()
+        with lock.read():
+            with pytest.raises(RuntimeError):
+                lock.acquire_write()
+        with lock.write():
+            with lock.read():
+                with lock.write():
+                    pass
@@ -0,0 +1,37 @@
+import pytest
+
+from pets.adapters import repository
+from pets.domainmodel.HumanUser import HumanUser
+from pets.domainmodel.TempUser import TempUser
+
+
+@pytest.fixture
+def memory_client(client, in_memory_repository, monkeypatch):
+    # The app's routes, backed by the seeded memory repository.
+    monkeypatch.setattr(repository, "repo_instance", in_memory_repository)
+    client.application.secret_key = "test"
+    return client
+
+
+class TestUserEndpoints:
+    def test_unknown_user_is_not_found(self, memory_client):
+        assert memory_client.get("/api/user/99999").status_code == 404
+
+    def test_temp_user_has_an_empty_profile(self, memory_client, in_memory_repository):
+        temp = TempUser(None, "newcomer", "newcomer@example.com", "hash", bio="hi")
+        in_memory_repository.add_temp_user(temp)
+        with memory_client.session_transaction() as session:
+            session.update(user_name="muffux", user_id=1, user_type="PetUser")
+        response = memory_client.get(f"/api/user/{temp.user_id}")
+        assert response.status_code == 200
+        assert response.json["username"] == "newcomer"
+
+    def test_human_user_can_view_a_post(self, memory_client, in_memory_repository):
+        human = HumanUser(None, "walker", "walker@example.com", "hash", None, None)
+        in_memory_repository.add_human_user(human)
+        with memory_client.session_transaction() as session:
+            session.update(
+                user_name="walker", user_id=human.user_id, user_type="HumanUser"
+            )
+        assert memory_client.get("/post/1").status_code == 200
+        assert memory_client.get("/post/99999").status_code == 404
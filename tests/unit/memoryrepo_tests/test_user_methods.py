@@ -1,3 +1,10 @@
+from pathlib import Path
+
+from pets.adapters.memory_repository import MemoryRepository
+from pets.domainmodel.HumanUser import HumanUser
+from pets.domainmodel.TempUser import TempUser
+
+
 class TestUserMethods:
     def test_add_pet_user(self, in_memory_repository, test_pet_user):
         original_users_len = len(in_memory_repository.get_pet_users())
@@ -31,11 +38,58 @@ class TestUserMethods:
         assert retrieved_user is not None
         assert retrieved_user.user_id == test_pet_user.user_id
 
-    def test_get_all_user_post_paths(
-        self, in_memory_repository, test_pet_user, test_post
-    ):
-        in_memory_repository.add_pet_user(test_pet_user)
-        in_memory_repository.add_post(test_pet_user, test_post)
-        post_paths = in_memory_repository.get_all_user_post_paths(test_pet_user)
+    def test_get_all_user_post_paths(self, test_pet_user, test_post):
+        # Empty, so the seeded user with the same id adds no posts of its own.
+        repository = MemoryRepository()
+        repository.add_pet_user(test_pet_user)
+        repository.add_post(test_pet_user, test_post)
+        post_paths = repository.get_all_user_post_paths(test_pet_user)
         assert len(post_paths) == 1
         assert post_paths[0] == str(test_post.media_path)
+
+    def test_renamed_user_is_found_by_new_name(
+        self, in_memory_repository, test_pet_user
+    ):
+        in_memory_repository.add_pet_user(test_pet_user)
+        test_pet_user.username = "renamed_pet"
+        in_memory_repository.update_user(test_pet_user)
+        assert in_memory_repository.get_pet_user_by_name("renamed_pet") is test_pet_user
+        assert in_memory_repository.get_pet_user_by_name("pet_user") is None
+
+    def test_get_user_by_name_and_id_any_type(self, in_memory_repository):
+        human = HumanUser(None, "walker", "walker@example.com", "hash", Path(""), None)
+        in_memory_repository.add_human_user(human)
+        pet = in_memory_repository.get_pet_user_by_id(1)
+        assert in_memory_repository.get_user_by_name("walker") is human
+        assert in_memory_repository.get_user_by_id(human.user_id) is human
+        assert in_memory_repository.get_user_by_name(pet.username) is pet
+        assert in_memory_repository.get_user_by_name("nobody") is None
+        assert in_memory_repository.get_users_by_ids(
+            [human.user_id, 99999, 1, human.user_id]
+        ) == [human, pet]
+
+    def test_renamed_user_is_found_by_get_user_by_name(
+        self, in_memory_repository, test_pet_user
+    ):
+        in_memory_repository.add_pet_user(test_pet_user)
+        test_pet_user.username = "renamed_pet"
+        in_memory_repository.update_user(test_pet_user)
+        assert in_memory_repository.get_user_by_name("renamed_pet") is test_pet_user
+        assert in_memory_repository.get_user_by_name("pet_user") is None
+
+    def test_temp_users_are_found_but_not_stored(self, in_memory_repository):
+        temp = TempUser(
+            user_id=None,
+            username="newcomer",
+            email="newcomer@example.com",
+            password_hash="hash",
+            bio="No Bio",
+        )
+        in_memory_repository.add_temp_user(temp)
+        assert temp.user_id is not None
+        assert in_memory_repository.get_temp_user_by_id(temp.user_id) is temp
+        assert in_memory_repository.get_temp_user_by_name("newcomer") is temp
+        assert in_memory_repository.get_user_by_id(temp.user_id) is temp
+        assert in_memory_repository.get_user_by_name("newcomer") is temp
+        assert in_memory_repository.get_temp_user_by_id(1) is None
+        assert temp not in in_memory_repository.get_human_users()